@@ -0,0 +1,89 @@
+"""
+Бенчмарк загрузки заказов с услугами
+
+Заполняет БД заказами (с 1-3 услугами) и сравнивает загрузку набора
+заказов в объекты Order:
+  - Database.get_order_details в цикле (два запроса на заказ);
+  - Database.get_orders_with_services (два запроса на IN_CHUNK_SIZE заказов).
+
+Запуск из корня проекта:
+    python benchmarks/bench_order_details.py [--orders N] [--batch N] [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import Database
+from models.order import Order
+
+BATCH_SIZE = 10000
+
+
+def seed(db: Database, count: int) -> None:
+    with db.get_connection() as conn:
+        client_id = conn.execute(
+            "INSERT INTO clients (client_type, company_name, phone) VALUES ('legal', 'ООО «Бенчмарк»', ?)",
+            ('79123456789',)
+        ).lastrowid
+        services = [row[0] for row in conn.execute("SELECT id FROM services")]
+
+        for start in range(0, count, BATCH_SIZE):
+            ids = range(start + 1, min(start + BATCH_SIZE, count) + 1)
+            conn.executemany(
+                "INSERT INTO orders (id, vessel_code, client_id, order_date, total_amount, created_by) "
+                "VALUES (?, ?, ?, '2024-01-01', ?, 1)",
+                [(i, f"VS{i:07d}", client_id, 15000.0 * (1 + i % 3)) for i in ids]
+            )
+            conn.executemany(
+                "INSERT INTO order_services (order_id, service_id, quantity, unit_price) VALUES (?, ?, 1, ?)",
+                [(i, services[(i + k) % len(services)], 15000.0) for i in ids for k in range(1 + i % 3)]
+            )
+            conn.commit()
+
+
+def load_in_loop(db: Database, order_ids):
+    return [Order.from_dict(db.get_order_details(order_id)) for order_id in order_ids]
+
+
+def measure(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, default=50000)
+    parser.add_argument('--batch', type=int, nargs='+', default=[20, 200, 2000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        seed(db, args.orders)
+        rng = random.Random(1)
+
+        print(f"Заказов в БД: {args.orders}")
+        print(f"{'Заказов':>8} {'в цикле, мс':>14} {'пакетом, мс':>14} {'ускорение':>10}")
+        for size in args.batch:
+            order_ids = rng.sample(range(1, args.orders + 1), min(size, args.orders))
+            assert db.get_orders_with_services(order_ids) == load_in_loop(db, order_ids)
+
+            loop = measure(lambda: load_in_loop(db, order_ids), args.repeat)
+            batch = measure(lambda: db.get_orders_with_services(order_ids), args.repeat)
+            print(f"{len(order_ids):>8} {loop * 1000:>14.1f} {batch * 1000:>14.1f} {loop / batch:>9.1f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Бенчмарк экспорта отчета по заказам в PDF (DataExporter.render_orders_report)
+
+Сравнивает построение одной таблицы на все строки (прежний способ) с
+разбивкой таблицы на порции по странице. Для каждого объема выводит
+время формирования, число файлов и их суммарный размер.
+
+Запуск из корня проекта:
+    python benchmarks/bench_pdf_export.py [--sizes 1000 10000 100000] [--single-max N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.exporters import DataExporter, REPORTLAB_AVAILABLE
+
+STATUSES = ('new', 'in_progress', 'completed', 'cancelled')
+CLIENTS = ('ООО «Бенчмарк»', 'АО «Сосуды и баллоны»', 'Иванов Иван Иванович', 'ИП Петров П. П.')
+SERVICES = ('Гидравлические испытания', 'Механические испытания, Химический анализ состава',
+            'Радиографический контроль')
+
+
+def make_orders(count: int):
+    for i in range(count):
+        yield {
+            'vessel_code': f"VS{i:07d}",
+            'order_date': f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            'client_name': CLIENTS[i % len(CLIENTS)],
+            'services_names': SERVICES[i % len(SERVICES)],
+            'total_amount': 15000.0 + i % 1000,
+            'status': STATUSES[i % len(STATUSES)]
+        }
+
+
+def render_single_table(orders, filename: str, date_from: str, date_to: str) -> list:
+    """Прежний способ: одна таблица со всеми строками, ширины и высоты считает reportlab"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+    doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=15 * mm, leftMargin=15 * mm,
+                            topMargin=15 * mm, bottomMargin=15 * mm)
+    table_data = [[DataExporter._format_header(header) for header in DataExporter.ORDERS_REPORT_COLUMNS]]
+    for order in orders:
+        table_data.append([
+            order['vessel_code'],
+            order['order_date'],
+            order['client_name'],
+            order['services_names'],
+            f"{order['total_amount']:.2f} руб.",
+            DataExporter._format_status(order['status'])
+        ])
+
+    table = Table(table_data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    doc.build([table])
+    return [filename]
+
+
+def bench(render, count: int, tmp: str, **kwargs) -> dict:
+    filename = os.path.join(tmp, f"{render.__name__}_{count}.pdf")
+    started = time.perf_counter()
+    files = render(make_orders(count), filename, '2024-01-01', '2024-12-31', **kwargs)
+    elapsed = time.perf_counter() - started
+
+    size = sum(os.path.getsize(path) for path in files)
+    for path in files:
+        os.remove(path)
+
+    return {'time': elapsed, 'files': len(files), 'size': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--single-max', type=int, default=10000,
+                        help="наибольший объем для прежнего способа (он растет нелинейно)")
+    parser.add_argument('--rows-per-file', type=int, default=DataExporter.PDF_ROWS_PER_FILE)
+    args = parser.parse_args()
+
+    if not REPORTLAB_AVAILABLE:
+        print("Не установлен reportlab")
+        return
+
+    print(f"{'Строк':>8} {'способ':<14} {'время, с':>10} {'стр/с':>10} {'файлов':>7} {'размер, КБ':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.sizes:
+            runs = [('порции', DataExporter.render_orders_report, {'rows_per_file': args.rows_per_file})]
+            if count <= args.single_max:
+                runs.insert(0, ('одна таблица', render_single_table, {}))
+
+            for label, render, kwargs in runs:
+                result = bench(render, count, tmp, **kwargs)
+                print(f"{count:>8} {label:<14} {result['time']:>10.2f} {count / result['time']:>10.0f} "
+                      f"{result['files']:>7} {result['size'] / 1024:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
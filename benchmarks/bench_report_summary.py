@@ -0,0 +1,96 @@
+"""
+Бенчмарк итогов отчета (Database.get_report_summary)
+
+Заполняет БД заказами за год (с услугами) и сравнивает время расчета
+итогов за год:
+  - по суточным агрегатам (order_daily_rollup, service_daily_rollup);
+  - агрегатным запросом по orders/order_services (как при отборе по клиенту).
+
+Заказы вставляются пакетно через executemany - триггеры агрегатов
+срабатывают так же, как при Database.create_order.
+
+Запуск из корня проекта:
+    python benchmarks/bench_report_summary.py [--orders N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import Database
+
+BATCH_SIZE = 10000
+STATUSES = ('new', 'in_progress', 'completed', 'cancelled')
+
+
+def seed(db: Database, count: int) -> float:
+    started = time.perf_counter()
+    with db.get_connection() as conn:
+        clients = [
+            conn.execute(
+                "INSERT INTO clients (client_type, company_name, full_name, phone) VALUES (?, ?, ?, ?)",
+                (client_type, 'ООО «Бенчмарк»', 'Иванов И. И.', '79123456789')
+            ).lastrowid
+            for client_type in ('legal', 'individual')
+        ]
+        services = [row[0] for row in conn.execute("SELECT id FROM services")]
+        first_day = date(2024, 1, 1)
+
+        for start in range(0, count, BATCH_SIZE):
+            ids = range(start + 1, min(start + BATCH_SIZE, count) + 1)
+            conn.executemany(
+                "INSERT INTO orders (id, vessel_code, client_id, order_date, total_amount, status, created_by) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1)",
+                [(i, f"VS{i:07d}", clients[i % 2], (first_day + timedelta(days=i % 366)).isoformat(),
+                  15000.0 * (1 + i % 3), STATUSES[i % 4]) for i in ids]
+            )
+            conn.executemany(
+                "INSERT INTO order_services (order_id, service_id, quantity, unit_price) VALUES (?, ?, 1, ?)",
+                [(i, services[(i + k) % len(services)], 15000.0) for i in ids for k in range(1 + i % 3)]
+            )
+            conn.commit()
+    return time.perf_counter() - started
+
+
+def measure(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        seed_time = seed(db, args.orders)
+        print(f"Заказов: {args.orders}, вставка с триггерами: {args.orders / seed_time:.0f} зак/с")
+
+        period = ('2024-01-01', '2024-12-31')
+        rollup = measure(lambda: db.get_report_summary(*period), args.repeat)
+        rollup_status = measure(lambda: db.get_report_summary(*period, {'status': 'completed'}), args.repeat)
+        orders = measure(lambda: db._report_summary_from_orders(*period, {}), args.repeat)
+
+        assert db.get_report_summary(*period) == db._report_summary_from_orders(*period, {})
+
+        print(f"{'Способ':<36} {'мс':>10}")
+        print(f"{'суточные агрегаты':<36} {rollup * 1000:>10.1f}")
+        print(f"{'суточные агрегаты, отбор по статусу':<36} {rollup_status * 1000:>10.1f}")
+        print(f"{'агрегат по orders':<36} {orders * 1000:>10.1f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
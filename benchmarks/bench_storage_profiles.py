@@ -0,0 +1,106 @@
+"""
+Бенчмарк профилей хранения SQLite (DatabaseConfig.STORAGE_PROFILES)
+
+Для каждого профиля измеряет:
+  - вставку заказов через Database.create_order (заказов/с);
+  - чтение отчета через Database.get_report_data (строк/с);
+  - вставку заказов при параллельном чтении отчетов из другого потока.
+
+Запуск из корня проекта:
+    python benchmarks/bench_storage_profiles.py [--orders N] [--reads N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import config
+from database import Database
+
+
+def seed_client(db: Database) -> int:
+    return db.create_client({
+        'client_type': 'legal',
+        'company_name': 'ООО «Бенчмарк»',
+        'inn': '7707083893',
+        'phone': '79123456789'
+    })
+
+
+def insert_orders(db: Database, client_id: int, count: int, prefix: str) -> float:
+    started = time.perf_counter()
+    for i in range(count):
+        db.create_order(
+            {
+                'vessel_code': f"{prefix}{i:07d}",
+                'client_id': client_id,
+                'order_date': f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                'total_amount': 15000.0,
+                'created_by': 1
+            },
+            [{'service_id': 1, 'unit_price': 15000.0, 'quantity': 1}]
+        )
+    return time.perf_counter() - started
+
+
+def read_reports(db: Database, count: int) -> tuple:
+    rows = 0
+    started = time.perf_counter()
+    for _ in range(count):
+        rows += len(db.get_report_data('2024-01-01', '2024-12-31'))
+    return rows, time.perf_counter() - started
+
+
+def bench_profile(name: str, orders: int, reads: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'), storage_profile=name)
+        client_id = seed_client(db)
+
+        insert_time = insert_orders(db, client_id, orders, 'A')
+        rows, read_time = read_reports(db, reads)
+
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                db.get_report_data('2024-01-01', '2024-12-31')
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            concurrent_time = insert_orders(db, client_id, orders, 'B')
+        finally:
+            stop.set()
+            thread.join()
+
+        db.close()
+
+    return {
+        'profile': name,
+        'insert': orders / insert_time,
+        'read': rows / read_time,
+        'insert_concurrent': orders / concurrent_time
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--reads', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'Профиль':<10} {'вставка, зак/с':>16} {'чтение, стр/с':>16} {'вставка+чтение, зак/с':>24}")
+    for name in config.database.STORAGE_PROFILES:
+        result = bench_profile(name, args.orders, args.reads)
+        print(f"{result['profile']:<10} {result['insert']:>16.0f} "
+              f"{result['read']:>16.0f} {result['insert_concurrent']:>24.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,85 +14,51 @@ from typing import Dict, Any
 class DatabaseConfig:
     """Конфигурация базы данных"""
     DATABASE_NAME: str = "elma_otk.db"
-    DATABASE_VERSION: str = "1.0"
+    # Версия схемы (PRAGMA user_version), см. migrations.MIGRATIONS
+    DATABASE_VERSION: int = 10
+
+    # Пул соединений: число долгоживущих соединений и ожидание свободного (сек)
+    POOL_SIZE: int = 5
+    POOL_TIMEOUT: float = 30.0
+
+    # Сколько кодов сосудов рабочее место резервирует за одно обращение к БД
+    VESSEL_CODE_BLOCK: int = 1
+
+    # Профиль хранения SQLite (ключ из STORAGE_PROFILES). По умолчанию 'rollback':
+    # приложение запускается с общего сетевого диска, а WAL на сетевых дисках
+    # не работает (общая память -shm). 'wal' - только для БД на локальном диске
+    STORAGE_PROFILE: str = "rollback"
+    STORAGE_PROFILES: Dict = field(default_factory=lambda: {
+        # Режим SQLite по умолчанию: журнал отката, synchronous=FULL
+        'rollback': {
+            'journal_mode': 'DELETE',
+            'synchronous': 'FULL',
+            'cache_size': -2000,
+            'mmap_size': 0,
+            'temp_store': 'DEFAULT',
+            'busy_timeout': 5000
+        },
+        # Чтение отчетов не блокирует запись заказов
+        'wal': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -16000,
+            'mmap_size': 64 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000
+        }
+    })
 
     def hash_password(self, password: str) -> str:
         """Хеширование пароля (добавлен этот метод)"""
         return hashlib.sha256(password.encode()).hexdigest()
 
-    # Таблицы базы данных
-    TABLES: Dict = field(default_factory=lambda: {
-        'users': """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL CHECK(role IN ('manager', 'lab_assistant', 'controller')),
-                full_name TEXT NOT NULL,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """,
-        'clients': """
-            CREATE TABLE IF NOT EXISTS clients (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_type TEXT NOT NULL CHECK(client_type IN ('legal', 'individual')),
-                company_name TEXT,
-                address TEXT,
-                inn TEXT,
-                bank_account TEXT,
-                bik TEXT,
-                director_name TEXT,
-                contact_person TEXT,
-                full_name TEXT,
-                birth_date DATE,
-                passport_series TEXT,
-                passport_number TEXT,
-                phone TEXT NOT NULL,
-                email TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(inn) WHERE client_type = 'legal',
-                UNIQUE(passport_series, passport_number) WHERE client_type = 'individual'
-            )
-        """,
-        'services': """
-            CREATE TABLE IF NOT EXISTS services (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                price DECIMAL(10, 2) NOT NULL,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """,
-        'orders': """
-            CREATE TABLE IF NOT EXISTS orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                vessel_code TEXT UNIQUE NOT NULL,
-                client_id INTEGER NOT NULL,
-                order_date DATE NOT NULL,
-                total_amount DECIMAL(10, 2) NOT NULL,
-                status TEXT DEFAULT 'new' CHECK(status IN ('new', 'in_progress', 'completed', 'cancelled')),
-                created_by INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                FOREIGN KEY (client_id) REFERENCES clients (id),
-                FOREIGN KEY (created_by) REFERENCES users (id)
-            )
-        """,
-        'order_services': """
-            CREATE TABLE IF NOT EXISTS order_services (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id INTEGER NOT NULL,
-                service_id INTEGER NOT NULL,
-                quantity INTEGER DEFAULT 1,
-                unit_price DECIMAL(10, 2) NOT NULL,
-                FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE,
-                FOREIGN KEY (service_id) REFERENCES services (id),
-                UNIQUE(order_id, service_id)
-            )
-        """
-    })
+    def get_storage_profile(self, name: str = None) -> Dict[str, Any]:
+        """Возвращает параметры профиля хранения"""
+        name = name or self.STORAGE_PROFILE
+        if name not in self.STORAGE_PROFILES:
+            raise ValueError(f"Неизвестный профиль хранения: {name}")
+        return dict(self.STORAGE_PROFILES[name])
 
     # Начальные данные - теперь с хешированными паролями
     @property
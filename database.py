@@ -1,132 +1,347 @@
+import re
+import json
+import base64
+import binascii
 import sqlite3
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Any, Optional, Dict
+from typing import List, Tuple, Any, Optional, Dict, Callable, Iterable, Iterator, Sequence
 from config import config
+from migrations import migrate, ROLLUP_REBUILD
+from models.order import Order, OrderItem
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Запрос из цифр и знаков телефонного номера ищется как один номер
+PHONE_TERM_RE = re.compile(r'[\d\s\-()+]*\d[\d\s\-()+]*')
+
+# Явный список столбцов: в clients есть служебный sort_name
+CLIENT_FIELDS = (
+    'id', 'client_type', 'company_name', 'address', 'inn', 'bank_account', 'bik', 'director_name',
+    'contact_person', 'full_name', 'birth_date', 'passport_series', 'passport_number', 'phone',
+    'email', 'created_at'
+)
+CLIENT_COLUMNS = ", ".join(CLIENT_FIELDS)
+
+# Веса bm25 для столбцов clients_fts: названия и ФИО важнее адреса
+CLIENTS_FTS_WEIGHTS = "10.0, 10.0, 5.0, 5.0, 2.0, 1.0"
+
+# Отборы отчета, которые можно ответить из суточных агрегатов
+ROLLUP_FILTERS = ('status', 'client_type')
+
+# Список заказов: get_orders и get_orders_page добавляют WHERE и ORDER BY
+ORDER_LIST_QUERY = """
+    SELECT
+        o.id, o.vessel_code, o.order_date, o.total_amount, o.status,
+        c.client_type,
+        CASE
+            WHEN c.client_type = 'legal' THEN c.company_name
+            ELSE c.full_name
+        END as client_name,
+        u.full_name as created_by_name
+    FROM orders o
+    LEFT JOIN clients c ON o.client_id = c.id
+    LEFT JOIN users u ON o.created_by = u.id
+"""
+
+# Карточка заказа: get_order_details и get_orders_with_services добавляют WHERE
+ORDER_DETAILS_QUERY = """
+    SELECT o.*,
+           CASE
+               WHEN c.client_type = 'legal' THEN c.company_name
+               ELSE c.full_name
+           END as client_name,
+           u.full_name as created_by_name
+    FROM orders o
+    LEFT JOIN clients c ON o.client_id = c.id
+    LEFT JOIN users u ON o.created_by = u.id
+"""
+
+ORDER_SERVICES_QUERY = """
+    SELECT os.*, s.name as service_name, s.description
+    FROM order_services os
+    LEFT JOIN services s ON os.service_id = s.id
+"""
+
+# Перцентили времени пребывания в статусах (get_stage_lead_times)
+LEAD_TIME_PERCENTILES = (50, 90, 95)
+
+# Параметров в одном IN (...): с запасом ниже лимита 999 старых сборок SQLite
+IN_CHUNK_SIZE = 500
+
+# Постраничные выборки (*_page): строк на страницу по умолчанию
+PAGE_SIZE = 200
+
+
+@dataclass
+class Page:
+    """Страница списка: строки, курсор следующей страницы (None - страница последняя)
+    и общее число строк (только при with_total=True)"""
+    items: List[Dict]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+def encode_cursor(kind: str, key: Sequence[Any]) -> str:
+    """Курсор страницы - ключ сортировки последней строки в base64url(JSON)"""
+    payload = json.dumps([kind, list(key)], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(kind: str, cursor: str, size: int) -> List[Any]:
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_kind, key = json.loads(data.decode('utf-8'))
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise ValueError("Неверный курсор страницы") from e
+
+    if cursor_kind != kind or not isinstance(key, list) or len(key) != size:
+        raise ValueError("Курсор относится к другому списку")
+    return key
+
+
+# Строки отчета: _report_query и get_report_data_page добавляют WHERE и ORDER BY
+REPORT_QUERY = """
+    SELECT
+        o.vessel_code,
+        o.order_date,
+        o.total_amount,
+        o.status,
+        CASE
+            WHEN c.client_type = 'legal' THEN c.company_name
+            ELSE c.full_name
+        END as client_name,
+        c.client_type,
+        c.inn,
+        (SELECT GROUP_CONCAT(s.name, ', ')
+         FROM order_services os
+         JOIN services s ON os.service_id = s.id
+         WHERE os.order_id = o.id) as services_names,
+        (SELECT COUNT(*)
+         FROM order_services os
+         WHERE os.order_id = o.id) as services_count
+    FROM orders o
+    LEFT JOIN clients c ON o.client_id = c.id
+"""
+
+# Коды сосудов выдаются из последовательности sequences.vessel_code
+VESSEL_CODE_FORMAT = "VS{:06d}"
+# UPDATE ... RETURNING появился в SQLite 3.35
+SQLITE_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+class ConnectionPool:
+    """Ограниченный пул долгоживущих соединений SQLite.
+
+    Соединение открывается один раз (PRAGMA применяются при открытии),
+    выдается одному потоку на время блока ``with pool.connection()`` и
+    затем возвращается в пул. Повторный вход из того же потока получает
+    то же соединение, транзакция фиксируется на внешнем уровне.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 5, timeout: float = 30.0,
+                 pragmas: Dict[str, Any] = None):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.pragmas = pragmas if pragmas is not None else {'foreign_keys': 'ON'}
+
+        self._idle: List[sqlite3.Connection] = []
+        self._all: List[sqlite3.Connection] = []
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        self._opening = 0
+        self._closed = False
+        self._stats = {'hits': 0, 'misses': 0, 'waits': 0, 'wait_time': 0.0}
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        with self._cond:
+            wait_started = None
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Пул соединений закрыт")
+
+                if self._idle:
+                    if wait_started is not None:
+                        self._stats['wait_time'] += time.monotonic() - wait_started
+                    self._stats['hits'] += 1
+                    return self._idle.pop()
+
+                if len(self._all) + self._opening < self.max_size:
+                    # Резервируем место до открытия, чтобы не превысить лимит
+                    self._stats['misses'] += 1
+                    self._opening += 1
+                    break
+
+                if wait_started is None:
+                    self._stats['waits'] += 1
+                    wait_started = time.monotonic()
+
+                remaining = wait_started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self._stats['wait_time'] += time.monotonic() - wait_started
+                    raise sqlite3.OperationalError(
+                        f"Нет свободных соединений с БД в течение {self.timeout} с"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            conn = self._open()
+        except sqlite3.Error:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._opening -= 1
+            self._all.append(conn)
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._cond:
+            if self._closed:
+                conn.close()
+                if conn in self._all:
+                    self._all.remove(conn)
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def dedicated_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Соединение для потоковой выборки, не привязанное к потоку.
+        Генератор может быть закрыт (или собран сборщиком мусора) в другом
+        потоке - соединение просто возвращается в пул, а вызовы из потока,
+        читавшего генератор, по-прежнему получают свое соединение
+        """
+        conn = self._acquire()
+        streams = self.thread_streams()
+        streams.append(conn)
+        try:
+            yield conn
+        finally:
+            streams.remove(conn)
+            if conn.in_transaction:
+                conn.rollback()
+            self._release(conn)
+
+    def thread_streams(self) -> List[sqlite3.Connection]:
+        """Соединения потоковых выборок, открытых текущим потоком (для interrupt)"""
+        streams = getattr(self._local, 'streams', None)
+        if streams is None:
+            streams = self._local.streams = []
+        return streams
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'hits': self._stats['hits'],
+                'misses': self._stats['misses'],
+                'waits': self._stats['waits'],
+                'wait_time': round(self._stats['wait_time'], 6),
+                'open': len(self._all),
+                'idle': len(self._idle),
+                'in_use': len(self._all) - len(self._idle),
+                'max_size': self.max_size,
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+                self._all.remove(conn)
+            self._idle.clear()
+            self._cond.notify_all()
+
 
 class Database:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, storage_profile: str = None):
         self.db_path = db_path or config.get_database_path()
+        self.storage_profile = config.database.get_storage_profile(storage_profile)
+
+        # journal_mode хранится в самом файле БД, остальные PRAGMA - на соединение
+        pragmas = {'foreign_keys': 'ON'}
+        pragmas.update({name: value for name, value in self.storage_profile.items()
+                        if name != 'journal_mode'})
+
+        self.pool = ConnectionPool(
+            self.db_path,
+            max_size=config.database.POOL_SIZE,
+            timeout=config.database.POOL_TIMEOUT,
+            pragmas=pragmas
+        )
+        # Блок кодов сосудов, зарезервированный этим рабочим местом (см. next_vessel_code)
+        self._vessel_codes: List[str] = []
+        self._vessel_codes_lock = threading.Lock()
         self._init_database()
 
+    def _apply_journal_mode(self, conn: sqlite3.Connection) -> None:
+        requested = self.storage_profile['journal_mode']
+        actual = conn.execute(f"PRAGMA journal_mode = {requested}").fetchone()[0]
+        if actual.upper() != requested.upper():
+            logger.warning(f"Режим журнала {requested} недоступен, используется {actual}")
+
     def _init_database(self):
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-
-                # Сначала создаем таблицы без сложных constraints
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        username TEXT UNIQUE NOT NULL,
-                        password_hash TEXT NOT NULL,
-                        role TEXT NOT NULL,
-                        full_name TEXT NOT NULL,
-                        is_active BOOLEAN DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS clients (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        client_type TEXT NOT NULL,
-                        company_name TEXT,
-                        address TEXT,
-                        inn TEXT UNIQUE,
-                        bank_account TEXT,
-                        bik TEXT,
-                        director_name TEXT,
-                        contact_person TEXT,
-                        full_name TEXT,
-                        birth_date DATE,
-                        passport_series TEXT,
-                        passport_number TEXT,
-                        phone TEXT NOT NULL,
-                        email TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS services (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        description TEXT,
-                        price DECIMAL(10, 2) NOT NULL,
-                        is_active BOOLEAN DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS orders (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        vessel_code TEXT UNIQUE NOT NULL,
-                        client_id INTEGER NOT NULL,
-                        order_date DATE NOT NULL,
-                        total_amount DECIMAL(10, 2) NOT NULL,
-                        status TEXT DEFAULT 'new',
-                        created_by INTEGER NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        completed_at TIMESTAMP,
-                        FOREIGN KEY (client_id) REFERENCES clients (id),
-                        FOREIGN KEY (created_by) REFERENCES users (id)
-                    )
-                """)
-
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS order_services (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        order_id INTEGER NOT NULL,
-                        service_id INTEGER NOT NULL,
-                        quantity INTEGER DEFAULT 1,
-                        unit_price DECIMAL(10, 2) NOT NULL,
-                        FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE,
-                        FOREIGN KEY (service_id) REFERENCES services (id),
-                        UNIQUE(order_id, service_id)
-                    )
-                """)
-
-                self._insert_initial_data(cursor)
-                conn.commit()
+                self._apply_journal_mode(conn)
+                migrate(conn, config.database.DATABASE_VERSION)
 
         except sqlite3.Error as e:
             logger.error(f"Ошибка инициализации БД: {e}")
             raise
 
-    def _insert_initial_data(self, cursor):
-        # Проверяем и добавляем пользователей
-        cursor.execute("SELECT COUNT(*) FROM users")
-        if cursor.fetchone()[0] == 0:
-            from config import config  # Добавляем импорт
-            for user_data in config.database.INITIAL_DATA['users']:
-                cursor.execute(
-                    "INSERT INTO users (username, password_hash, role, full_name) VALUES (?, ?, ?, ?)",
-                    user_data
-                )
-            logger.info("Начальные данные пользователей добавлены")
-
-        # Проверяем и добавляем услуги
-        cursor.execute("SELECT COUNT(*) FROM services")
-        if cursor.fetchone()[0] == 0:
-            from config import config  # Добавляем импорт
-            for service in config.database.INITIAL_DATA['services']:
-                cursor.execute(
-                    "INSERT INTO services (name, description, price) VALUES (?, ?, ?)",
-                    service
-                )
-            logger.info("Начальные данные услуг добавлены")
-
-    def get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.row_factory = sqlite3.Row
-        return conn
+    def get_connection(self):
+        """Контекстный менеджер, выдающий соединение из пула"""
+        return self.pool.connection()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.pool.stats()
+
+    def close(self) -> None:
+        self.pool.close()
 
     def execute_query(self, query: str, params: Tuple = ()) -> List[sqlite3.Row]:
         try:
@@ -160,6 +375,25 @@ class Database:
             logger.error(f"Ошибка выполнения обновления: {e}")
             raise
 
+    def iter_query(self, query: str, params: Tuple = (), chunk_size: int = 500) -> Iterator[List[sqlite3.Row]]:
+        """Построчная выборка порциями по chunk_size через fetchmany.
+
+        Генератор держит отдельное соединение пула (ConnectionPool.dedicated_connection),
+        пока не исчерпан или не закрыт.
+        """
+        try:
+            with self.pool.dedicated_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка выполнения запроса: {e}")
+            raise
+
     def user_exists(self, username: str) -> bool:
         result = self.execute_query(
             "SELECT 1 FROM users WHERE username = ? AND is_active = 1",
@@ -195,35 +429,201 @@ class Database:
         return [dict(row) for row in result]
 
     def get_clients(self, client_type: str = None) -> List[Dict]:
-        query = "SELECT * FROM clients WHERE 1=1"
+        query = f"SELECT {CLIENT_COLUMNS} FROM clients WHERE 1=1"
         params = []
 
         if client_type:
             query += " AND client_type = ?"
             params.append(client_type)
 
-        query += " ORDER BY company_name, full_name"
+        query += " ORDER BY sort_name, id"
         result = self.execute_query(query, tuple(params))
         return [dict(row) for row in result]
 
+    def get_clients_page(self, client_type: str = None, cursor: str = None,
+                         page_size: int = PAGE_SIZE, with_total: bool = False) -> Page:
+        """Страница клиентов в порядке get_clients; строки содержат ключ sort_name"""
+        where, params = "1=1", []
+
+        if client_type:
+            where = "client_type = ?"
+            params.append(client_type)
+
+        return self._keyset_page(
+            'clients', f"SELECT {CLIENT_COLUMNS}, sort_name FROM clients", where, params,
+            (('sort_name', 'sort_name'), ('id', 'id')), cursor=cursor, page_size=page_size,
+            count_query="SELECT COUNT(*) FROM clients" if with_total else None
+        )
+
+    def _keyset_page(self, kind: str, select: str, where: str, params: List[Any],
+                     key: Sequence[Tuple[str, str]], descending: bool = False,
+                     cursor: str = None, page_size: int = PAGE_SIZE,
+                     count_query: str = None) -> Page:
+        """
+        Keyset-выборка страницы без OFFSET: следующая страница начинается строго после
+        ключа последней строки, поэтому стоимость не зависит от ее номера.
+        select - запрос без WHERE/ORDER BY; key - пары (выражение SQL, поле строки),
+        в совокупности уникальные; count_query - SELECT COUNT(*) ... без WHERE
+        """
+        if page_size < 1:
+            raise ValueError("Размер страницы должен быть положительным")
+
+        conditions, page_params = where, list(params)
+        if cursor:
+            after = decode_cursor(kind, cursor, len(key))
+            expressions = ", ".join(expression for expression, _ in key)
+            placeholders = ", ".join("?" for _ in key)
+            conditions += f" AND ({expressions}) {'<' if descending else '>'} ({placeholders})"
+            page_params.extend(after)
+
+        direction = " DESC" if descending else ""
+        order = ", ".join(expression + direction for expression, _ in key)
+        # Лишняя строка показывает, есть ли следующая страница
+        rows = self.execute_query(f"{select} WHERE {conditions} ORDER BY {order} LIMIT ?",
+                                  (*page_params, page_size + 1))
+
+        items = [dict(row) for row in rows[:page_size]]
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = encode_cursor(kind, [items[-1][field] for _, field in key])
+
+        total = None
+        if count_query:
+            total = self.execute_query(f"{count_query} WHERE {where}", tuple(params))[0][0]
+
+        return Page(items, next_cursor, total)
+
+    @staticmethod
+    def iter_pages(fetch_page: Callable[..., Page], *args, page_size: int = PAGE_SIZE,
+                   **kwargs) -> Iterator[List[Dict]]:
+        """Проходит все страницы метода *_page, выдавая строки постранично"""
+        cursor = None
+        while True:
+            page = fetch_page(*args, cursor=cursor, page_size=page_size, **kwargs)
+            if page.items:
+                yield page.items
+            cursor = page.next_cursor
+            if not cursor:
+                return
+
+    def get_client(self, client_id: int) -> Optional[Dict]:
+        result = self.execute_query(f"SELECT {CLIENT_COLUMNS} FROM clients WHERE id = ?", (client_id,))
+        return dict(result[0]) if result else None
+
+    @staticmethod
+    def _build_fts_query(search_term: str) -> Optional[str]:
+        term = search_term.replace('ё', 'е').replace('Ё', 'Е')
+
+        # Телефон в индексе хранится одними цифрами
+        if PHONE_TERM_RE.fullmatch(term):
+            tokens = [re.sub(r'\D', '', term)]
+        else:
+            tokens = re.findall(r'\w+', term)
+
+        if not tokens:
+            return None
+        return " AND ".join(f'"{token}"*' for token in tokens)
+
     def search_clients(self, search_term: str, client_type: str = None) -> List[Dict]:
-        query = """
-            SELECT * FROM clients 
-            WHERE (company_name LIKE ? OR full_name LIKE ? OR inn LIKE ? OR phone LIKE ?)
+        match = self._build_fts_query(search_term)
+        if not match:
+            return self.get_clients(client_type)
+
+        query = f"""
+            SELECT {", ".join("c." + field for field in CLIENT_FIELDS)}
+            FROM clients_fts f
+            JOIN clients c ON c.id = f.rowid
+            WHERE clients_fts MATCH ?
         """
-        params = [f"%{search_term}%"] * 4
+        params = [match]
 
         if client_type:
-            query += " AND client_type = ?"
+            query += " AND c.client_type = ?"
             params.append(client_type)
 
-        query += " ORDER BY company_name, full_name"
+        query += f" ORDER BY bm25(clients_fts, {CLIENTS_FTS_WEIGHTS}), c.sort_name, c.id"
         result = self.execute_query(query, tuple(params))
         return [dict(row) for row in result]
 
-    def get_last_order_id(self) -> int:
-        result = self.execute_query("SELECT MAX(id) as last_id FROM orders")
-        return result[0]['last_id'] or 0 if result else 0
+    def search_clients_page(self, search_term: str, client_type: str = None, cursor: str = None,
+                            page_size: int = PAGE_SIZE, with_total: bool = False) -> Page:
+        """Страница результатов search_clients; строки содержат ключи search_rank, sort_name"""
+        match = self._build_fts_query(search_term)
+        if not match:
+            return self.get_clients_page(client_type, cursor, page_size, with_total)
+
+        where, params = "clients_fts MATCH ?", [match]
+
+        if client_type:
+            where += " AND c.client_type = ?"
+            params.append(client_type)
+
+        # Ключ сравнивает тот же взвешенный bm25, что и ORDER BY: имя rank занято
+        # скрытым столбцом clients_fts.rank (bm25 без весов)
+        rank = f"bm25(clients_fts, {CLIENTS_FTS_WEIGHTS})"
+        from_clause = "FROM clients_fts f JOIN clients c ON c.id = f.rowid"
+        return self._keyset_page(
+            'search',
+            f"SELECT {', '.join('c.' + field for field in CLIENT_FIELDS)}, c.sort_name, "
+            f"{rank} AS search_rank {from_clause}",
+            where, params, ((rank, 'search_rank'), ('c.sort_name', 'sort_name'), ('c.id', 'id')),
+            cursor=cursor, page_size=page_size,
+            count_query=f"SELECT COUNT(*) {from_clause}" if with_total else None
+        )
+
+    @staticmethod
+    def _begin_immediate(conn: sqlite3.Connection) -> None:
+        """
+        Открывает собственную транзакцию метода с блокировкой записи.
+        Соединение повторно входимо в пределах потока, поэтому транзакцию,
+        открытую вызывающим кодом, нельзя молча зафиксировать - это ошибка
+        """
+        if conn.in_transaction:
+            raise sqlite3.ProgrammingError("Вызов внутри уже открытой транзакции")
+        conn.execute("BEGIN IMMEDIATE")
+
+    def allocate_sequence(self, name: str, count: int = 1) -> int:
+        """
+        Резервирует count подряд идущих значений последовательности, возвращает первое.
+        BEGIN IMMEDIATE сразу берет блокировку записи - параллельные вызовы
+        из разных процессов получают непересекающиеся значения
+        """
+        if count < 1:
+            raise ValueError("Количество значений должно быть положительным")
+
+        with self.get_connection() as conn:
+            self._begin_immediate(conn)
+            try:
+                if SQLITE_RETURNING:
+                    row = conn.execute(
+                        "UPDATE sequences SET value = value + ? WHERE name = ? RETURNING value",
+                        (count, name)
+                    ).fetchone()
+                else:
+                    conn.execute("UPDATE sequences SET value = value + ? WHERE name = ?", (count, name))
+                    row = conn.execute("SELECT value FROM sequences WHERE name = ?", (name,)).fetchone()
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+        if row is None:
+            raise ValueError(f"Неизвестная последовательность: {name}")
+        return row[0] - count + 1
+
+    def allocate_vessel_codes(self, count: int = 1) -> List[str]:
+        first = self.allocate_sequence('vessel_code', count)
+        return [VESSEL_CODE_FORMAT.format(number) for number in range(first, first + count)]
+
+    def next_vessel_code(self) -> str:
+        """
+        Следующий код сосуда. При VESSEL_CODE_BLOCK > 1 коды резервируются блоком
+        на рабочее место; неиспользованные коды блока при выходе пропадают
+        """
+        with self._vessel_codes_lock:
+            if not self._vessel_codes:
+                self._vessel_codes = self.allocate_vessel_codes(config.database.VESSEL_CODE_BLOCK)[::-1]
+            return self._vessel_codes.pop()
 
     def vessel_code_exists(self, vessel_code: str) -> bool:
         result = self.execute_query(
@@ -246,6 +646,65 @@ class Database:
         query = f"INSERT INTO clients ({', '.join(fields)}) VALUES ({', '.join(placeholders)})"
         return self.execute_insert(query, tuple(values))
 
+    # Поля clients, заполняемые пакетным импортом (без id, created_at и sort_name)
+    IMPORT_CLIENT_FIELDS = CLIENT_FIELDS[1:-1]
+
+    def find_existing_clients(self, inns: Iterable[str],
+                              passports: Iterable[Tuple[str, str]]) -> Tuple[set, set]:
+        """Какие ИНН и паспорта (серия, номер) уже есть в clients.
+
+        Значения передаются одним JSON-массивом через json_each, поэтому каждый
+        набор проверяется одним запросом независимо от размера
+        """
+        inns = [inn for inn in set(inns) if inn]
+        passports = [list(passport) for passport in set(passports) if all(passport)]
+
+        existing_inns = {row['inn'] for row in self.execute_query(
+            "SELECT inn FROM clients WHERE inn IN (SELECT value FROM json_each(?))",
+            (json.dumps(inns),)
+        )} if inns else set()
+
+        existing_passports = {(row['passport_series'], row['passport_number']) for row in self.execute_query("""
+            SELECT c.passport_series, c.passport_number
+            FROM json_each(?) j
+            JOIN clients c ON c.passport_series = json_extract(j.value, '$[0]')
+                          AND c.passport_number = json_extract(j.value, '$[1]')
+        """, (json.dumps(passports),))} if passports else set()
+
+        return existing_inns, existing_passports
+
+    def import_clients(self, records: Iterable[Tuple[int, Dict]],
+                       batch_size: int = 1000) -> Tuple[int, List[Tuple[int, str]]]:
+        """Пакетная вставка проверенных клиентов: (номер строки источника, поля клиента).
+
+        Пакеты по batch_size строк вставляются через executemany, каждый в своей
+        транзакции. Возвращает число вставленных клиентов и отказы (номер строки, причина)
+        """
+        imported = 0
+        rejected: List[Tuple[int, str]] = []
+
+        try:
+            with self.get_connection() as conn:
+                batch = []
+                for record in records:
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        imported += self._insert_batch(conn, batch, self._insert_clients, rejected)
+                        batch = []
+                imported += self._insert_batch(conn, batch, self._insert_clients, rejected)
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка импорта клиентов: {e}")
+            raise
+
+        return imported, rejected
+
+    def _insert_clients(self, conn: sqlite3.Connection, records: List[Tuple[int, Dict]]) -> None:
+        conn.executemany(
+            f"INSERT INTO clients ({', '.join(self.IMPORT_CLIENT_FIELDS)}) "
+            f"VALUES ({', '.join('?' for _ in self.IMPORT_CLIENT_FIELDS)})",
+            [tuple(client.get(field) for field in self.IMPORT_CLIENT_FIELDS) for _, client in records]
+        )
+
     def create_order(self, order_data: Dict, services: List[Dict]) -> int:
         try:
             with self.get_connection() as conn:
@@ -262,17 +721,13 @@ class Database:
                 cursor.execute(order_query, order_values)
                 order_id = cursor.lastrowid
 
-                for service in services:
-                    service_query = """
-                        INSERT INTO order_services (order_id, service_id, quantity, unit_price)
-                        VALUES (?, ?, ?, ?)
-                    """
-                    cursor.execute(service_query, (
-                        order_id,
-                        service['service_id'],
-                        service.get('quantity', 1),
-                        service['unit_price']
-                    ))
+                cursor.executemany("""
+                    INSERT INTO order_services (order_id, service_id, quantity, unit_price)
+                    VALUES (?, ?, ?, ?)
+                """, [
+                    (order_id, service['service_id'], service.get('quantity', 1), service['unit_price'])
+                    for service in services
+                ])
 
                 conn.commit()
                 return order_id
@@ -281,107 +736,565 @@ class Database:
             logger.error(f"Ошибка создания заказа: {e}")
             raise
 
-    def get_orders(self, filters: Dict = None) -> List[Dict]:
-        query = """
-            SELECT 
-                o.id, o.vessel_code, o.order_date, o.total_amount, o.status,
-                c.client_type, 
-                CASE 
-                    WHEN c.client_type = 'legal' THEN c.company_name 
-                    ELSE c.full_name 
-                END as client_name,
-                u.full_name as created_by_name
-            FROM orders o
-            LEFT JOIN clients c ON o.client_id = c.id
-            LEFT JOIN users u ON o.created_by = u.id
-            WHERE 1=1
+    IMPORT_ORDER_FIELDS = ('vessel_code', 'client_id', 'order_date', 'total_amount', 'status',
+                           'created_by', 'completed_at')
+
+    def import_orders(self, records: Iterable[Tuple[int, Dict, List[Dict]]],
+                      batch_size: int = 500) -> Tuple[int, List[Tuple[int, str]]]:
+        """Пакетная вставка заказов с услугами.
+
+        records - тройки (номер строки источника, поля заказа, услуги). Каждый
+        пакет из batch_size заказов проверяется набором запросов (повтор кода
+        сосуда, клиент, услуги) и вставляется через executemany в одной
+        транзакции. Возвращает число вставленных заказов и список отказов
+        (номер строки, причина)
         """
-        params = []
+        imported = 0
+        rejected: List[Tuple[int, str]] = []
+
+        try:
+            with self.get_connection() as conn:
+                service_ids = {row['id'] for row in conn.execute("SELECT id FROM services")}
+                batch = []
+                for record in records:
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        imported += self._import_orders_batch(conn, batch, service_ids, rejected)
+                        batch = []
+                if batch:
+                    imported += self._import_orders_batch(conn, batch, service_ids, rejected)
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка импорта заказов: {e}")
+            raise
+
+        return imported, rejected
+
+    @staticmethod
+    def _select_existing(conn: sqlite3.Connection, query: str, values: List[Any]) -> set:
+        if not values:
+            return set()
+        placeholders = ", ".join("?" for _ in values)
+        return {row[0] for row in conn.execute(query.format(placeholders=placeholders), values)}
+
+    def _import_orders_batch(self, conn: sqlite3.Connection, batch: List[Tuple[int, Dict, List[Dict]]],
+                             service_ids: set, rejected: List[Tuple[int, str]]) -> int:
+        codes = list({order['vessel_code'] for _, order, _ in batch})
+        existing_codes = self._select_existing(
+            conn, "SELECT vessel_code FROM orders WHERE vessel_code IN ({placeholders})", codes
+        )
+        client_ids = list({order['client_id'] for _, order, _ in batch})
+        existing_clients = self._select_existing(
+            conn, "SELECT id FROM clients WHERE id IN ({placeholders})", client_ids
+        )
+
+        accepted = []
+        batch_codes = set()
+        for line, order, services in batch:
+            line_services = [service['service_id'] for service in services]
+            if order['vessel_code'] in existing_codes or order['vessel_code'] in batch_codes:
+                rejected.append((line, f"Код сосуда {order['vessel_code']} уже существует"))
+            elif order['client_id'] not in existing_clients:
+                rejected.append((line, f"Клиент {order['client_id']} не найден"))
+            elif not services:
+                rejected.append((line, "Нет услуг"))
+            elif set(line_services) - service_ids:
+                unknown = ", ".join(str(service_id) for service_id in sorted(set(line_services) - service_ids))
+                rejected.append((line, f"Услуга не найдена: {unknown}"))
+            elif len(set(line_services)) != len(line_services):
+                rejected.append((line, "Услуга указана в заказе дважды"))
+            else:
+                batch_codes.add(order['vessel_code'])
+                accepted.append((line, order, services))
 
-        if filters:
-            if filters.get('status'):
-                query += " AND o.status = ?"
-                params.append(filters['status'])
-            if filters.get('date_from'):
-                query += " AND o.order_date >= ?"
-                params.append(filters['date_from'])
-            if filters.get('date_to'):
-                query += " AND o.order_date <= ?"
-                params.append(filters['date_to'])
-            if filters.get('vessel_code'):
-                query += " AND o.vessel_code LIKE ?"
-                params.append(f"%{filters['vessel_code']}%")
-
-        query += " ORDER BY o.order_date DESC, o.id DESC"
+        return self._insert_batch(conn, accepted, self._insert_orders, rejected)
+
+    @staticmethod
+    def _insert_batch(conn: sqlite3.Connection, records: List[Tuple], insert: Callable,
+                      rejected: List[Tuple[int, str]]) -> int:
+        """Вставляет пакет записей (номер строки, ...) одной транзакцией через insert(conn, records).
+
+        Если пакет целиком не проходит (например, код занят параллельно),
+        записи повторяются по одной под SAVEPOINT, отказы добавляются в rejected
+        """
+        if not records:
+            return 0
+
+        Database._begin_immediate(conn)
+        try:
+            insert(conn, records)
+            conn.commit()
+            return len(records)
+        except sqlite3.IntegrityError:
+            conn.rollback()
+
+        imported = 0
+        Database._begin_immediate(conn)
+        try:
+            for record in records:
+                conn.execute("SAVEPOINT import_record")
+                try:
+                    insert(conn, [record])
+                    conn.execute("RELEASE import_record")
+                    imported += 1
+                except sqlite3.IntegrityError as e:
+                    conn.execute("ROLLBACK TO import_record")
+                    conn.execute("RELEASE import_record")
+                    rejected.append((record[0], f"Ошибка записи: {e}"))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return imported
+
+    def _insert_orders(self, conn: sqlite3.Connection, records: List[Tuple[int, Dict, List[Dict]]]) -> None:
+        conn.executemany(
+            f"INSERT INTO orders ({', '.join(self.IMPORT_ORDER_FIELDS)}) "
+            f"VALUES ({', '.join('?' for _ in self.IMPORT_ORDER_FIELDS)})",
+            [(order['vessel_code'], order['client_id'], order['order_date'], order['total_amount'],
+              order.get('status') or 'new', order['created_by'], order.get('completed_at'))
+             for _, order, _ in records]
+        )
+
+        codes = [order['vessel_code'] for _, order, _ in records]
+        order_ids = {row['vessel_code']: row['id'] for row in conn.execute(
+            f"SELECT id, vessel_code FROM orders WHERE vessel_code IN ({', '.join('?' for _ in codes)})", codes
+        )}
+
+        conn.executemany(
+            "INSERT INTO order_services (order_id, service_id, quantity, unit_price) VALUES (?, ?, ?, ?)",
+            [(order_ids[order['vessel_code']], service['service_id'], service.get('quantity', 1),
+              service['unit_price'])
+             for _, order, services in records for service in services]
+        )
+
+    @staticmethod
+    def _build_order_filters(filters: Dict = None) -> Tuple[str, List[Any]]:
+        """Условия списка заказов (orders с псевдонимом o) для ORDER_LIST_QUERY"""
+        conditions = []
+        params: List[Any] = []
+        filters = filters or {}
+
+        if filters.get('status'):
+            conditions.append("o.status = ?")
+            params.append(filters['status'])
+        if filters.get('date_from'):
+            conditions.append("o.order_date >= ?")
+            params.append(filters['date_from'])
+        if filters.get('date_to'):
+            conditions.append("o.order_date <= ?")
+            params.append(filters['date_to'])
+        if filters.get('vessel_code'):
+            conditions.append("o.vessel_code LIKE ?")
+            params.append(f"%{filters['vessel_code']}%")
+
+        return " AND ".join(conditions) or "1=1", params
+
+    def get_orders(self, filters: Dict = None) -> List[Dict]:
+        where, params = self._build_order_filters(filters)
+        query = f"{ORDER_LIST_QUERY} WHERE {where} ORDER BY o.order_date DESC, o.id DESC"
         result = self.execute_query(query, tuple(params))
         return [dict(row) for row in result]
 
+    def get_orders_page(self, filters: Dict = None, cursor: str = None,
+                        page_size: int = PAGE_SIZE, with_total: bool = False) -> Page:
+        """Страница заказов в порядке get_orders (новые сверху), ключ - (order_date, id)"""
+        where, params = self._build_order_filters(filters)
+        return self._keyset_page(
+            'orders', ORDER_LIST_QUERY, where, params,
+            (('o.order_date', 'order_date'), ('o.id', 'id')), descending=True,
+            cursor=cursor, page_size=page_size,
+            count_query="SELECT COUNT(*) FROM orders o" if with_total else None
+        )
+
     def get_order_details(self, order_id: int) -> Dict:
-        order_result = self.execute_query("""
-            SELECT o.*, 
-                   CASE 
-                       WHEN c.client_type = 'legal' THEN c.company_name 
-                       ELSE c.full_name 
-                   END as client_name,
-                   u.full_name as created_by_name
-            FROM orders o
-            LEFT JOIN clients c ON o.client_id = c.id
-            LEFT JOIN users u ON o.created_by = u.id
-            WHERE o.id = ?
-        """, (order_id,))
+        order_result = self.execute_query(f"{ORDER_DETAILS_QUERY} WHERE o.id = ?", (order_id,))
 
         if not order_result:
             return None
 
         order = dict(order_result[0])
 
-        services_result = self.execute_query("""
-            SELECT os.*, s.name as service_name, s.description
-            FROM order_services os
-            LEFT JOIN services s ON os.service_id = s.id
-            WHERE os.order_id = ?
-        """, (order_id,))
+        services_result = self.execute_query(f"{ORDER_SERVICES_QUERY} WHERE os.order_id = ?", (order_id,))
 
         order['services'] = [dict(row) for row in services_result]
         return order
 
-    def update_order_status(self, order_id: int, status: str) -> bool:
-        try:
-            query = "UPDATE orders SET status = ? WHERE id = ?"
-            if status == 'completed':
-                query = "UPDATE orders SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?"
+    def get_orders_with_services(self, order_ids: Iterable[int]) -> List[Order]:
+        """
+        Заказы с услугами по списку id: шапки и строки услуг читаются двумя
+        запросами с IN на каждые IN_CHUNK_SIZE заказов, а не двумя запросами
+        на заказ, как get_order_details в цикле.
+        Порядок - как в order_ids, несуществующие id пропускаются
+        """
+        ids = list(dict.fromkeys(order_ids))
+        orders: Dict[int, Order] = {}
 
-            rows_affected = self.execute_update(query, (status, order_id))
-            return rows_affected > 0
-        except sqlite3.Error as e:
+        with self.get_connection() as conn:
+            for start in range(0, len(ids), IN_CHUNK_SIZE):
+                chunk = ids[start:start + IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+
+                for row in conn.execute(f"{ORDER_DETAILS_QUERY} WHERE o.id IN ({placeholders})", chunk):
+                    orders[row['id']] = Order.from_dict(dict(row))
+
+                for row in conn.execute(f"{ORDER_SERVICES_QUERY} WHERE os.order_id IN ({placeholders})", chunk):
+                    # Заказ мог появиться между двумя запросами
+                    order = orders.get(row['order_id'])
+                    if order is not None:
+                        order.items.append(OrderItem.from_dict(dict(row)))
+
+        return [orders[order_id] for order_id in ids if order_id in orders]
+
+    def update_order_status(self, order_id: int, status: str, changed_by: int = None) -> bool:
+        try:
+            return self.update_orders_status([order_id], status, changed_by)[order_id] is None
+        except (sqlite3.Error, ValueError) as e:
             logger.error(f"Ошибка обновления статуса заказа: {e}")
             return False
 
-    def get_report_data(self, date_from: str, date_to: str) -> List[Dict]:
-        query = """
-            SELECT 
-                o.vessel_code,
-                o.order_date,
-                o.total_amount,
-                o.status,
-                CASE 
-                    WHEN c.client_type = 'legal' THEN c.company_name 
-                    ELSE c.full_name 
-                END as client_name,
-                c.client_type,
-                c.inn,
-                GROUP_CONCAT(s.name, ', ') as services_names,
-                COUNT(DISTINCT os.service_id) as services_count
+    def update_orders_status(self, order_ids: Iterable[int], status: str,
+                             changed_by: int = None) -> Dict[int, Optional[str]]:
+        """
+        Переводит заказы в статус status одной транзакцией.
+        Допустимость перехода (Order.STATUS_TRANSITIONS, для завершения - наличие
+        услуг) проверяется запросом под блокировкой записи, подходящие заказы
+        обновляются через executemany, при завершении ставится completed_at.
+        В той же транзакции каждая смена статуса пишется в order_status_events.
+        Возвращает для каждого id None, если статус изменен, или причину отказа
+        """
+        allowed = Order.STATUS_TRANSITIONS.get(status)
+        if allowed is None:
+            raise ValueError(f"Недопустимый статус заказа: {status}")
+
+        ids = list(dict.fromkeys(order_ids))
+        results: Dict[int, Optional[str]] = {order_id: "Заказ не найден" for order_id in ids}
+        if not ids:
+            return results
+
+        from_statuses = ", ".join("?" for _ in allowed)
+        stamp = ", completed_at = :ts" if status == 'completed' else ""
+        update = f"UPDATE orders SET status = :status{stamp} WHERE id = :id AND status = :from_status"
+        target = Order.STATUS_CHOICES[status]
+
+        try:
+            with self.get_connection() as conn:
+                self._begin_immediate(conn)
+                try:
+                    # Одна метка времени на пакет: completed_at совпадает с временем события
+                    ts = conn.execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+                    accepted = []
+                    for start in range(0, len(ids), IN_CHUNK_SIZE):
+                        chunk = ids[start:start + IN_CHUNK_SIZE]
+                        rows = conn.execute(f"""
+                            SELECT o.id, o.status,
+                                   CASE
+                                       WHEN o.status NOT IN ({from_statuses}) THEN 'transition'
+                                       WHEN ? AND NOT EXISTS (SELECT 1 FROM order_services os
+                                                              WHERE os.order_id = o.id) THEN 'services'
+                                   END AS rejected
+                            FROM orders o
+                            WHERE o.id IN ({', '.join('?' for _ in chunk)})
+                        """, (*allowed, status == 'completed', *chunk))
+
+                        for row in rows:
+                            if row['rejected'] == 'transition':
+                                current = Order.STATUS_CHOICES.get(row['status'], row['status'])
+                                results[row['id']] = f"Переход из статуса «{current}» в «{target}» недопустим"
+                            elif row['rejected'] == 'services':
+                                results[row['id']] = "В заказе нет услуг"
+                            else:
+                                accepted.append({'id': row['id'], 'from_status': row['status'], 'status': status,
+                                                 'ts': ts, 'changed_by': changed_by})
+
+                    conn.executemany(update, accepted)
+                    conn.executemany(
+                        "INSERT INTO order_status_events (order_id, from_status, to_status, ts, changed_by) "
+                        "VALUES (:id, :from_status, :status, :ts, :changed_by)",
+                        accepted
+                    )
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка обновления статуса заказов: {e}")
+            raise
+
+        for event in accepted:
+            results[event['id']] = None
+        return results
+
+    def get_order_status_history(self, order_id: int) -> List[Dict]:
+        result = self.execute_query("""
+            SELECT e.from_status, e.to_status, e.ts, u.full_name as changed_by_name
+            FROM order_status_events e
+            LEFT JOIN users u ON e.changed_by = u.id
+            WHERE e.order_id = ?
+            ORDER BY e.ts, e.id
+        """, (order_id,))
+        return [dict(row) for row in result]
+
+    def get_stage_lead_times(self, date_from: str, date_to: str,
+                             percentiles: Sequence[int] = LEAD_TIME_PERCENTILES) -> List[Dict]:
+        """
+        Время пребывания заказов в статусах по услугам, часы, для заказов
+        с order_date в периоде. stage - статус, в котором заказ находился до следующего
+        события ('new' - очередь, 'in_progress' - работа), 'total' - от первого события
+        до завершения. Строки: service_id, service_name, stage, orders_count, avg_hours
+        и p<N> для каждого N из percentiles (ближайший ранг, считается оконными функциями)
+        """
+        if not percentiles or any(not isinstance(p, int) or not 0 < p <= 100 for p in percentiles):
+            raise ValueError("Перцентили должны быть целыми числами от 1 до 100")
+
+        columns = ", ".join(f"MIN(CASE WHEN r.rn * 100 >= r.cnt * ? THEN r.hours END) AS p{p}"
+                            for p in percentiles)
+        result = self.execute_query(f"""
+            WITH events AS (
+                SELECT e.order_id, e.to_status AS stage, e.ts,
+                       LEAD(e.ts) OVER w AS next_ts,
+                       FIRST_VALUE(e.ts) OVER w AS first_ts
+                FROM orders o
+                JOIN order_status_events e ON e.order_id = o.id
+                WHERE o.order_date BETWEEN ? AND ?
+                WINDOW w AS (PARTITION BY e.order_id ORDER BY e.ts, e.id)
+            ),
+            durations AS (
+                SELECT order_id, stage, (julianday(next_ts) - julianday(ts)) * 24 AS hours
+                FROM events
+                WHERE next_ts IS NOT NULL
+                UNION ALL
+                SELECT order_id, 'total', (julianday(ts) - julianday(first_ts)) * 24
+                FROM events
+                WHERE stage = 'completed'
+            ),
+            ranked AS (
+                SELECT os.service_id, d.stage, d.hours,
+                       ROW_NUMBER() OVER (PARTITION BY os.service_id, d.stage ORDER BY d.hours) AS rn,
+                       COUNT(*) OVER (PARTITION BY os.service_id, d.stage) AS cnt
+                FROM durations d
+                JOIN order_services os ON os.order_id = d.order_id
+            )
+            SELECT r.service_id, s.name as service_name, r.stage, MAX(r.cnt) AS orders_count,
+                   AVG(r.hours) AS avg_hours, {columns}
+            FROM ranked r
+            JOIN services s ON s.id = r.service_id
+            GROUP BY r.service_id, r.stage
+            ORDER BY s.name, r.service_id,
+                     CASE r.stage WHEN 'new' THEN 0 WHEN 'in_progress' THEN 1 WHEN 'total' THEN 3 ELSE 2 END
+        """, (date_from, date_to, *percentiles))
+        return [dict(row) for row in result]
+
+    @staticmethod
+    def _build_report_filters(date_from: str, date_to: str,
+                              filters: Dict = None) -> Tuple[str, List[Any]]:
+        """WHERE для отчетов по заказам (таблица orders с псевдонимом o, clients - c)"""
+        conditions = ["o.order_date BETWEEN ? AND ?"]
+        params: List[Any] = [date_from, date_to]
+        filters = filters or {}
+
+        status = filters.get('status')
+        if status:
+            if isinstance(status, (list, tuple, set)):
+                conditions.append(f"o.status IN ({', '.join('?' for _ in status)})")
+                params.extend(status)
+            else:
+                conditions.append("o.status = ?")
+                params.append(status)
+
+        if filters.get('client_type'):
+            conditions.append("c.client_type = ?")
+            params.append(filters['client_type'])
+
+        if filters.get('client_id'):
+            conditions.append("o.client_id = ?")
+            params.append(filters['client_id'])
+
+        if filters.get('service_id'):
+            conditions.append(
+                "EXISTS (SELECT 1 FROM order_services fs WHERE fs.order_id = o.id AND fs.service_id = ?)"
+            )
+            params.append(filters['service_id'])
+
+        if filters.get('amount_min') is not None:
+            conditions.append("o.total_amount >= ?")
+            params.append(filters['amount_min'])
+
+        if filters.get('amount_max') is not None:
+            conditions.append("o.total_amount <= ?")
+            params.append(filters['amount_max'])
+
+        return " AND ".join(conditions), params
+
+    def _report_query(self, date_from: str, date_to: str,
+                      filters: Dict = None) -> Tuple[str, Tuple]:
+        where, params = self._build_report_filters(date_from, date_to, filters)
+        query = f"{REPORT_QUERY} WHERE {where} ORDER BY o.order_date, o.vessel_code"
+        return query, tuple(params)
+
+    def get_report_data(self, date_from: str, date_to: str, filters: Dict = None) -> List[Dict]:
+        """Строки отчета за период; filters: status (строка или список), client_type,
+        client_id, service_id, amount_min, amount_max"""
+        query, params = self._report_query(date_from, date_to, filters)
+        result = self.execute_query(query, params)
+        return [dict(row) for row in result]
+
+    def get_report_data_page(self, date_from: str, date_to: str, filters: Dict = None,
+                             cursor: str = None, page_size: int = PAGE_SIZE,
+                             with_total: bool = False) -> Page:
+        """Страница строк get_report_data, ключ - (order_date, vessel_code)"""
+        where, params = self._build_report_filters(date_from, date_to, filters)
+        return self._keyset_page(
+            'report', REPORT_QUERY, where, params,
+            (('o.order_date', 'order_date'), ('o.vessel_code', 'vessel_code')),
+            cursor=cursor, page_size=page_size,
+            count_query="SELECT COUNT(*) FROM orders o LEFT JOIN clients c ON o.client_id = c.id"
+            if with_total else None
+        )
+
+    def iter_report_rows(self, date_from: str, date_to: str, filters: Dict = None,
+                         chunk_size: int = 500) -> Iterator[List[sqlite3.Row]]:
+        """Строки отчета порциями по chunk_size без преобразования в словари"""
+        query, params = self._report_query(date_from, date_to, filters)
+        return self.iter_query(query, params, chunk_size)
+
+    def iter_report_data(self, date_from: str, date_to: str, filters: Dict = None,
+                         chunk_size: int = 500) -> Iterator[List[Dict]]:
+        """То же, что get_report_data, но порциями по chunk_size строк"""
+        chunks = self.iter_report_rows(date_from, date_to, filters, chunk_size)
+        try:
+            for rows in chunks:
+                yield [dict(row) for row in rows]
+        finally:
+            chunks.close()
+
+    def count_report_rows(self, date_from: str, date_to: str, filters: Dict = None) -> int:
+        """Число строк отчета - оценка объема для индикатора прогресса"""
+        where, params = self._build_report_filters(date_from, date_to, filters)
+        query = f"""
+            SELECT COUNT(*)
             FROM orders o
             LEFT JOIN clients c ON o.client_id = c.id
-            LEFT JOIN order_services os ON o.id = os.order_id
-            LEFT JOIN services s ON os.service_id = s.id
-            WHERE o.order_date BETWEEN ? AND ?
-            GROUP BY o.id
-            ORDER BY o.order_date, o.vessel_code
+            WHERE {where}
         """
-        result = self.execute_query(query, (date_from, date_to))
-        return [dict(row) for row in result]
+        return self.execute_query(query, tuple(params))[0][0]
+
+    @staticmethod
+    def _build_rollup_filters(date_from: str, date_to: str, filters: Dict = None,
+                              alias: str = 'r') -> Tuple[str, List[Any]]:
+        """WHERE для таблиц суточных агрегатов по отборам ROLLUP_FILTERS"""
+        conditions = [f"{alias}.day BETWEEN ? AND ?"]
+        params: List[Any] = [date_from, date_to]
+        filters = filters or {}
+
+        status = filters.get('status')
+        if status:
+            if isinstance(status, (list, tuple, set)):
+                conditions.append(f"{alias}.status IN ({', '.join('?' for _ in status)})")
+                params.extend(status)
+            else:
+                conditions.append(f"{alias}.status = ?")
+                params.append(status)
+
+        if filters.get('client_type'):
+            conditions.append(f"{alias}.client_type = ?")
+            params.append(filters['client_type'])
+
+        return " AND ".join(conditions), params
+
+    @staticmethod
+    def _summarize_groups(rows: List[sqlite3.Row]) -> Dict:
+        """Сворачивает строки (status, client_type) в итоги по статусам и типам клиентов"""
+        def total(items: List[sqlite3.Row], **keys) -> Dict:
+            result = dict(keys)
+            result['orders_count'] = sum(row['orders_count'] for row in items)
+            result['revenue'] = sum(row['revenue_cents'] for row in items) / 100
+            result['services_count'] = sum(row['services_count'] for row in items)
+            return result
+
+        rows = [row for row in rows if row['orders_count']]
+        by_status = [total([row for row in rows if row['status'] == status], status=status)
+                     for status in sorted({row['status'] for row in rows})]
+        by_client_type = [total([row for row in rows if row['client_type'] == client_type], client_type=client_type)
+                          for client_type in sorted({row['client_type'] for row in rows})]
+
+        return {
+            'totals': total(rows),
+            'by_status': sorted(by_status, key=lambda item: -item['orders_count']),
+            'by_client_type': sorted(by_client_type, key=lambda item: -item['orders_count']),
+        }
+
+    def get_report_summary(self, date_from: str, date_to: str, filters: Dict = None) -> Dict:
+        """Итоги за период: totals, by_status, by_client_type, by_service.
+
+        При отборах только по status/client_type итоги берутся из суточных
+        агрегатов (order_daily_rollup, service_daily_rollup) - объем работы
+        зависит от числа дней, а не заказов. Прочие отборы считаются
+        агрегатным запросом по orders
+        """
+        filters = {key: value for key, value in (filters or {}).items()
+                   if value is not None and value != ''}
+        if set(filters) - set(ROLLUP_FILTERS):
+            return self._report_summary_from_orders(date_from, date_to, filters)
+
+        where, params = self._build_rollup_filters(date_from, date_to, filters)
+        groups = self.execute_query(f"""
+            SELECT r.status, r.client_type, SUM(r.orders_count) AS orders_count,
+                   SUM(r.revenue_cents) AS revenue_cents, SUM(r.services_count) AS services_count
+            FROM order_daily_rollup r
+            WHERE {where}
+            GROUP BY r.status, r.client_type
+        """, tuple(params))
+
+        services = self.execute_query(f"""
+            SELECT r.service_id, s.name AS service_name, SUM(r.orders_count) AS orders_count,
+                   SUM(r.quantity) AS quantity, SUM(r.revenue_cents) / 100.0 AS revenue
+            FROM service_daily_rollup r
+            LEFT JOIN services s ON s.id = r.service_id
+            WHERE {where}
+            GROUP BY r.service_id
+            HAVING SUM(r.orders_count) != 0
+            ORDER BY revenue DESC
+        """, tuple(params))
+
+        summary = self._summarize_groups(groups)
+        summary['by_service'] = [dict(row) for row in services]
+        return summary
+
+    def _report_summary_from_orders(self, date_from: str, date_to: str, filters: Dict) -> Dict:
+        where, params = self._build_report_filters(date_from, date_to, filters)
+        groups = self.execute_query(f"""
+            SELECT o.status, IFNULL(c.client_type, '') AS client_type, COUNT(*) AS orders_count,
+                   SUM(CAST(ROUND(o.total_amount * 100) AS INTEGER)) AS revenue_cents,
+                   SUM((SELECT COUNT(*) FROM order_services os WHERE os.order_id = o.id)) AS services_count
+            FROM orders o
+            LEFT JOIN clients c ON o.client_id = c.id
+            WHERE {where}
+            GROUP BY o.status, IFNULL(c.client_type, '')
+        """, tuple(params))
+
+        services = self.execute_query(f"""
+            SELECT os.service_id, s.name AS service_name, COUNT(*) AS orders_count,
+                   SUM(os.quantity) AS quantity,
+                   SUM(CAST(ROUND(os.quantity * os.unit_price * 100) AS INTEGER)) / 100.0 AS revenue
+            FROM orders o
+            LEFT JOIN clients c ON o.client_id = c.id
+            JOIN order_services os ON os.order_id = o.id
+            LEFT JOIN services s ON s.id = os.service_id
+            WHERE {where}
+            GROUP BY os.service_id
+            ORDER BY revenue DESC
+        """, tuple(params))
+
+        summary = self._summarize_groups(groups)
+        summary['by_service'] = [dict(row) for row in services]
+        return summary
+
+    def rebuild_report_rollup(self) -> None:
+        """Пересчитывает суточные агрегаты с нуля (после ручной правки данных)"""
+        with self.get_connection() as conn:
+            for statement in ROLLUP_REBUILD:
+                conn.execute(statement)
+            conn.commit()
 
 
 db_instance = Database()
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Пакетный импорт данных в БД Elma_OTK_App
+
+Запуск из корня проекта:
+    python import_data.py orders journal.csv --user manager1
+    python import_data.py orders journal.jsonl --user manager1 --errors rejected.csv
+    python import_data.py clients clients.xlsx --errors rejected.csv
+
+Формат файлов описан в utils.importers.OrderImporter и ClientImporter.
+"""
+
+import argparse
+import csv
+import sys
+
+from config import config
+from database import Database
+from utils.importers import OrderImporter, ClientImporter
+
+
+def write_errors(filename: str, rejected) -> None:
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(['line', 'error'])
+        writer.writerows(rejected)
+
+
+def report(result, args) -> int:
+    print(result.summary())
+    print(f"Время: {result.elapsed:.2f} с")
+
+    if args.errors and result.rejected:
+        write_errors(args.errors, result.rejected)
+        print(f"Отказы записаны в {args.errors}")
+    else:
+        for line, message in result.rejected[:args.show_errors]:
+            print(f"  строка {line}: {message}")
+        if len(result.rejected) > args.show_errors:
+            print(f"  ... еще {len(result.rejected) - args.show_errors}")
+
+    return 1 if result.rejected else 0
+
+
+def import_orders(args) -> int:
+    db = Database(args.db)
+    try:
+        user = db.get_user_info(args.user)
+        if not user:
+            print(f"Пользователь {args.user} не найден", file=sys.stderr)
+            return 2
+
+        importer = OrderImporter(db, user['id'], batch_size=args.batch_size)
+        result = importer.import_file(args.filename, args.format)
+    finally:
+        db.close()
+
+    return report(result, args)
+
+
+def import_clients(args) -> int:
+    db = Database(args.db)
+    try:
+        importer = ClientImporter(db, batch_size=args.batch_size)
+        result = importer.import_file(args.filename, args.format)
+    finally:
+        db.close()
+
+    return report(result, args)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--db', default=config.get_database_path(), help="файл БД")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    orders = subparsers.add_parser('orders', help="импорт заказов с услугами из CSV/JSONL")
+    orders.add_argument('filename')
+    orders.add_argument('--user', required=True, help="логин автора заказов (created_by)")
+    orders.add_argument('--format', choices=OrderImporter.FORMATS, help="по умолчанию - по расширению")
+    orders.add_argument('--batch-size', type=int, default=500)
+    orders.add_argument('--errors', help="CSV-файл для отказов")
+    orders.add_argument('--show-errors', type=int, default=20, help="сколько отказов вывести на экран")
+    orders.set_defaults(handler=import_orders)
+
+    clients = subparsers.add_parser('clients', help="импорт клиентов из CSV/XLSX")
+    clients.add_argument('filename')
+    clients.add_argument('--format', choices=ClientImporter.FORMATS, help="по умолчанию - по расширению")
+    clients.add_argument('--batch-size', type=int, default=1000)
+    clients.add_argument('--errors', help="CSV-файл для отказов")
+    clients.add_argument('--show-errors', type=int, default=20, help="сколько отказов вывести на экран")
+    clients.set_defaults(handler=import_clients)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
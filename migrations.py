@@ -0,0 +1,573 @@
+"""
+Миграции схемы базы данных приложения Elma_OTK_App
+Версия схемы хранится в PRAGMA user_version файла БД
+"""
+
+import sqlite3
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Шаг миграции: набор DDL и/или функция над курсором"""
+    version: int
+    description: str
+    statements: Tuple[str, ...] = ()
+    apply: Optional[Callable[[sqlite3.Cursor], None]] = None
+
+    def run(self, cursor: sqlite3.Cursor) -> None:
+        for statement in self.statements:
+            cursor.execute(statement)
+        if self.apply:
+            self.apply(cursor)
+
+
+def _insert_initial_data(cursor: sqlite3.Cursor) -> None:
+    # Существующие файлы БД могли быть заполнены до появления миграций
+    cursor.execute("SELECT COUNT(*) FROM users")
+    if cursor.fetchone()[0] == 0:
+        cursor.executemany(
+            "INSERT INTO users (username, password_hash, role, full_name) VALUES (?, ?, ?, ?)",
+            config.database.INITIAL_DATA['users']
+        )
+        logger.info("Начальные данные пользователей добавлены")
+
+    cursor.execute("SELECT COUNT(*) FROM services")
+    if cursor.fetchone()[0] == 0:
+        cursor.executemany(
+            "INSERT INTO services (name, description, price) VALUES (?, ?, ?)",
+            config.database.INITIAL_DATA['services']
+        )
+        logger.info("Начальные данные услуг добавлены")
+
+
+# Полнотекстовый индекс клиентов. Телефон хранится только цифрами (полный номер
+# и последние 10 цифр), "ё" приводится к "е" - так же нормализуется поисковый запрос
+CLIENTS_FTS_COLUMNS = ('company_name', 'full_name', 'inn', 'phone', 'email', 'address')
+
+
+def _fts_text(expr: str) -> str:
+    return f"replace(replace({expr}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _fts_phone(expr: str) -> str:
+    digits = expr
+    for char in (' ', '-', '(', ')', '+'):
+        digits = f"replace({digits}, '{char}', '')"
+    return f"{digits} || ' ' || substr({digits}, -10)"
+
+
+def _fts_values(prefix: str) -> str:
+    values = [
+        _fts_phone(f"{prefix}.{column}") if column == 'phone' else _fts_text(f"{prefix}.{column}")
+        for column in CLIENTS_FTS_COLUMNS
+    ]
+    return ", ".join(values)
+
+
+_FTS_INSERT = (f"INSERT INTO clients_fts (rowid, {', '.join(CLIENTS_FTS_COLUMNS)}) "
+               f"VALUES (new.id, {_fts_values('new')});")
+
+
+# Суточные агрегаты для итогов отчетов. Суммы хранятся в копейках (целые),
+# чтобы приращения триггеров не накапливали ошибку округления
+def _cents(expr: str) -> str:
+    return f"CAST(ROUND(({expr}) * 100) AS INTEGER)"
+
+
+def _client_type(order: str) -> str:
+    return f"IFNULL((SELECT client_type FROM clients WHERE id = {order}.client_id), '')"
+
+
+_ORDER_ROLLUP_UPSERT = """
+    ON CONFLICT (day, status, client_type) DO UPDATE SET
+        orders_count = orders_count + excluded.orders_count,
+        revenue_cents = revenue_cents + excluded.revenue_cents,
+        services_count = services_count + excluded.services_count;
+"""
+
+_SERVICE_ROLLUP_UPSERT = """
+    ON CONFLICT (day, status, client_type, service_id) DO UPDATE SET
+        orders_count = orders_count + excluded.orders_count,
+        quantity = quantity + excluded.quantity,
+        revenue_cents = revenue_cents + excluded.revenue_cents;
+"""
+
+
+def _order_rollup_delta(order: str, sign: str) -> str:
+    """Вклад заказа (new/old) в order_daily_rollup со знаком sign"""
+    return f"""
+        INSERT INTO order_daily_rollup (day, status, client_type, orders_count, revenue_cents, services_count)
+        SELECT {order}.order_date, {order}.status, {_client_type(order)}, {sign}1,
+               {sign}{_cents(f"{order}.total_amount")},
+               {sign}(SELECT COUNT(*) FROM order_services WHERE order_id = {order}.id)
+        WHERE 1
+        {_ORDER_ROLLUP_UPSERT}
+    """
+
+
+def _order_services_rollup_delta(order: str, sign: str) -> str:
+    """Вклад всех услуг заказа (new/old) в service_daily_rollup со знаком sign"""
+    return f"""
+        INSERT INTO service_daily_rollup (day, status, client_type, service_id, orders_count, quantity, revenue_cents)
+        SELECT {order}.order_date, {order}.status, {_client_type(order)}, os.service_id, {sign}1,
+               {sign}os.quantity, {sign}{_cents("os.quantity * os.unit_price")}
+        FROM order_services os
+        WHERE os.order_id = {order}.id
+        {_SERVICE_ROLLUP_UPSERT}
+    """
+
+
+def _line_rollup_delta(line: str, sign: str) -> str:
+    """Вклад строки order_services (new/old) в оба агрегата со знаком sign.
+
+    Если заказа уже нет (каскадное удаление), ничего не меняется - вклад
+    его строк вычитается триггером удаления заказа
+    """
+    return f"""
+        INSERT INTO order_daily_rollup (day, status, client_type, orders_count, revenue_cents, services_count)
+        SELECT o.order_date, o.status, {_client_type("o")}, 0, 0, {sign}1
+        FROM orders o
+        WHERE o.id = {line}.order_id
+        {_ORDER_ROLLUP_UPSERT}
+        INSERT INTO service_daily_rollup (day, status, client_type, service_id, orders_count, quantity, revenue_cents)
+        SELECT o.order_date, o.status, {_client_type("o")}, {line}.service_id, {sign}1,
+               {sign}{line}.quantity, {sign}{_cents(f"{line}.quantity * {line}.unit_price")}
+        FROM orders o
+        WHERE o.id = {line}.order_id
+        {_SERVICE_ROLLUP_UPSERT}
+    """
+
+
+def _client_rollup_delta(client_type: str, sign: str) -> str:
+    """Перенос всех заказов клиента old.id в корзину client_type со знаком sign"""
+    return f"""
+        INSERT INTO order_daily_rollup (day, status, client_type, orders_count, revenue_cents, services_count)
+        SELECT o.order_date, o.status, IFNULL({client_type}, ''), {sign}COUNT(*),
+               {sign}SUM({_cents("o.total_amount")}),
+               {sign}SUM((SELECT COUNT(*) FROM order_services WHERE order_id = o.id))
+        FROM orders o
+        WHERE o.client_id = old.id
+        GROUP BY o.order_date, o.status
+        {_ORDER_ROLLUP_UPSERT}
+        INSERT INTO service_daily_rollup (day, status, client_type, service_id, orders_count, quantity, revenue_cents)
+        SELECT o.order_date, o.status, IFNULL({client_type}, ''), os.service_id, {sign}COUNT(*),
+               {sign}SUM(os.quantity), {sign}SUM({_cents("os.quantity * os.unit_price")})
+        FROM orders o
+        JOIN order_services os ON os.order_id = o.id
+        WHERE o.client_id = old.id
+        GROUP BY o.order_date, o.status, os.service_id
+        {_SERVICE_ROLLUP_UPSERT}
+    """
+
+
+# Полный пересчет агрегатов из orders/order_services
+ROLLUP_REBUILD = (
+    "DELETE FROM order_daily_rollup",
+    "DELETE FROM service_daily_rollup",
+    f"""
+    INSERT INTO order_daily_rollup (day, status, client_type, orders_count, revenue_cents, services_count)
+    SELECT o.order_date, o.status, IFNULL(c.client_type, ''), COUNT(*), SUM({_cents("o.total_amount")}),
+           SUM((SELECT COUNT(*) FROM order_services WHERE order_id = o.id))
+    FROM orders o
+    LEFT JOIN clients c ON c.id = o.client_id
+    GROUP BY o.order_date, o.status, IFNULL(c.client_type, '')
+    """,
+    f"""
+    INSERT INTO service_daily_rollup (day, status, client_type, service_id, orders_count, quantity, revenue_cents)
+    SELECT o.order_date, o.status, IFNULL(c.client_type, ''), os.service_id, COUNT(*), SUM(os.quantity),
+           SUM({_cents("os.quantity * os.unit_price")})
+    FROM orders o
+    JOIN order_services os ON os.order_id = o.id
+    LEFT JOIN clients c ON c.id = o.client_id
+    GROUP BY o.order_date, o.status, IFNULL(c.client_type, ''), os.service_id
+    """
+)
+
+
+# Коды сосудов вида VS000123: номер после префикса "VS"
+def _is_vessel_code(expr: str) -> str:
+    return f"({expr} GLOB 'VS[0-9]*' AND substr({expr}, 3) NOT GLOB '*[^0-9]*')"
+
+
+def _vessel_code_number(expr: str) -> str:
+    return f"CAST(substr({expr}, 3) AS INTEGER)"
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        description="Базовая схема",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                role TEXT NOT NULL CHECK(role IN ('manager', 'lab_assistant', 'controller')),
+                full_name TEXT NOT NULL,
+                is_active BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS clients (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                client_type TEXT NOT NULL CHECK(client_type IN ('legal', 'individual')),
+                company_name TEXT,
+                address TEXT,
+                inn TEXT UNIQUE,
+                bank_account TEXT,
+                bik TEXT,
+                director_name TEXT,
+                contact_person TEXT,
+                full_name TEXT,
+                birth_date DATE,
+                passport_series TEXT,
+                passport_number TEXT,
+                phone TEXT NOT NULL,
+                email TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS services (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT,
+                price DECIMAL(10, 2) NOT NULL,
+                is_active BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS orders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                vessel_code TEXT UNIQUE NOT NULL,
+                client_id INTEGER NOT NULL,
+                order_date DATE NOT NULL,
+                total_amount DECIMAL(10, 2) NOT NULL,
+                status TEXT DEFAULT 'new' CHECK(status IN ('new', 'in_progress', 'completed', 'cancelled')),
+                created_by INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP,
+                FOREIGN KEY (client_id) REFERENCES clients (id),
+                FOREIGN KEY (created_by) REFERENCES users (id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS order_services (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id INTEGER NOT NULL,
+                service_id INTEGER NOT NULL,
+                quantity INTEGER DEFAULT 1,
+                unit_price DECIMAL(10, 2) NOT NULL,
+                FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE,
+                FOREIGN KEY (service_id) REFERENCES services (id),
+                UNIQUE(order_id, service_id)
+            )
+            """
+        ),
+        apply=_insert_initial_data
+    ),
+    Migration(
+        version=2,
+        description="Индексы под запросы заказов, отчетов и клиентов",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_orders_date_status ON orders (order_date, status)",
+            "CREATE INDEX IF NOT EXISTS idx_orders_status_date ON orders (status, order_date)",
+            "CREATE INDEX IF NOT EXISTS idx_order_services_covering "
+            "ON order_services (order_id, service_id, quantity, unit_price)",
+            "CREATE INDEX IF NOT EXISTS idx_clients_type_name "
+            "ON clients (client_type, company_name, full_name)"
+        )
+    ),
+    Migration(
+        version=3,
+        description="Полнотекстовый поиск клиентов (FTS5)",
+        statements=(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5(
+                {', '.join(CLIENTS_FTS_COLUMNS)},
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS clients_fts_insert AFTER INSERT ON clients BEGIN
+                {_FTS_INSERT}
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS clients_fts_delete AFTER DELETE ON clients BEGIN
+                DELETE FROM clients_fts WHERE rowid = old.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS clients_fts_update
+            AFTER UPDATE OF {', '.join(CLIENTS_FTS_COLUMNS)} ON clients BEGIN
+                DELETE FROM clients_fts WHERE rowid = old.id;
+                {_FTS_INSERT}
+            END
+            """,
+            "DELETE FROM clients_fts",
+            f"""
+            INSERT INTO clients_fts (rowid, {', '.join(CLIENTS_FTS_COLUMNS)})
+            SELECT id, {_fts_values('clients')} FROM clients
+            """
+        )
+    ),
+    Migration(
+        version=4,
+        description="Ключ сортировки клиентов для постраничной выборки",
+        statements=(
+            # Порядок как у ORDER BY company_name, full_name, но без NULL,
+            # чтобы работало сравнение (sort_name, id) > (?, ?)
+            "ALTER TABLE clients ADD COLUMN sort_name TEXT GENERATED ALWAYS AS "
+            "(IFNULL(company_name, '') || char(31) || IFNULL(full_name, '')) VIRTUAL",
+            "DROP INDEX IF EXISTS idx_clients_type_name",
+            "CREATE INDEX IF NOT EXISTS idx_clients_sort ON clients (sort_name)",
+            "CREATE INDEX IF NOT EXISTS idx_clients_type_sort ON clients (client_type, sort_name)"
+        )
+    ),
+    Migration(
+        version=5,
+        description="Индекс заказов по клиенту для отчетов",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_orders_client_date ON orders (client_id, order_date)",
+        )
+    ),
+    Migration(
+        version=6,
+        description="Суточные агрегаты заказов и услуг для итогов отчетов",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS order_daily_rollup (
+                day DATE NOT NULL,
+                status TEXT NOT NULL,
+                client_type TEXT NOT NULL,
+                orders_count INTEGER NOT NULL DEFAULT 0,
+                revenue_cents INTEGER NOT NULL DEFAULT 0,
+                services_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, status, client_type)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS service_daily_rollup (
+                day DATE NOT NULL,
+                status TEXT NOT NULL,
+                client_type TEXT NOT NULL,
+                service_id INTEGER NOT NULL,
+                orders_count INTEGER NOT NULL DEFAULT 0,
+                quantity INTEGER NOT NULL DEFAULT 0,
+                revenue_cents INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, status, client_type, service_id)
+            ) WITHOUT ROWID
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS orders_rollup_insert AFTER INSERT ON orders BEGIN
+                {_order_rollup_delta('new', '+')}
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS orders_rollup_update
+            AFTER UPDATE OF order_date, status, client_id, total_amount ON orders
+            WHEN old.order_date IS NOT new.order_date OR old.status IS NOT new.status
+                OR old.client_id IS NOT new.client_id OR old.total_amount IS NOT new.total_amount
+            BEGIN
+                {_order_rollup_delta('old', '-')}
+                {_order_rollup_delta('new', '+')}
+                {_order_services_rollup_delta('old', '-')}
+                {_order_services_rollup_delta('new', '+')}
+            END
+            """,
+            # BEFORE: строки order_services еще на месте, каскад их удаления уже ничего не вычитает
+            f"""
+            CREATE TRIGGER IF NOT EXISTS orders_rollup_delete BEFORE DELETE ON orders BEGIN
+                {_order_rollup_delta('old', '-')}
+                {_order_services_rollup_delta('old', '-')}
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS order_services_rollup_insert AFTER INSERT ON order_services BEGIN
+                {_line_rollup_delta('new', '+')}
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS order_services_rollup_delete AFTER DELETE ON order_services BEGIN
+                {_line_rollup_delta('old', '-')}
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS order_services_rollup_update
+            AFTER UPDATE OF order_id, service_id, quantity, unit_price ON order_services BEGIN
+                {_line_rollup_delta('old', '-')}
+                {_line_rollup_delta('new', '+')}
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS clients_rollup_update AFTER UPDATE OF client_type ON clients
+            WHEN old.client_type IS NOT new.client_type BEGIN
+                {_client_rollup_delta('old.client_type', '-')}
+                {_client_rollup_delta('new.client_type', '+')}
+            END
+            """,
+        ) + ROLLUP_REBUILD
+    ),
+    Migration(
+        version=7,
+        description="Индекс клиентов по паспорту для проверки дублей при импорте",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_clients_passport ON clients (passport_series, passport_number)",
+        )
+    ),
+    Migration(
+        version=8,
+        description="Последовательность кодов сосудов",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS sequences (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """,
+            # Стартовое значение - наибольший номер среди id и кодов вида VS<цифры>
+            f"""
+            INSERT OR IGNORE INTO sequences (name, value)
+            SELECT 'vessel_code', MAX(IFNULL((SELECT MAX(id) FROM orders), 0),
+                                      IFNULL((SELECT MAX({_vessel_code_number('vessel_code')}) FROM orders
+                                              WHERE {_is_vessel_code('vessel_code')}), 0))
+            """,
+            # Коды, заданные вручную или при импорте, сдвигают последовательность вперед
+            f"""
+            CREATE TRIGGER IF NOT EXISTS orders_vessel_code_sequence AFTER INSERT ON orders
+            WHEN {_is_vessel_code('new.vessel_code')}
+            BEGIN
+                UPDATE sequences SET value = {_vessel_code_number('new.vessel_code')}
+                WHERE name = 'vessel_code' AND value < {_vessel_code_number('new.vessel_code')};
+            END
+            """,
+        )
+    ),
+    Migration(
+        version=9,
+        description="Индекс заказов по дате для постраничного списка",
+        statements=(
+            # (order_date, rowid) - порядок ORDER BY order_date DESC, id DESC без сортировки
+            "CREATE INDEX IF NOT EXISTS idx_orders_date ON orders (order_date)",
+        )
+    ),
+    Migration(
+        version=10,
+        description="История статусов заказов",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS order_status_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id INTEGER NOT NULL,
+                from_status TEXT,
+                to_status TEXT NOT NULL,
+                ts TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                changed_by INTEGER,
+                FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE,
+                FOREIGN KEY (changed_by) REFERENCES users (id)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_order_status_events_order_ts ON order_status_events (order_id, ts)",
+            # Журнал только дополняется; строки удаляются лишь вместе с заказом
+            """
+            CREATE TRIGGER IF NOT EXISTS order_status_events_no_update BEFORE UPDATE ON order_status_events
+            BEGIN
+                SELECT RAISE(ABORT, 'История статусов заказа не изменяется');
+            END
+            """,
+            # События нового заказа (create_order, импорт, прямой INSERT) - как при переносе ниже:
+            # 'new' на момент создания и 'completed' на completed_at, если заказ вставлен завершенным.
+            # Смены статуса пишет Database.update_orders_status
+            """
+            CREATE TRIGGER IF NOT EXISTS orders_status_event_insert AFTER INSERT ON orders
+            BEGIN
+                INSERT INTO order_status_events (order_id, from_status, to_status, ts, changed_by)
+                VALUES (new.id, NULL,
+                        CASE WHEN new.status = 'completed' AND new.completed_at IS NOT NULL THEN 'new'
+                             ELSE IFNULL(new.status, 'new') END,
+                        CASE WHEN new.completed_at < new.created_at THEN new.order_date
+                             ELSE IFNULL(new.created_at, CURRENT_TIMESTAMP) END,
+                        new.created_by);
+                INSERT INTO order_status_events (order_id, from_status, to_status, ts)
+                SELECT new.id, 'new', 'completed', new.completed_at
+                WHERE new.status = 'completed' AND new.completed_at IS NOT NULL;
+            END
+            """,
+            # Существующие заказы: известны только created_at и completed_at. Заказ не в статусе
+            # 'new' без completed_at получает одно событие текущего статуса на момент создания.
+            # Импортированный заказ создан позже, чем завершен, - его начало берется из order_date
+            """
+            INSERT INTO order_status_events (order_id, from_status, to_status, ts, changed_by)
+            SELECT id, NULL, CASE WHEN status = 'completed' AND completed_at IS NOT NULL THEN 'new' ELSE status END,
+                   CASE WHEN completed_at < created_at THEN order_date ELSE IFNULL(created_at, order_date) END,
+                   created_by
+            FROM orders
+            """,
+            """
+            INSERT INTO order_status_events (order_id, from_status, to_status, ts)
+            SELECT id, 'new', 'completed', completed_at
+            FROM orders
+            WHERE status = 'completed' AND completed_at IS NOT NULL
+            """,
+        )
+    ),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target_version: int = None,
+            migrations: List[Migration] = None) -> int:
+    """Применяет недостающие миграции в одной транзакции, возвращает версию схемы"""
+    migrations = sorted(migrations if migrations is not None else MIGRATIONS,
+                        key=lambda m: m.version)
+    if target_version is None:
+        target_version = config.database.DATABASE_VERSION
+
+    # Быстрый путь: схема актуальна, никакого DDL
+    current = get_schema_version(conn)
+    if current == target_version:
+        return current
+
+    if not migrations or target_version > migrations[-1].version:
+        raise ValueError(f"Нет миграции до версии схемы {target_version}")
+
+    # Миграции идут в собственной транзакции: открытую вызывающим кодом не фиксируем молча
+    if conn.in_transaction:
+        raise sqlite3.ProgrammingError("Миграция внутри уже открытой транзакции")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Перечитываем под блокировкой: другой процесс мог успеть мигрировать
+        current = get_schema_version(conn)
+        if current > target_version:
+            raise sqlite3.DatabaseError(
+                f"Версия схемы БД ({current}) новее версии приложения ({target_version})"
+            )
+
+        cursor = conn.cursor()
+        for migration in migrations:
+            if current < migration.version <= target_version:
+                logger.info(f"Миграция БД до версии {migration.version}: {migration.description}")
+                migration.run(cursor)
+
+        cursor.execute(f"PRAGMA user_version = {int(target_version)}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return target_version
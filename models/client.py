@@ -118,13 +118,13 @@ class Client:
                 if not is_valid:
                     return False, msg
 
-            if self.bank_account:
-                is_valid, msg = validators.validate_bank_account(self.bank_account)
+            if self.bik:
+                is_valid, msg = validators.validate_bik(self.bik)
                 if not is_valid:
                     return False, msg
 
-            if self.bik:
-                is_valid, msg = validators.validate_bik(self.bik)
+            if self.bank_account:
+                is_valid, msg = validators.validate_bank_account(self.bank_account, self.bik)
                 if not is_valid:
                     return False, msg
 
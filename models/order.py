@@ -15,6 +15,16 @@ class OrderItem:
     def total_price(self) -> Decimal:
         return self.unit_price * self.quantity
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'OrderItem':
+        return cls(
+            service_id=data['service_id'],
+            service_name=data.get('service_name', ''),
+            description=data.get('description', ''),
+            quantity=data.get('quantity', 1),
+            unit_price=Decimal(str(data.get('unit_price', '0.00')))
+        )
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             'service_id': self.service_id,
@@ -47,6 +57,13 @@ class Order:
         'cancelled': 'Отменен'
     }
 
+    # Целевой статус -> статусы, из которых в него можно перейти
+    STATUS_TRANSITIONS = {
+        'in_progress': ('new',),
+        'completed': ('new', 'in_progress'),
+        'cancelled': ('new', 'in_progress')
+    }
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Order':
         order = cls(
@@ -64,15 +81,7 @@ class Order:
         )
 
         if 'services' in data:
-            for service_data in data['services']:
-                item = OrderItem(
-                    service_id=service_data['service_id'],
-                    service_name=service_data.get('service_name', ''),
-                    description=service_data.get('description', ''),
-                    quantity=service_data.get('quantity', 1),
-                    unit_price=Decimal(str(service_data.get('unit_price', '0.00')))
-                )
-                order.items.append(item)
+            order.items.extend(OrderItem.from_dict(service_data) for service_data in data['services'])
 
         return order
 
@@ -142,13 +151,17 @@ class Order:
     def can_edit(self) -> bool:
         return self.status in ['new', 'in_progress']
 
+    @property
+    def can_start(self) -> bool:
+        return self.status in self.STATUS_TRANSITIONS['in_progress']
+
     @property
     def can_complete(self) -> bool:
-        return self.status in ['new', 'in_progress'] and self.items_count > 0
+        return self.status in self.STATUS_TRANSITIONS['completed'] and self.items_count > 0
 
     @property
     def can_cancel(self) -> bool:
-        return self.status in ['new', 'in_progress']
+        return self.status in self.STATUS_TRANSITIONS['cancelled']
 
     def validate(self) -> tuple[bool, str]:
         from utils.validators import validators
@@ -5,6 +5,14 @@
 from .test_auth import TestAuthManager
 from .test_models import TestOrderItem, TestOrder, TestClient, TestService
 from .test_validators import TestValidators
+from .test_database import (TestConnectionPool, TestStorageProfile, TestQueryPlans,
+                            TestClientSearch, TestClientPaging, TestOrderPaging, TestOrdersWithServices,
+                            TestOrderStatusTransitions, TestOrderStatusEvents,
+                            TestReportQuery, TestReportSummary, TestVesselCodeSequence, TestMigrations)
+from .test_workers import TestStreamQueryWorker
+from .test_exporters import TestCsvExport, TestXlsxExport, TestColumnarExport, TestPdfExport
+from .test_importers import TestOrderImport, TestClientImport
+from .test_views import TestClientViewSearch
 
 __all__ = [
     'TestAuthManager',
@@ -12,5 +20,26 @@ __all__ = [
     'TestOrder',
     'TestClient',
     'TestService',
-    'TestValidators'
+    'TestValidators',
+    'TestConnectionPool',
+    'TestStorageProfile',
+    'TestQueryPlans',
+    'TestClientSearch',
+    'TestClientPaging',
+    'TestOrderPaging',
+    'TestOrdersWithServices',
+    'TestOrderStatusTransitions',
+    'TestOrderStatusEvents',
+    'TestReportQuery',
+    'TestReportSummary',
+    'TestVesselCodeSequence',
+    'TestMigrations',
+    'TestStreamQueryWorker',
+    'TestCsvExport',
+    'TestXlsxExport',
+    'TestColumnarExport',
+    'TestPdfExport',
+    'TestOrderImport',
+    'TestClientImport',
+    'TestClientViewSearch'
 ]
\ No newline at end of file
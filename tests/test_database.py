@@ -0,0 +1,993 @@
+import unittest
+from unittest import mock
+import tempfile
+import threading
+import os
+import re
+import sqlite3
+from config import config
+from database import Database, ConnectionPool, encode_cursor
+from models.order import Order
+from migrations import Migration, MIGRATIONS, migrate, get_schema_version
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.db = Database(self.db_path)
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_db.close()
+        os.unlink(self.db_path)
+
+    def test_connection_reused(self):
+        before = self.db.pool_stats()
+
+        for _ in range(10):
+            self.db.user_exists('manager1')
+
+        stats = self.db.pool_stats()
+        self.assertEqual(stats['open'], 1)
+        self.assertEqual(stats['in_use'], 0)
+        self.assertEqual(stats['hits'] - before['hits'], 10)
+        self.assertEqual(stats['misses'], before['misses'])
+
+    def test_pragmas_applied(self):
+        with self.db.get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+            self.assertIs(conn.row_factory, sqlite3.Row)
+
+    def test_nested_connection_same_thread(self):
+        with self.db.get_connection() as outer:
+            with self.db.get_connection() as inner:
+                self.assertIs(outer, inner)
+            self.assertEqual(self.db.pool_stats()['in_use'], 1)
+
+    def test_rollback_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.get_connection() as conn:
+                conn.execute("DELETE FROM users")
+                raise RuntimeError("fail")
+
+        self.assertTrue(self.db.user_exists('manager1'))
+
+    def test_abandoned_stream(self):
+        query = "SELECT u.id FROM users u, users a, users b"
+        chunks = self.db.iter_query(query, chunk_size=1)
+        next(chunks)
+
+        # Поток не привязан к соединению выборки: обычные вызовы получают другое
+        with self.db.get_connection() as conn:
+            self.assertEqual(self.db.pool_stats()['in_use'], 2)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 3)
+
+        # Недочитанный генератор закрывается в другом потоке
+        thread = threading.Thread(target=chunks.close)
+        thread.start()
+        thread.join()
+
+        stats = self.db.pool_stats()
+        self.assertEqual(stats['in_use'], 0)
+        self.assertIsNone(getattr(self.db.pool._local, 'conn', None))
+        with self.db.get_connection() as first, self.db.get_connection() as second:
+            self.assertIs(first, second)
+            self.assertEqual(self.db.pool_stats()['in_use'], 1)
+
+    def test_bounded_size_and_wait(self):
+        pool = ConnectionPool(self.db_path, max_size=1, timeout=0.1)
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def holder():
+            with pool.connection():
+                acquired.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        acquired.wait(5)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            with pool.connection():
+                pass
+
+        release.set()
+        thread.join()
+
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT 1").fetchone()[0], 1)
+
+        stats = pool.stats()
+        self.assertEqual(stats['open'], 1)
+        self.assertEqual(stats['waits'], 1)
+        pool.close()
+
+
+class TestStorageProfile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'test.db')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_wal_profile(self):
+        db = Database(self.db_path, storage_profile='wal')
+        with db.get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+        db.close()
+
+    def test_rollback_profile(self):
+        db = Database(self.db_path, storage_profile='rollback')
+        with db.get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 2)
+        db.close()
+
+    def test_default_profile(self):
+        # БД может лежать на сетевом диске - WAL включается только явно
+        db = Database(self.db_path)
+        with db.get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+        db.close()
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            Database(self.db_path, storage_profile='unknown')
+
+
+class TestQueryPlans(unittest.TestCase):
+    """Запросы списков и отчетов не должны деградировать до полного сканирования"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def get_plans(self, method, *args):
+        statements = []
+        with self.db.get_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                method(*args)
+            finally:
+                conn.set_trace_callback(None)
+
+            plans = []
+            for sql in statements:
+                # Служебные запросы FTS5 к теневым таблицам *_fts_config/_data/...
+                if re.search(r"_fts_(config|data|idx|docsize|content)\b", sql):
+                    continue
+                if sql.lstrip().upper().startswith('SELECT'):
+                    rows = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+                    plans.append([row['detail'] for row in rows])
+            return plans
+
+    def assert_no_scan(self, method, *args, allow_sort=False):
+        plans = self.get_plans(method, *args)
+        self.assertTrue(plans)
+        for plan in plans:
+            for detail in plan:
+                with self.subTest(method=method.__name__, detail=detail):
+                    # Поиск по FTS5 выглядит как SCAN виртуальной таблицы
+                    if 'VIRTUAL TABLE' not in detail:
+                        self.assertFalse(detail.startswith('SCAN'), "\n".join(plan))
+                    if not allow_sort:
+                        self.assertNotEqual(detail, 'USE TEMP B-TREE FOR ORDER BY', "\n".join(plan))
+
+    def test_get_orders_by_date(self):
+        self.assert_no_scan(self.db.get_orders, {'date_from': '2024-01-01', 'date_to': '2024-12-31'})
+
+    def test_get_orders_by_status(self):
+        self.assert_no_scan(self.db.get_orders, {'status': 'new'})
+
+    def test_get_orders_by_date_and_status(self):
+        self.assert_no_scan(self.db.get_orders, {
+            'date_from': '2024-01-01', 'date_to': '2024-12-31', 'status': 'completed'
+        })
+
+    def test_get_report_data(self):
+        self.assert_no_scan(self.db.get_report_data, '2024-01-01', '2024-12-31')
+
+    def test_get_report_data_filtered(self):
+        self.assert_no_scan(self.db.get_report_data, '2024-01-01', '2024-12-31', {'status': 'completed'})
+        self.assert_no_scan(self.db.get_report_data, '2024-01-01', '2024-12-31', {'client_id': 1})
+        # При отборе по типу клиента планировщик может начать с clients и досортировать результат
+        self.assert_no_scan(self.db.get_report_data, '2024-01-01', '2024-12-31', {
+            'client_type': 'legal', 'service_id': 2, 'amount_min': 1000, 'amount_max': 50000
+        }, allow_sort=True)
+
+    def test_get_order_details(self):
+        self.assert_no_scan(self.db.get_order_details, 1)
+
+    def test_orders_with_services(self):
+        self.assert_no_scan(self.db.get_orders_with_services, [3, 1, 2])
+
+    def test_clients_by_type(self):
+        self.assert_no_scan(self.db.get_clients, 'legal')
+
+    def test_clients_page(self):
+        cursor = encode_cursor('clients', ['Б', 10])
+        self.assert_no_scan(self.db.get_clients_page, None, cursor, 50)
+        self.assert_no_scan(self.db.get_clients_page, 'legal', cursor, 50)
+
+    def test_orders_page(self):
+        cursor = encode_cursor('orders', ['2024-06-01', 10])
+        self.assert_no_scan(self.db.get_orders_page, None, cursor, 50)
+        self.assert_no_scan(self.db.get_orders_page, {'status': 'new'}, cursor, 50)
+        self.assert_no_scan(self.db.get_orders_page, {'date_from': '2024-01-01', 'date_to': '2024-12-31'},
+                            cursor, 50)
+
+    def test_report_data_page(self):
+        cursor = encode_cursor('report', ['2024-06-01', 'VS000010'])
+        self.assert_no_scan(self.db.get_report_data_page, '2024-01-01', '2024-12-31', None, cursor, 50)
+        self.assert_no_scan(self.db.get_report_data_page, '2024-01-01', '2024-12-31', {'status': 'new'},
+                            cursor, 50)
+
+    def test_search_clients(self):
+        # Сортировка по релевантности выполняется только над найденными строками
+        self.assert_no_scan(self.db.search_clients, 'Иванов', allow_sort=True)
+        self.assert_no_scan(self.db.search_clients, 'Иванов', 'individual', allow_sort=True)
+        self.assert_no_scan(self.db.search_clients_page, 'Иванов', None,
+                            encode_cursor('search', [-1.5, 'Иванов', 10]), 50, allow_sort=True)
+
+
+class TestClientSearch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        self.legal_id = self.db.create_client({
+            'client_type': 'legal',
+            'company_name': 'ООО «Ёлка»',
+            'inn': '7707083893',
+            'phone': '+7 (912) 345-67-89',
+            'address': 'Санкт-Петербург, Невский пр., 1'
+        })
+        self.individual_id = self.db.create_client({
+            'client_type': 'individual',
+            'full_name': 'Иванов Пётр Сергеевич',
+            'phone': '8 921 000-11-22',
+            'email': 'petrov@mail.ru'
+        })
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def search_ids(self, term, client_type=None):
+        return [client['id'] for client in self.db.search_clients(term, client_type)]
+
+    def test_prefix_search(self):
+        test_cases = [
+            ("елк", [self.legal_id]),
+            ("Ёлка", [self.legal_id]),
+            ("петр серг", [self.individual_id]),
+            ("7707", [self.legal_id]),
+            ("невск", [self.legal_id]),
+            ("petrov", [self.individual_id]),
+            ("Сидоров", [])
+        ]
+
+        for term, expected in test_cases:
+            with self.subTest(term=term):
+                self.assertEqual(self.search_ids(term), expected)
+
+    def test_phone_search(self):
+        self.assertEqual(self.search_ids("+7 (912) 345"), [self.legal_id])
+        self.assertEqual(self.search_ids("921000"), [self.individual_id])
+
+    def test_client_type_filter(self):
+        self.assertEqual(self.search_ids("Иванов", 'legal'), [])
+        self.assertEqual(self.search_ids("Иванов", 'individual'), [self.individual_id])
+
+    def test_index_follows_updates(self):
+        self.db.execute_update("UPDATE clients SET company_name = ? WHERE id = ?",
+                               ('ЗАО «Береза»', self.legal_id))
+        self.assertEqual(self.search_ids("елка"), [])
+        self.assertEqual(self.search_ids("берез"), [self.legal_id])
+
+        self.db.execute_update("DELETE FROM clients WHERE id = ?", (self.individual_id,))
+        self.assertEqual(self.search_ids("Иванов"), [])
+
+    def test_special_characters(self):
+        self.assertEqual(self.search_ids('"*) OR'), [])
+
+    def test_search_pages(self):
+        for i in range(5):
+            self.db.create_client({'client_type': 'legal', 'company_name': f"ООО «Иванов и {i % 2}»",
+                                   'phone': '79123456789'})
+
+        for term in ("Иванов", ""):
+            with self.subTest(term=term):
+                expected = [client['id'] for client in self.db.search_clients(term)]
+                pages = list(self.db.iter_pages(self.db.search_clients_page, term, page_size=2))
+                self.assertEqual([client['id'] for page in pages for client in page], expected)
+                self.assertEqual(self.db.search_clients_page(term, with_total=True).total, len(expected))
+
+
+class TestClientPaging(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        for i in range(25):
+            self.db.create_client({'client_type': 'legal', 'company_name': f"ООО «Компания {i % 7}»",
+                                   'phone': '79123456789'})
+            self.db.create_client({'client_type': 'individual', 'full_name': f"Клиент {i % 5}",
+                                   'phone': '79123456789'})
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def collect_pages(self, client_type=None, page_size=7):
+        ids = []
+        cursor = None
+        while True:
+            page = self.db.get_clients_page(client_type, cursor, page_size)
+            self.assertLessEqual(len(page.items), page_size)
+            ids.extend(client['id'] for client in page.items)
+            if page.next_cursor is None:
+                return ids
+            cursor = page.next_cursor
+
+    def test_pages_match_full_list(self):
+        for client_type in (None, 'legal', 'individual'):
+            with self.subTest(client_type=client_type):
+                expected = [client['id'] for client in self.db.get_clients(client_type)]
+                self.assertEqual(self.collect_pages(client_type), expected)
+
+    def test_total_and_last_page(self):
+        page = self.db.get_clients_page('legal', page_size=25, with_total=True)
+        self.assertEqual((len(page.items), page.next_cursor, page.total), (25, None, 25))
+        self.assertIsNone(self.db.get_clients_page(page_size=10).total)
+
+    def test_invalid_cursor(self):
+        for cursor in ("не курсор", encode_cursor('orders', ['2024-01-01', 1]), encode_cursor('clients', ['Б'])):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    self.db.get_clients_page(cursor=cursor)
+        with self.assertRaises(ValueError):
+            self.db.get_clients_page(page_size=0)
+
+    def test_individuals_before_companies(self):
+        clients = self.db.get_clients()
+        self.assertEqual(clients[0]['client_type'], 'individual')
+        self.assertEqual(clients[-1]['client_type'], 'legal')
+        self.assertNotIn('sort_name', clients[0])
+
+    def test_get_client(self):
+        client_id = self.db.get_clients('legal')[0]['id']
+        self.assertEqual(self.db.get_client(client_id)['client_type'], 'legal')
+        self.assertIsNone(self.db.get_client(-1))
+
+
+class TestOrderPaging(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        client_id = self.db.create_client({'client_type': 'legal', 'company_name': 'ООО «Тест»',
+                                           'phone': '79123456789'})
+        statuses = ('new', 'in_progress', 'completed')
+        for i in range(40):
+            self.db.create_order({'vessel_code': f"VS{i:06d}", 'client_id': client_id,
+                                  'order_date': f"2024-01-{1 + i % 6:02d}", 'total_amount': 100,
+                                  'created_by': 1}, [{'service_id': 1, 'unit_price': 100}])
+            self.db.update_order_status(i + 1, statuses[i % 3])
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def collect_pages(self, filters=None, page_size=7):
+        return [order['id'] for page in self.db.iter_pages(self.db.get_orders_page, filters, page_size=page_size)
+                for order in page]
+
+    def test_pages_match_full_list(self):
+        for filters in (None, {'status': 'completed'}, {'date_from': '2024-01-02', 'date_to': '2024-01-04'},
+                        {'vessel_code': '00001'}):
+            with self.subTest(filters=filters):
+                expected = [order['id'] for order in self.db.get_orders(filters)]
+                self.assertTrue(expected)
+                self.assertEqual(self.collect_pages(filters), expected)
+
+    def test_newest_first(self):
+        page = self.db.get_orders_page(page_size=3, with_total=True)
+        self.assertEqual([order['order_date'] for order in page.items], ['2024-01-06'] * 3)
+        self.assertEqual([order['id'] for order in page.items], [36, 30, 24])
+        self.assertEqual(page.items[0]['client_name'], 'ООО «Тест»')
+        self.assertEqual(page.total, 40)
+        self.assertEqual(self.db.get_orders_page({'status': 'new'}, with_total=True).total, 14)
+
+
+class TestOrdersWithServices(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        client_id = self.db.create_client({'client_type': 'individual', 'full_name': 'Иванов И. И.',
+                                           'phone': '79123456789'})
+        for i in range(12):
+            services = [{'service_id': service_id, 'quantity': 1 + i % 2, 'unit_price': 100 * service_id}
+                        for service_id in range(1, 2 + i % 3)]
+            self.db.create_order({'vessel_code': f"VS{i:06d}", 'client_id': client_id,
+                                  'order_date': '2024-01-01', 'total_amount': 100, 'created_by': 1}, services)
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_matches_order_details(self):
+        ids = [7, 2, 11, 2, 999, 5]
+        orders = self.db.get_orders_with_services(ids)
+
+        self.assertEqual([order.id for order in orders], [7, 2, 11, 5])
+        for order in orders:
+            with self.subTest(order_id=order.id):
+                expected = Order.from_dict(self.db.get_order_details(order.id))
+                self.assertEqual(order, expected)
+                self.assertEqual(order.client_name, 'Иванов И. И.')
+                self.assertTrue(order.items)
+
+    def test_chunks(self):
+        with mock.patch('database.IN_CHUNK_SIZE', 5):
+            orders = self.db.get_orders_with_services(range(1, 13))
+        self.assertEqual([order.id for order in orders], list(range(1, 13)))
+        self.assertEqual([order.items_count for order in orders], [1 + i % 3 for i in range(12)])
+
+    def test_empty(self):
+        self.assertEqual(self.db.get_orders_with_services([]), [])
+
+
+class TestOrderStatusTransitions(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        client_id = self.db.create_client({'client_type': 'legal', 'company_name': 'ООО «Тест»',
+                                           'phone': '79123456789'})
+        self.ids = {}
+        for code, status, services in (('VS000001', 'new', 1), ('VS000002', 'in_progress', 1),
+                                       ('VS000003', 'completed', 1), ('VS000004', 'new', 0)):
+            order_id = self.db.create_order({'vessel_code': code, 'client_id': client_id,
+                                             'order_date': '2024-01-10', 'total_amount': 100, 'created_by': 1},
+                                            [{'service_id': 1, 'unit_price': 100}] * services)
+            self.db.execute_update("UPDATE orders SET status = ? WHERE id = ?", (status, order_id))
+            self.ids[code] = order_id
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def order(self, code):
+        return self.db.get_order_details(self.ids[code])
+
+    def test_bulk_complete(self):
+        ids = [self.ids[code] for code in ('VS000001', 'VS000002', 'VS000003', 'VS000004')] + [999]
+        with mock.patch('database.IN_CHUNK_SIZE', 2):
+            results = self.db.update_orders_status(ids, 'completed')
+
+        self.assertEqual(list(results), ids)
+        self.assertIsNone(results[self.ids['VS000001']])
+        self.assertIsNone(results[self.ids['VS000002']])
+        self.assertIn("недопустим", results[self.ids['VS000003']])
+        self.assertEqual(results[self.ids['VS000004']], "В заказе нет услуг")
+        self.assertEqual(results[999], "Заказ не найден")
+
+        for code, status in (('VS000001', 'completed'), ('VS000002', 'completed'), ('VS000004', 'new')):
+            with self.subTest(code=code):
+                order = self.order(code)
+                self.assertEqual(order['status'], status)
+                self.assertEqual(order['completed_at'] is not None, status == 'completed')
+
+    def test_transitions_match_model(self):
+        properties = {'in_progress': 'can_start', 'completed': 'can_complete', 'cancelled': 'can_cancel'}
+        initial = {order_id: Order.from_dict(self.db.get_order_details(order_id)) for order_id in self.ids.values()}
+
+        for status, allowed in properties.items():
+            with self.subTest(status=status):
+                results = self.db.update_orders_status(initial, status)
+                self.assertEqual({order_id: reason is None for order_id, reason in results.items()},
+                                 {order_id: getattr(order, allowed) for order_id, order in initial.items()})
+
+            for order_id, order in initial.items():
+                self.db.execute_update("UPDATE orders SET status = ?, completed_at = NULL WHERE id = ?",
+                                       (order.status, order_id))
+
+    def test_single_order(self):
+        self.assertTrue(self.db.update_order_status(self.ids['VS000001'], 'in_progress'))
+        self.assertFalse(self.db.update_order_status(self.ids['VS000001'], 'in_progress'))
+        self.assertFalse(self.db.update_order_status(self.ids['VS000003'], 'cancelled'))
+        self.assertFalse(self.db.update_order_status(self.ids['VS000001'], 'unknown'))
+        self.assertEqual(self.order('VS000001')['status'], 'in_progress')
+
+        with self.assertRaises(ValueError):
+            self.db.update_orders_status([self.ids['VS000001']], 'new')
+
+    def test_rollup_follows_bulk_update(self):
+        self.db.update_orders_status(self.ids.values(), 'cancelled')
+        self.assertEqual(self.db.get_report_summary('2024-01-01', '2024-12-31'),
+                         self.db._report_summary_from_orders('2024-01-01', '2024-12-31', {}))
+
+
+class TestOrderStatusEvents(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        self.client_id = self.db.create_client({'client_type': 'legal', 'company_name': 'ООО «Тест»',
+                                                'phone': '79123456789'})
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def create_order(self, vessel_code, services=(1,)):
+        return self.db.create_order({'vessel_code': vessel_code, 'client_id': self.client_id,
+                                     'order_date': '2024-01-10', 'total_amount': 100, 'created_by': 1},
+                                    [{'service_id': service_id, 'unit_price': 100} for service_id in services])
+
+    def test_history(self):
+        order_id = self.create_order('VS000001')
+        self.assertTrue(self.db.update_order_status(order_id, 'in_progress', changed_by=2))
+        self.assertFalse(self.db.update_order_status(order_id, 'in_progress', changed_by=2))
+        self.assertTrue(self.db.update_order_status(order_id, 'completed', changed_by=3))
+
+        history = self.db.get_order_status_history(order_id)
+        self.assertEqual([(event['from_status'], event['to_status']) for event in history],
+                         [(None, 'new'), ('new', 'in_progress'), ('in_progress', 'completed')])
+        self.assertEqual([event['changed_by_name'] for event in history],
+                         [user[3] for user in config.database.INITIAL_DATA['users']])
+        self.assertEqual(history[-1]['ts'], self.db.get_order_details(order_id)['completed_at'])
+
+    def test_events_append_only(self):
+        order_id = self.create_order('VS000001')
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.execute_update("UPDATE order_status_events SET to_status = 'completed' WHERE order_id = ?",
+                                   (order_id,))
+
+        self.db.execute_update("DELETE FROM orders WHERE id = ?", (order_id,))
+        self.assertEqual(self.db.get_order_status_history(order_id), [])
+
+    def test_stage_lead_times(self):
+        # Заказ i: в очереди i часов, в работе 2i часов; услуга 2 - только у первого
+        with self.db.get_connection() as conn:
+            for i in range(1, 5):
+                order_id = self.create_order(f"VS{i:06d}", (1, 2) if i == 1 else (1,))
+                conn.execute("DELETE FROM order_status_events WHERE order_id = ?", (order_id,))
+                conn.executemany(
+                    "INSERT INTO order_status_events (order_id, from_status, to_status, ts) "
+                    "VALUES (?, ?, ?, datetime('2024-01-10 08:00:00', ?))",
+                    [(order_id, None, 'new', '+0 hours'), (order_id, 'new', 'in_progress', f"+{i} hours"),
+                     (order_id, 'in_progress', 'completed', f"+{3 * i} hours")]
+                )
+            conn.commit()
+
+        rows = {(row['service_id'], row['stage']): row
+                for row in self.db.get_stage_lead_times('2024-01-01', '2024-01-31')}
+
+        # Строки услуги идут подряд, стадии - в порядке жизненного цикла заказа
+        self.assertEqual([stage for service_id, stage in rows], ['new', 'in_progress', 'total'] * 2)
+        self.assertEqual({service_id for service_id, _ in rows}, {1, 2})
+        for stage, p50, p90, average in (('new', 2, 4, 2.5), ('in_progress', 4, 8, 5), ('total', 6, 12, 7.5)):
+            with self.subTest(stage=stage):
+                row = rows[(1, stage)]
+                self.assertEqual(row['orders_count'], 4)
+                self.assertAlmostEqual(row['p50'], p50)
+                self.assertAlmostEqual(row['p90'], p90)
+                self.assertAlmostEqual(row['p95'], p90)
+                self.assertAlmostEqual(row['avg_hours'], average)
+        self.assertAlmostEqual(rows[(2, 'total')]['p50'], 3)
+
+        self.assertEqual(self.db.get_stage_lead_times('2023-01-01', '2023-12-31'), [])
+        with self.assertRaises(ValueError):
+            self.db.get_stage_lead_times('2024-01-01', '2024-01-31', (0,))
+
+    def test_imported_completed_order(self):
+        records = [
+            (1, {'vessel_code': 'VS000001', 'client_id': self.client_id, 'order_date': '2024-01-10',
+                 'total_amount': 100, 'status': 'completed', 'completed_at': '2024-01-12 12:00:00',
+                 'created_by': 1},
+             [{'service_id': 1, 'unit_price': 100}]),
+            (2, {'vessel_code': 'VS000002', 'client_id': self.client_id, 'order_date': '2024-01-10',
+                 'total_amount': 100, 'status': 'in_progress', 'created_by': 1},
+             [{'service_id': 1, 'unit_price': 100}]),
+        ]
+        self.assertEqual(self.db.import_orders(records), (2, []))
+
+        # Заказ импортирован уже завершенным: created_at - время импорта, начало - order_date
+        order_id = self.db.execute_query("SELECT id FROM orders WHERE vessel_code = 'VS000001'")[0]['id']
+        history = self.db.get_order_status_history(order_id)
+        self.assertEqual([(event['from_status'], event['to_status'], event['ts']) for event in history],
+                         [(None, 'new', '2024-01-10'), ('new', 'completed', '2024-01-12 12:00:00')])
+
+        rows = {row['stage']: row for row in self.db.get_stage_lead_times('2024-01-01', '2024-01-31')}
+        self.assertEqual(rows['total']['orders_count'], 1)
+        self.assertAlmostEqual(rows['total']['p50'], 60)
+
+    def test_events_backfilled(self):
+        conn = sqlite3.connect(os.path.join(self.temp_dir.name, 'old.db'))
+        migrate(conn, 9)
+        conn.executemany(
+            "INSERT INTO orders (id, vessel_code, client_id, order_date, total_amount, status, created_by, "
+            "created_at, completed_at) VALUES (?, ?, 1, '2024-01-10', 100, ?, 1, '2024-01-10 08:00:00', ?)",
+            [(1, 'VS000001', 'new', None), (2, 'VS000002', 'completed', '2024-01-11 08:00:00'),
+             (3, 'VS000003', 'cancelled', None)]
+        )
+        conn.commit()
+
+        migrate(conn, 10)
+        events = conn.execute("SELECT order_id, from_status, to_status, ts FROM order_status_events "
+                              "ORDER BY order_id, ts").fetchall()
+        self.assertEqual(events, [(1, None, 'new', '2024-01-10 08:00:00'),
+                                  (2, None, 'new', '2024-01-10 08:00:00'),
+                                  (2, 'new', 'completed', '2024-01-11 08:00:00'),
+                                  (3, None, 'cancelled', '2024-01-10 08:00:00')])
+        conn.close()
+
+
+class TestReportQuery(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        self.legal_id = self.db.create_client({'client_type': 'legal', 'company_name': 'ООО «Тест»',
+                                               'phone': '79123456789'})
+        self.individual_id = self.db.create_client({'client_type': 'individual', 'full_name': 'Иванов И. И.',
+                                                    'phone': '79123456780'})
+
+        orders = [
+            ('VS000001', self.legal_id, '2024-01-10', 15000.0, 'new', [1]),
+            ('VS000002', self.legal_id, '2024-02-10', 40000.0, 'completed', [1, 2]),
+            ('VS000003', self.individual_id, '2024-03-10', 25000.0, 'completed', [2]),
+            ('VS000004', self.individual_id, '2025-01-10', 18000.0, 'cancelled', [3]),
+        ]
+        for vessel_code, client_id, order_date, amount, status, service_ids in orders:
+            order_id = self.db.create_order(
+                {'vessel_code': vessel_code, 'client_id': client_id, 'order_date': order_date,
+                 'total_amount': amount, 'created_by': 1},
+                [{'service_id': service_id, 'unit_price': amount / len(service_ids)} for service_id in service_ids]
+            )
+            self.db.execute_update("UPDATE orders SET status = ? WHERE id = ?", (status, order_id))
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def codes(self, filters=None, date_from='2024-01-01', date_to='2024-12-31'):
+        return [row['vessel_code'] for row in self.db.get_report_data(date_from, date_to, filters)]
+
+    def test_period(self):
+        self.assertEqual(self.codes(), ['VS000001', 'VS000002', 'VS000003'])
+
+    def test_pages(self):
+        expected = self.db.get_report_data('2024-01-01', '2025-12-31')
+        first = self.db.get_report_data_page('2024-01-01', '2025-12-31', page_size=3, with_total=True)
+        second = self.db.get_report_data_page('2024-01-01', '2025-12-31', cursor=first.next_cursor, page_size=3)
+
+        self.assertEqual(first.total, 4)
+        self.assertEqual(first.items + second.items, expected)
+        self.assertIsNone(second.next_cursor)
+        self.assertEqual(self.db.get_report_data_page('2024-01-01', '2024-12-31', {'status': 'completed'},
+                                                      with_total=True).total, 2)
+
+    def test_filters(self):
+        test_cases = [
+            ({'status': 'completed'}, ['VS000002', 'VS000003']),
+            ({'status': ['new', 'completed']}, ['VS000001', 'VS000002', 'VS000003']),
+            ({'client_type': 'individual'}, ['VS000003']),
+            ({'client_id': self.legal_id}, ['VS000001', 'VS000002']),
+            ({'service_id': 2}, ['VS000002', 'VS000003']),
+            ({'amount_min': 20000}, ['VS000002', 'VS000003']),
+            ({'amount_max': 25000}, ['VS000001', 'VS000003']),
+            ({'status': 'completed', 'service_id': 1}, ['VS000002']),
+        ]
+
+        for filters, expected in test_cases:
+            with self.subTest(filters=filters):
+                self.assertEqual(self.codes(filters), expected)
+
+    def test_iter_report_data(self):
+        chunks = list(self.db.iter_report_data('2024-01-01', '2024-12-31', chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual([row for chunk in chunks for row in chunk],
+                         self.db.get_report_data('2024-01-01', '2024-12-31'))
+
+    def test_count_report_rows(self):
+        self.assertEqual(self.db.count_report_rows('2024-01-01', '2024-12-31'), 3)
+        self.assertEqual(self.db.count_report_rows('2024-01-01', '2024-12-31', {'service_id': 2}), 2)
+
+    def test_iter_query_interrupt(self):
+        query = """
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+            SELECT COUNT(*) FROM n
+        """
+        # Выборка идет на отдельном соединении, зарегистрированном за этим потоком
+        streams = self.db.pool.thread_streams()
+        timer = threading.Timer(0.1, lambda: [conn.interrupt() for conn in list(streams)])
+        timer.start()
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                list(self.db.iter_query(query))
+        finally:
+            timer.cancel()
+
+        self.assertEqual(self.db.pool_stats()['in_use'], 0)
+
+    def test_services_columns(self):
+        row = self.db.get_report_data('2024-02-01', '2024-02-28')[0]
+        self.assertEqual(row['services_count'], 2)
+        self.assertEqual(row['services_names'].count(', '), 1)
+
+
+class TestReportSummary(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        self.legal_id = self.db.create_client({'client_type': 'legal', 'company_name': 'ООО «Тест»',
+                                               'phone': '79123456789'})
+        self.individual_id = self.db.create_client({'client_type': 'individual', 'full_name': 'Иванов И. И.',
+                                                    'phone': '79123456780'})
+
+        orders = [
+            ('VS000001', self.legal_id, '2024-01-10', 15000.1, [(1, 1)]),
+            ('VS000002', self.legal_id, '2024-01-10', 40000.2, [(1, 1), (2, 1)]),
+            ('VS000003', self.individual_id, '2024-03-10', 25000.3, [(2, 2)]),
+            ('VS000004', self.individual_id, '2025-01-10', 18000.0, [(3, 1)]),
+        ]
+        self.order_ids = {}
+        for vessel_code, client_id, order_date, amount, services in orders:
+            self.order_ids[vessel_code] = self.db.create_order(
+                {'vessel_code': vessel_code, 'client_id': client_id, 'order_date': order_date,
+                 'total_amount': amount, 'created_by': 1},
+                [{'service_id': service_id, 'quantity': quantity, 'unit_price': 1000.05}
+                 for service_id, quantity in services]
+            )
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def summary(self, filters=None):
+        return self.db.get_report_summary('2024-01-01', '2024-12-31', filters)
+
+    def assert_matches_orders(self, filters=None):
+        expected = self.db._report_summary_from_orders('2024-01-01', '2024-12-31', filters or {})
+        self.assertEqual(self.summary(filters), expected)
+
+    def test_totals(self):
+        summary = self.summary()
+        self.assertEqual(summary['totals'], {'orders_count': 3, 'revenue': 80000.6, 'services_count': 4})
+        self.assertEqual([item['client_type'] for item in summary['by_client_type']], ['legal', 'individual'])
+        self.assertEqual(summary['by_status'], [{'status': 'new', 'orders_count': 3,
+                                                 'revenue': 80000.6, 'services_count': 4}])
+
+        by_service = {item['service_id']: item for item in summary['by_service']}
+        self.assertEqual(by_service[2]['orders_count'], 2)
+        self.assertEqual(by_service[2]['quantity'], 3)
+        self.assertAlmostEqual(by_service[2]['revenue'], 3000.15)
+        self.assert_matches_orders()
+
+    def test_status_updates_move_totals(self):
+        self.db.update_order_status(self.order_ids['VS000002'], 'completed')
+        self.db.update_order_status(self.order_ids['VS000003'], 'in_progress')
+        self.db.update_order_status(self.order_ids['VS000003'], 'completed')
+
+        completed = self.summary({'status': 'completed'})
+        self.assertEqual(completed['totals']['orders_count'], 2)
+        self.assertEqual(completed['totals']['services_count'], 3)
+        self.assertEqual(self.summary({'status': 'new'})['totals']['orders_count'], 1)
+
+        for filters in (None, {'status': ['new', 'completed']}, {'client_type': 'legal'}):
+            with self.subTest(filters=filters):
+                self.assert_matches_orders(filters)
+
+    def test_other_filters_use_orders(self):
+        summary = self.summary({'service_id': 1})
+        self.assertEqual(summary['totals']['orders_count'], 2)
+        self.assertEqual(summary, self.db._report_summary_from_orders('2024-01-01', '2024-12-31',
+                                                                      {'service_id': 1}))
+
+    def test_changes_outside_create_order(self):
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE order_services SET quantity = 3 WHERE order_id = ?",
+                         (self.order_ids['VS000001'],))
+            conn.execute("UPDATE orders SET order_date = '2024-02-01', total_amount = 100 WHERE id = ?",
+                         (self.order_ids['VS000002'],))
+            conn.execute("UPDATE clients SET client_type = 'individual' WHERE id = ?", (self.legal_id,))
+            conn.execute("DELETE FROM orders WHERE id = ?", (self.order_ids['VS000003'],))
+            conn.commit()
+
+        self.assertEqual(self.summary()['totals']['orders_count'], 2)
+        self.assert_matches_orders()
+
+        rows = self.db.execute_query("SELECT * FROM service_daily_rollup ORDER BY day, service_id")
+        self.db.rebuild_report_rollup()
+        nonzero = [tuple(row) for row in rows if row['orders_count']]
+        self.assertEqual(nonzero, [tuple(row) for row in
+                                   self.db.execute_query("SELECT * FROM service_daily_rollup ORDER BY day, service_id")])
+
+    def test_rollup_query_plan(self):
+        with self.db.get_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT SUM(orders_count) FROM order_daily_rollup r "
+                "WHERE r.day BETWEEN '2024-01-01' AND '2024-12-31'"
+            ).fetchall()
+        self.assertTrue(all(not row['detail'].startswith('SCAN') for row in plan))
+
+
+class TestVesselCodeSequence(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'test.db')
+        self.db = Database(self.db_path)
+        self.client_id = self.db.create_client({'client_type': 'legal', 'company_name': 'ООО «Тест»',
+                                                'phone': '79123456789'})
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def create_order(self, vessel_code):
+        return self.db.create_order({'vessel_code': vessel_code, 'client_id': self.client_id,
+                                     'order_date': '2024-01-10', 'total_amount': 100, 'created_by': 1},
+                                    [{'service_id': 1, 'unit_price': 100}])
+
+    def test_allocation(self):
+        self.assertEqual(self.db.allocate_vessel_codes(), ['VS000001'])
+        self.assertEqual(self.db.allocate_sequence('vessel_code', 10), 2)
+        self.assertEqual(self.db.allocate_vessel_codes(2), ['VS000012', 'VS000013'])
+
+        with self.assertRaises(ValueError):
+            self.db.allocate_sequence('unknown')
+        with self.assertRaises(ValueError):
+            self.db.allocate_sequence('vessel_code', 0)
+
+    def test_open_transaction_not_committed(self):
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE clients SET company_name = 'ООО «Другое»' WHERE id = ?", (self.client_id,))
+            with self.assertRaises(sqlite3.ProgrammingError):
+                self.db.allocate_vessel_codes()
+            # Транзакция вызывающего кода осталась открытой и откатывается им самим
+            self.assertTrue(conn.in_transaction)
+            conn.rollback()
+
+        self.assertEqual(self.db.get_client(self.client_id)['company_name'], 'ООО «Тест»')
+        self.assertEqual(self.db.allocate_vessel_codes(), ['VS000001'])
+
+    def test_manual_codes_move_sequence(self):
+        self.create_order('VS000050')
+        self.create_order('VS000007')
+        self.create_order('ТЕСТ-1')
+        self.assertEqual(self.db.allocate_vessel_codes(), ['VS000051'])
+
+    def test_block_reservation(self):
+        with mock.patch.object(config.database, 'VESSEL_CODE_BLOCK', 5):
+            codes = [self.db.next_vessel_code() for _ in range(6)]
+        self.assertEqual(codes, [f"VS{number:06d}" for number in range(1, 7)])
+        self.assertEqual(self.db.allocate_vessel_codes(), ['VS000011'])
+
+    def test_concurrent_workstations(self):
+        databases = [Database(self.db_path) for _ in range(4)]
+        codes = []
+
+        def allocate(db):
+            for _ in range(50):
+                code = db.next_vessel_code()
+                codes.append(code)
+                self.create_order(code)
+
+        threads = [threading.Thread(target=allocate, args=(db,)) for db in databases]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for db in databases:
+            db.close()
+
+        self.assertEqual(len(set(codes)), 200)
+        self.assertEqual(len(self.db.get_orders()), 200)
+
+    def test_sequence_seeded_from_orders(self):
+        conn = sqlite3.connect(os.path.join(self.temp_dir.name, 'old.db'))
+        migrate(conn, 7)
+        conn.execute("INSERT INTO orders (id, vessel_code, client_id, order_date, total_amount, created_by) "
+                     "VALUES (3, 'VS000120', 1, '2024-01-10', 100, 1)")
+        conn.commit()
+
+        migrate(conn, 8)
+        self.assertEqual(conn.execute("SELECT value FROM sequences WHERE name = 'vessel_code'").fetchone()[0], 120)
+        conn.close()
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'test.db')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_new_database_at_current_version(self):
+        db = Database(self.db_path)
+        with db.get_connection() as conn:
+            self.assertEqual(get_schema_version(conn), config.database.DATABASE_VERSION)
+            users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        self.assertEqual(users, len(config.database.INITIAL_DATA['users']))
+        db.close()
+
+    def test_current_version_skips_ddl(self):
+        Database(self.db_path).close()
+
+        conn = sqlite3.connect(self.db_path)
+        statements = []
+        conn.set_trace_callback(statements.append)
+        migrate(conn)
+        conn.close()
+
+        self.assertEqual(statements, ["PRAGMA user_version"])
+
+    def test_legacy_database_adopted(self):
+        conn = sqlite3.connect(self.db_path)
+        MIGRATIONS[0].run(conn.cursor())
+        conn.execute(
+            "INSERT INTO clients (client_type, full_name, phone) VALUES ('individual', 'Тест', '79123456789')"
+        )
+        conn.commit()
+        self.assertEqual(get_schema_version(conn), 0)
+
+        migrate(conn)
+
+        self.assertEqual(get_schema_version(conn), config.database.DATABASE_VERSION)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0], 1)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0],
+                         len(config.database.INITIAL_DATA['users']))
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn('idx_orders_date_status', indexes)
+        conn.close()
+
+    def test_failed_migration_rolls_back(self):
+        broken = MIGRATIONS + [Migration(
+            version=MIGRATIONS[-1].version + 1,
+            description="broken",
+            statements=("CREATE TABLE extra (id INTEGER)", "INVALID SQL")
+        )]
+
+        conn = sqlite3.connect(self.db_path)
+        with self.assertRaises(sqlite3.Error):
+            migrate(conn, broken[-1].version, broken)
+
+        self.assertEqual(get_schema_version(conn), 0)
+        tables = conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]
+        self.assertEqual(tables, 0)
+        conn.close()
+
+    def test_open_transaction_rejected(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE extra (id INTEGER)")
+        conn.execute("INSERT INTO extra VALUES (1)")
+        self.assertTrue(conn.in_transaction)
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            migrate(conn)
+
+        # Чужая транзакция не зафиксирована и не откачена
+        self.assertTrue(conn.in_transaction)
+        self.assertEqual(get_schema_version(conn), 0)
+        conn.rollback()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM extra").fetchone()[0], 0)
+        conn.close()
+
+    def test_newer_database_rejected(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(f"PRAGMA user_version = {config.database.DATABASE_VERSION + 1}")
+        with self.assertRaises(sqlite3.DatabaseError):
+            migrate(conn)
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,307 @@
+import unittest
+import tempfile
+import zipfile
+import csv
+import os
+from datetime import datetime
+
+from database import Database
+from utils.exporters import (DataExporter, XlsxStreamWriter, ColumnarWriter, REPORTLAB_AVAILABLE,
+                             PYARROW_AVAILABLE, NUMPY_AVAILABLE)
+from utils.helpers import Helpers
+
+try:
+    import openpyxl
+
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+if PYARROW_AVAILABLE:
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+
+class TestCsvExport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def read(self, filename, encoding='utf-8-sig', delimiter=';'):
+        with open(filename, newline='', encoding=encoding) as f:
+            return list(csv.reader(f, delimiter=delimiter))
+
+    def test_write_csv_from_cursor_chunks(self):
+        chunks = self.db.iter_query("SELECT id, name, price FROM services ORDER BY id", chunk_size=2)
+        written = DataExporter.export_rows_to_csv(chunks, self.path('services.csv'))
+
+        services = sorted(self.db.get_services(), key=lambda service: service['id'])
+        rows = self.read(self.path('services.csv'))
+        self.assertEqual(written, len(services))
+        self.assertEqual(rows[0], ['id', 'name', 'price'])
+        self.assertEqual([row[1] for row in rows[1:]], [service['name'] for service in services])
+
+    def test_streaming_matches_list_export(self):
+        query = "SELECT id, username, role, full_name FROM users ORDER BY id"
+        DataExporter.export_to_csv([dict(row) for row in self.db.execute_query(query)], self.path('list.csv'))
+        DataExporter.export_rows_to_csv(self.db.iter_query(query, chunk_size=1), self.path('stream.csv'))
+
+        with open(self.path('list.csv'), 'rb') as f1, open(self.path('stream.csv'), 'rb') as f2:
+            self.assertEqual(f1.read(), f2.read())
+
+    def test_failed_write_releases_stream(self):
+        chunks = self.db.iter_query("SELECT id, name, price FROM services ORDER BY id", chunk_size=1)
+        with self.assertRaises(OSError):
+            DataExporter.write_csv(chunks, self.path(os.path.join('missing', 'services.csv')))
+
+        # Недочитанная выборка закрыта писателем, ее соединение вернулось в пул
+        self.assertEqual(self.db.pool_stats()['in_use'], 0)
+        self.assertEqual(self.db.pool.thread_streams(), [])
+
+    def test_empty_result(self):
+        chunks = self.db.iter_report_rows('2000-01-01', '2000-12-31')
+        self.assertEqual(DataExporter.export_rows_to_csv(chunks, self.path('empty.csv')), 0)
+        self.assertFalse(os.path.exists(self.path('empty.csv')))
+        self.assertFalse(DataExporter.export_to_csv([], self.path('empty.csv')))
+
+    def test_helpers_export_headers(self):
+        data = [{'id': 1, 'name': 'Поверка'}, {'id': 2, 'name': 'Ремонт'}]
+        self.assertTrue(Helpers.export_to_csv(data, self.path('helpers.csv'), {'id': 'ID', 'name': 'Услуга'}))
+
+        rows = self.read(self.path('helpers.csv'), encoding='utf-8', delimiter=',')
+        self.assertEqual(rows, [['ID', 'Услуга'], ['1', 'Поверка'], ['2', 'Ремонт']])
+
+
+class TestXlsxExport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.temp_dir.name, 'report.xlsx')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_chunks(self):
+        return [
+            [{'vessel_code': 'VS000001', 'order_date': '2024-01-10', 'total_amount': 15000.5,
+              'status': 'completed', 'client_name': 'ООО «A & B»'}],
+            [{'vessel_code': 'VS000002', 'order_date': '2024-02-10', 'total_amount': 40000,
+              'status': 'new', 'client_name': 'ООО «A & B»'}],
+        ]
+
+    def test_workbook_parts(self):
+        self.assertEqual(DataExporter.write_xlsx(self.make_chunks(), self.filename), 2)
+
+        with zipfile.ZipFile(self.filename) as zf:
+            names = set(zf.namelist())
+            self.assertTrue({'[Content_Types].xml', '_rels/.rels', 'xl/workbook.xml', 'xl/styles.xml',
+                             'xl/sharedStrings.xml', 'xl/worksheets/sheet1.xml'} <= names)
+
+            shared = zf.read('xl/sharedStrings.xml').decode('utf-8')
+            # Повторяющееся название клиента хранится один раз
+            self.assertEqual(shared.count('ООО «A &amp; B»'), 1)
+
+            sheet = zf.read('xl/worksheets/sheet1.xml').decode('utf-8')
+            self.assertIn(f'<c r="B2" s="{XlsxStreamWriter.STYLE_DATE}"><v>45301</v></c>', sheet)
+            self.assertIn(f'<c r="C3" s="{XlsxStreamWriter.STYLE_MONEY}"><v>40000</v></c>', sheet)
+
+    def test_inline_strings(self):
+        DataExporter.write_xlsx(self.make_chunks(), self.filename)
+
+        with zipfile.ZipFile(self.filename) as zf:
+            # Коды сосудов уникальны - они в ячейках листа, а не в sharedStrings
+            self.assertNotIn('VS000001', zf.read('xl/sharedStrings.xml').decode('utf-8'))
+            sheet = zf.read('xl/worksheets/sheet1.xml').decode('utf-8')
+            self.assertIn('<c r="A2" t="inlineStr"><is><t xml:space="preserve">VS000001</t></is></c>', sheet)
+            # Лист открыт с ZIP64: размер записи не ограничен 4 ГБ
+            self.assertGreaterEqual(zf.getinfo('xl/worksheets/sheet1.xml').extract_version, zipfile.ZIP64_VERSION)
+
+    def test_shared_strings_limit(self):
+        writer = XlsxStreamWriter(self.filename, ['Клиент'])
+        writer.SHARED_STRINGS_LIMIT = 3
+        writer.write_rows([[f"Клиент {i % 4}"] for i in range(8)])
+        writer.close()
+
+        with zipfile.ZipFile(self.filename) as zf:
+            shared = zf.read('xl/sharedStrings.xml').decode('utf-8')
+            sheet = zf.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        # В таблице заголовок и два первых значения, два других значения - в ячейках
+        self.assertIn('uniqueCount="3"', shared)
+        self.assertIn('count="5"', shared)
+        self.assertEqual(sheet.count('t="inlineStr"'), 4)
+
+    def test_empty_result(self):
+        self.assertEqual(DataExporter.write_xlsx([[]], self.filename), 0)
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertFalse(DataExporter.export_to_xlsx([], self.filename))
+
+    def test_error_removes_file(self):
+        def chunks():
+            yield self.make_chunks()[0]
+            raise RuntimeError("обрыв выборки")
+
+        self.assertEqual(DataExporter.export_rows_to_xlsx(chunks(), self.filename), -1)
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_column_letters(self):
+        self.assertEqual([XlsxStreamWriter._column_letter(i) for i in (0, 25, 26, 701, 702)],
+                         ['A', 'Z', 'AA', 'ZZ', 'AAA'])
+
+    @unittest.skipUnless(OPENPYXL_AVAILABLE, "не установлен openpyxl")
+    def test_readable_by_openpyxl(self):
+        DataExporter.export_to_xlsx([row for chunk in self.make_chunks() for row in chunk], self.filename)
+
+        sheet = openpyxl.load_workbook(self.filename).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0], ('Код сосуда', 'Дата заказа', 'Сумма', 'Статус', 'Клиент'))
+        self.assertEqual(rows[1], ('VS000001', datetime(2024, 1, 10), 15000.5, 'Завершен', 'ООО «A & B»'))
+        self.assertEqual(rows[2][2], 40000)
+
+
+class TestColumnarExport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def make_chunks(self):
+        return [
+            [{'vessel_code': 'VS000001', 'order_date': '2024-01-10 09:30:00', 'total_amount': 15000.5,
+              'status': 'completed', 'client_name': 'ООО «Тест»', 'services_count': 2}],
+            [{'vessel_code': 'VS000002', 'order_date': '2024-02-10', 'total_amount': None,
+              'status': 'new', 'client_name': None, 'services_count': 0},
+             {'vessel_code': 'VS000003', 'order_date': '2024-02-11', 'total_amount': 0.105,
+              'status': 'completed', 'client_name': 'Иванов', 'services_count': 1}],
+        ]
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "не установлен numpy")
+    def test_npz_bundle(self):
+        filename = DataExporter.write_columnar(self.make_chunks(), self.path('report.npz'))
+        self.assertEqual(filename, self.path('report.npz'))
+
+        with np.load(filename, allow_pickle=False) as bundle:
+            self.assertEqual(bundle['__format__'][0], ColumnarWriter.NPZ_FORMAT)
+            self.assertEqual(list(bundle['__types__']),
+                             ['string', 'date', 'decimal', 'category', 'string', 'int'])
+            self.assertEqual(bundle['order_date'].tolist(), [19732, 19763, 19764])
+            self.assertEqual(bundle['total_amount'].tolist(), [1500050, 0, 11])
+            self.assertEqual(bundle['total_amount.valid'].tolist(), [True, False, True])
+            self.assertEqual(list(bundle['status.categories']), ['completed', 'new'])
+            self.assertEqual(bundle['status.codes'].tolist(), [0, 1, 0])
+
+            offsets, data = bundle['client_name.offsets'], bundle['client_name.data'].tobytes()
+            names = [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+            self.assertEqual(names, ['ООО «Тест»', '', 'Иванов'])
+            self.assertEqual(bundle['client_name.valid'].tolist(), [True, False, True])
+            self.assertNotIn('vessel_code.valid', bundle.files)
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "не установлен pyarrow")
+    def test_parquet_typed_columns(self):
+        filename = DataExporter.write_columnar(self.make_chunks(), self.path('report.parquet'))
+        table = pq.read_table(filename)
+
+        self.assertEqual(str(table.schema.field('order_date').type), 'date32[day]')
+        self.assertEqual(str(table.schema.field('total_amount').type), 'int64')
+        self.assertTrue(str(table.schema.field('status').type).startswith('dictionary'))
+        self.assertEqual(table.column('total_amount').to_pylist(), [1500050, None, 11])
+        self.assertEqual(table.column('status').to_pylist(), ['completed', 'new', 'completed'])
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "не установлен pyarrow")
+    def test_feather_from_database(self):
+        with tempfile.TemporaryDirectory() as db_dir:
+            db = Database(os.path.join(db_dir, 'test.db'))
+            try:
+                chunks = db.iter_query("SELECT id, name, price FROM services ORDER BY id", chunk_size=2)
+                filename = DataExporter.write_columnar(chunks, self.path('services.feather'))
+                services = sorted(db.get_services(), key=lambda service: service['id'])
+            finally:
+                db.close()
+
+        table = feather.read_table(filename)
+        self.assertEqual(table.column('id').to_pylist(), [service['id'] for service in services])
+        self.assertEqual(table.column('price').to_pylist(),
+                         [round(service['price'] * 100) for service in services])
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "не установлен numpy")
+    def test_format_from_extension(self):
+        self.assertEqual(DataExporter.columnar_format('report.npz'), 'npz')
+        expected = 'feather' if PYARROW_AVAILABLE else 'npz'
+        self.assertEqual(DataExporter.columnar_format('report.feather'), expected)
+
+    def test_empty_result(self):
+        self.assertIsNone(DataExporter.write_columnar([[]], self.path('empty.npz')))
+        self.assertFalse(os.path.exists(self.path('empty.npz')))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            ColumnarWriter(self.path('report.orc'), ['id'], 'orc')
+
+
+@unittest.skipUnless(REPORTLAB_AVAILABLE, "не установлен reportlab")
+class TestPdfExport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.temp_dir.name, 'report.pdf')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_orders(self, count):
+        return ({
+            'vessel_code': f"VS{i:06d}",
+            'order_date': '2024-01-10',
+            'client_name': 'ООО «Тест»',
+            'services_names': 'Механические испытания',
+            'total_amount': 15000.0,
+            'status': 'completed'
+        } for i in range(count))
+
+    def test_single_file(self):
+        files = DataExporter.render_orders_report(self.make_orders(150), self.filename, '2024-01-01', '2024-12-31')
+
+        self.assertEqual(files, [self.filename])
+        with open(self.filename, 'rb') as f:
+            self.assertTrue(f.read(5).startswith(b'%PDF'))
+
+    def test_split_into_parts(self):
+        files = DataExporter.render_orders_report(self.make_orders(25), self.filename, '2024-01-01', '2024-12-31',
+                                                  rows_per_file=10)
+
+        expected = [os.path.join(self.temp_dir.name, f"report_part{i}.pdf") for i in (1, 2, 3)]
+        self.assertEqual(files, expected)
+        self.assertTrue(all(os.path.exists(path) for path in expected))
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_exact_multiple_is_single_file(self):
+        files = DataExporter.render_orders_report(self.make_orders(10), self.filename, '2024-01-01', '2024-12-31',
+                                                  rows_per_file=10)
+        self.assertEqual(files, [self.filename])
+
+    def test_empty_report(self):
+        self.assertTrue(DataExporter.export_orders_report([], self.filename, '2024-01-01', '2024-12-31'))
+        self.assertTrue(os.path.exists(self.filename))
+
+    def test_fit_text(self):
+        font, size = DataExporter.PDF_FONT, DataExporter.PDF_FONT_SIZE
+        self.assertEqual(DataExporter._fit_text("VS000001", 100, font, size), "VS000001")
+
+        fitted = DataExporter._fit_text("A" * 100, 50, font, size)
+        self.assertTrue(fitted.endswith('…'))
+        self.assertLessEqual(sum(DataExporter._char_width(char, font, size) for char in fitted), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
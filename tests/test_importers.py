@@ -0,0 +1,182 @@
+import unittest
+import tempfile
+import json
+import os
+
+from database import Database
+from utils.importers import OrderImporter, ClientImporter, OPENPYXL_AVAILABLE
+
+if OPENPYXL_AVAILABLE:
+    import openpyxl
+
+
+class TestOrderImport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        self.client_id = self.db.create_client({'client_type': 'legal', 'company_name': 'ООО «Тест»',
+                                                'phone': '79123456789'})
+        self.importer = OrderImporter(self.db, created_by=1, batch_size=2)
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def write(self, name, lines):
+        filename = os.path.join(self.temp_dir.name, name)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        return filename
+
+    def test_csv_groups_services(self):
+        filename = self.write('orders.csv', [
+            "vessel_code;client_id;order_date;service_id;quantity;unit_price;status",
+            f"VS000001;{self.client_id};2024-01-10;1;2;1000,50;completed",
+            f"VS000001;{self.client_id};2024-01-10;2;;;completed",
+            f"VS000002;{self.client_id};2024-01-11;3;1;500;",
+            f"VS000003;{self.client_id};2024-01-12;4;;;",
+        ])
+        result = self.importer.import_file(filename)
+
+        self.assertEqual((result.total, result.imported, result.rejected), (3, 3, []))
+        order = self.db.get_order_details(self.db.get_orders({'vessel_code': 'VS000001'})[0]['id'])
+        self.assertEqual(order['status'], 'completed')
+        self.assertEqual(order['total_amount'], 2 * 1000.5 + 25000.0)
+        self.assertEqual(sorted((s['service_id'], s['quantity']) for s in order['services']), [(1, 2), (2, 1)])
+        self.assertEqual(self.db.get_report_summary('2024-01-01', '2024-12-31')['totals']['orders_count'], 3)
+
+    def test_rejections(self):
+        self.db.create_order({'vessel_code': 'VS000009', 'client_id': self.client_id, 'order_date': '2024-01-01',
+                              'total_amount': 100, 'created_by': 1}, [{'service_id': 1, 'unit_price': 100}])
+        orders = [
+            {'vessel_code': 'VS000001', 'client_id': self.client_id, 'order_date': '2024-01-10',
+             'services': [{'service_id': 1}]},
+            {'vessel_code': 'VS000001', 'client_id': self.client_id, 'order_date': '2024-01-10',
+             'services': [{'service_id': 1}]},
+            {'vessel_code': 'VS000009', 'client_id': self.client_id, 'order_date': '2024-01-10',
+             'services': [{'service_id': 1}]},
+            {'vessel_code': 'VS000002', 'client_id': 999, 'order_date': '2024-01-10',
+             'services': [{'service_id': 1}]},
+            {'vessel_code': 'VS000003', 'client_id': self.client_id, 'order_date': '10.01.2024',
+             'services': [{'service_id': 1}]},
+            {'vessel_code': 'VS000004', 'client_id': self.client_id, 'order_date': '2024-01-10',
+             'services': []},
+            {'vessel_code': 'VS000005', 'client_id': self.client_id, 'order_date': '2024-01-10',
+             'services': [{'service_id': 99, 'unit_price': 10}]},
+            {'vessel_code': 'VS000006', 'client_id': self.client_id, 'order_date': '2024-01-10',
+             'status': 'lost', 'services': [{'service_id': 1}]},
+        ]
+        lines = [json.dumps(order, ensure_ascii=False) for order in orders] + ["{broken"]
+        result = self.importer.import_file(self.write('orders.jsonl', lines))
+
+        self.assertEqual(result.total, 9)
+        self.assertEqual(result.imported, 1)
+        self.assertEqual([line for line, _ in result.rejected], [2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(len(self.db.get_orders()), 2)
+
+    def test_batch_falls_back_to_single_rows(self):
+        records = [
+            (1, {'vessel_code': 'VS000001', 'client_id': self.client_id, 'order_date': '2024-01-10',
+                 'total_amount': 100, 'status': 'new', 'created_by': 1},
+             [{'service_id': 1, 'unit_price': 100}]),
+            (2, {'vessel_code': 'VS000002', 'client_id': self.client_id, 'order_date': '2024-01-10',
+                 'total_amount': 100, 'status': 'unknown', 'created_by': 1},
+             [{'service_id': 1, 'unit_price': 100}]),
+        ]
+        imported, rejected = self.db.import_orders(records)
+
+        self.assertEqual(imported, 1)
+        self.assertEqual([line for line, _ in rejected], [2])
+        self.assertEqual([order['vessel_code'] for order in self.db.get_orders()], ['VS000001'])
+        self.assertEqual(self.db.pool_stats()['in_use'], 0)
+
+    def test_missing_csv_columns(self):
+        filename = self.write('orders.csv', ["vessel_code;client_id", "VS000001;1"])
+        with self.assertRaises(ValueError):
+            self.importer.import_file(filename)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            OrderImporter.detect_format('orders.xml')
+
+
+class TestClientImport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        self.db.create_client({'client_type': 'legal', 'company_name': 'ООО «Было»', 'inn': '7707083893',
+                               'phone': '79123456789'})
+        self.db.create_client({'client_type': 'individual', 'full_name': 'Петров П. П.',
+                               'passport_series': '4010', 'passport_number': '123456', 'phone': '79123456780'})
+        self.importer = ClientImporter(self.db, batch_size=2)
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    HEADER = ['client_type', 'company_name', 'full_name', 'inn', 'bik', 'bank_account',
+              'passport_series', 'passport_number', 'birth_date', 'phone', 'email']
+
+    ROWS = [
+        ['legal', 'ООО «Новое»', '', '500100732259', '044525225', '40702810938000012345', '', '', '',
+         '8 (912) 000-00-01', 'info@example.com'],
+        ['individual', '', 'Иванов И. И.', '', '', '', '4011', '654321', '1990-05-01', '9120000002', ''],
+        ['legal', 'ООО «Дубль»', '', '7707083893', '', '', '', '', '', '79120000003', ''],
+        ['legal', 'ООО «Сумма»', '', '7707083894', '', '', '', '', '', '79120000004', ''],
+        ['individual', '', 'Петров П. П.', '', '', '', '4010', '123456', '', '79120000005', ''],
+        ['individual', '', 'Сидоров С. С.', '', '', '', '4011', '654321', '', '79120000006', ''],
+        ['legal', 'ООО «Телефон»', '', '', '', '', '', '', '', '12345', ''],
+        ['legal', '', '', '', '04452522', '', '', '', '', '79120000008', ''],
+        ['person', '', 'Кто-то', '', '', '', '', '', '', '79120000009', ''],
+        ['individual', '', 'Без даты', '7707083894', '', '', '', '', '01.01.1990', '79120000010', ''],
+    ]
+
+    def write_csv(self):
+        filename = os.path.join(self.temp_dir.name, 'clients.csv')
+        with open(filename, 'w', encoding='utf-8-sig') as f:
+            for row in [self.HEADER] + self.ROWS:
+                f.write(";".join(row) + "\n")
+        return filename
+
+    def test_csv_import(self):
+        result = self.importer.import_file(self.write_csv())
+
+        self.assertEqual(result.total, 10)
+        self.assertEqual(result.imported, 2)
+        self.assertEqual([line for line, _ in result.rejected], [4, 5, 6, 7, 8, 9, 10, 11])
+        messages = dict(result.rejected)
+        self.assertIn('ИНН', messages[4])
+        self.assertIn('контрольная цифра', messages[5])
+        self.assertIn('паспортом', messages[6])
+        self.assertIn('паспортом', messages[7])
+        self.assertIn('формат даты', messages[11])
+
+        clients = {client['company_name'] or client['full_name']: client for client in self.db.get_clients()}
+        self.assertEqual(clients['ООО «Новое»']['phone'], '79120000001')
+        self.assertIsNone(clients['Иванов И. И.']['inn'])
+        self.assertEqual(clients['Иванов И. И.']['phone'], '79120000002')
+
+    def test_existing_lookup(self):
+        inns, passports = self.db.find_existing_clients(['7707083893', '500100732259', None],
+                                                        [('4010', '123456'), ('4011', '654321')])
+        self.assertEqual(inns, {'7707083893'})
+        self.assertEqual(passports, {('4010', '123456')})
+
+    @unittest.skipUnless(OPENPYXL_AVAILABLE, "не установлен openpyxl")
+    def test_xlsx_numeric_cells(self):
+        filename = os.path.join(self.temp_dir.name, 'clients.xlsx')
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['client_type', 'company_name', 'inn', 'phone'])
+        sheet.append(['legal', 'ООО «Числа»', 500100732259, 89120000001.0])
+        sheet.append([None, None, None, None])
+        sheet.append(['legal', 'ООО «Без ИНН»', None, '9120000002'])
+        workbook.save(filename)
+
+        result = self.importer.import_file(filename)
+        self.assertEqual((result.total, result.imported, result.rejected), (2, 2, []))
+        self.assertEqual(len(self.db.get_clients('legal')), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
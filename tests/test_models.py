@@ -124,7 +124,7 @@ class TestClient(unittest.TestCase):
         client = Client(
             client_type="legal",
             company_name="ООО «Тест»",
-            inn="1234567890",
+            inn="7707083893",
             phone="+79123456789"
         )
 
@@ -152,6 +152,19 @@ class TestClient(unittest.TestCase):
         self.assertFalse(is_valid)
         self.assertIn("ФИО обязательно", message)
 
+    def test_requisites_validation(self):
+        client = Client(client_type="legal", company_name="ООО «Тест»", phone="+79123456789",
+                        inn="7707083894")
+        is_valid, message = client.validate()
+        self.assertFalse(is_valid)
+        self.assertIn("контрольная цифра ИНН", message)
+
+        client = Client(client_type="legal", company_name="ООО «Тест»", phone="+79123456789",
+                        bank_account="40702810938000012346", bik="044525225")
+        is_valid, message = client.validate()
+        self.assertFalse(is_valid)
+        self.assertIn("контрольный ключ", message)
+
     def test_display_name(self):
         legal_client = Client(client_type="legal", company_name="ООО «Тест»")
         self.assertEqual(legal_client.display_name, "ООО «Тест»")
@@ -163,14 +176,14 @@ class TestClient(unittest.TestCase):
         client = Client(
             client_type="legal",
             company_name="ООО «Тест»",
-            inn="1234567890",
+            inn="7707083893",
             phone="+79123456789"
         )
 
         client_dict = client.to_dict()
         self.assertEqual(client_dict['client_type'], 'legal')
         self.assertEqual(client_dict['company_name'], 'ООО «Тест»')
-        self.assertEqual(client_dict['inn'], '1234567890')
+        self.assertEqual(client_dict['inn'], '7707083893')
 
     def test_to_dict_individual(self):
         client = Client(
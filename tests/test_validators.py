@@ -5,8 +5,10 @@ from utils.validators import validators
 class TestValidators(unittest.TestCase):
     def test_validate_inn(self):
         test_cases = [
-            ("1234567890", True, ""),
-            ("123456789012", True, ""),
+            ("7707083893", True, ""),
+            ("500100732259", True, ""),
+            ("1234567890", False, "контрольная цифра"),
+            ("123456789012", False, "контрольная цифра"),
             ("123456789", False, "10 или 12 цифр"),
             ("12345678901", False, "10 или 12 цифр"),
             ("123456789a", False, "только цифры"),
@@ -103,6 +105,24 @@ class TestValidators(unittest.TestCase):
                 if not expected_valid:
                     self.assertIn(expected_message, message)
 
+    def test_account_key(self):
+        test_cases = [
+            ("40702810938000012345", "044525225", True, ""),
+            ("40702810938000012346", "044525225", False, "контрольный ключ"),
+            ("40702810938000012345", "044525226", False, "контрольный ключ"),
+            # Корреспондентский счет в РКЦ: ключ считается по "0" + 5-6 цифры БИК
+            ("30101810400000000225", "044525000", True, ""),
+            ("40702810938000012346", "04452522", True, ""),
+            ("40702810938000012346", None, True, ""),
+        ]
+
+        for account, bik, expected_valid, expected_message in test_cases:
+            with self.subTest(account=account, bik=bik):
+                is_valid, message = validators.validate_bank_account(account, bik)
+                self.assertEqual(is_valid, expected_valid)
+                if not expected_valid:
+                    self.assertIn(expected_message, message)
+
     def test_validate_bik(self):
         test_cases = [
             ("044525123", True, ""),
@@ -149,6 +169,46 @@ class TestValidators(unittest.TestCase):
                 if not expected_valid:
                     self.assertIn(expected_message, message)
 
+    def test_inn_checksum(self):
+        test_cases = [
+            ("7707083893", True),
+            ("7707083894", False),
+            ("500100732259", True),
+            ("500100732250", False),
+            ("123456789", False),
+        ]
+
+        for inn, expected_valid in test_cases:
+            with self.subTest(inn=inn):
+                self.assertEqual(validators.inn_checksum_valid(inn), expected_valid)
+
+    def test_column_validators(self):
+        self.assertEqual(validators.validate_inn_column(["7707083893", "", None, "77070838a3", "7707083894"]),
+                         ["", "", "", "ИНН должен содержать только цифры", "Неверная контрольная цифра ИНН"])
+        self.assertEqual(validators.validate_bik_column(["044525225", "04452522"]),
+                         ["", "БИК должен содержать 9 цифр"])
+        self.assertEqual(validators.validate_passport_columns(["4010", "", "401"], ["123456", "", "123456"]),
+                         ["", "", "Серия паспорта должна содержать 4 цифры"])
+
+        phones, errors = validators.normalize_phone_column(["+7 (912) 345-67-89", "8-912-345-67-89",
+                                                            "9123456789", "12345", None])
+        self.assertEqual(phones[:3], ["79123456789"] * 3)
+        self.assertEqual(errors, ["", "", "", "Телефон должен содержать 10 или 11 цифр", "Телефон обязателен"])
+
+    def test_requisites_columns(self):
+        errors = validators.validate_requisites_columns(
+            ["7707083893", "7707083894", "", "", "", None],
+            ["40702810938000012345", "", "40702810938000012346", "40702810938000012346", "4070281093800001234",
+             None],
+            ["044525225", "", "044525225", "0445252", "", None])
+        self.assertEqual(errors, ["", "Неверная контрольная цифра ИНН",
+                                  "Неверный контрольный ключ расчетного счета (проверьте счет и БИК)",
+                                  "БИК должен содержать 9 цифр", "Расчетный счет должен содержать 20 цифр", ""])
+
+    def test_first_errors(self):
+        errors = {'a': ["", "A1", ""], 'b': ["B0", "B1", ""]}
+        self.assertEqual(validators.first_errors(errors, 3), ["B0", "A1", ""])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import unittest
+import tempfile
+import os
+from unittest import mock
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication
+
+from database import Database
+from utils.workers import QueryWorker
+from views import client_view
+
+app = QApplication.instance() or QApplication([])
+
+
+class TestClientViewSearch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        for full_name, phone in (('Иванов Иван', '79123456780'), ('Петров Петр', '79123456781')):
+            self.db.create_client({'client_type': 'individual', 'full_name': full_name, 'phone': phone})
+
+        # Воркеры не уходят в пул потоков: тест запускает их сам
+        self.workers = []
+        patches = [mock.patch.object(client_view, 'db_instance', self.db),
+                   mock.patch.object(QueryWorker, 'start', lambda worker, pool=None: self.workers.append(worker))]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.view = client_view.ClientView()
+        self.view.search_timer.setInterval(20)
+
+    def tearDown(self):
+        self.view.deleteLater()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def type_and_wait(self, text):
+        started = len(self.workers)
+        self.view.search_edit.setText(text)
+        for _ in range(100):
+            if len(self.workers) > started:
+                break
+            QTest.qWait(10)
+        self.assertEqual(len(self.workers), started + 1)
+        return self.workers[-1]
+
+    def shown_names(self):
+        model = self.view.clients_model
+        return [model.data(model.index(row, 2)) for row in range(model.rowCount())]
+
+    def test_debounce(self):
+        for text in ('И', 'Ив', 'Иван'):
+            self.view.search_edit.setText(text)
+        self.assertTrue(self.view.search_timer.isActive())
+        self.assertEqual(self.workers, [])
+
+        # Запрос уходит один раз, после паузы в наборе, с последним текстом
+        worker = self.type_and_wait('Иванов')
+        QTest.qWait(50)
+        self.assertEqual(len(self.workers), 1)
+        self.assertEqual(worker.args[0], 'Иванов')
+
+    def test_stale_result_ignored(self):
+        old = self.type_and_wait('Иванов')
+        new = self.type_and_wait('Петров')
+        self.assertTrue(old.is_cancelled)
+
+        new.run()
+        self.assertEqual(self.shown_names(), ['Петров Петр'])
+
+        # Ответ на первый запрос пришел позже второго (уже стоял в очереди сигналов)
+        old.signals.finished.emit(old.token, old.fn(*old.args, **old.kwargs), 0.0)
+        self.assertEqual(self.shown_names(), ['Петров Петр'])
+
+        # Ошибка устаревшего запроса тоже отбрасывается
+        with mock.patch.object(client_view.helpers, 'show_error') as show_error:
+            old.signals.error.emit(old.token, "прервано")
+        show_error.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import tempfile
+import threading
+import os
+
+from database import Database
+from utils.workers import StreamQueryWorker
+
+
+class TestStreamQueryWorker(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'test.db'))
+        self.events = []
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def make_worker(self, iter_fn, count_fn=None):
+        worker = StreamQueryWorker(self.db, iter_fn, count_fn=count_fn, token=1)
+        worker.signals.chunk.connect(lambda token, rows: self.events.append(('chunk', len(rows))))
+        worker.signals.progress.connect(lambda token, fetched, total: self.events.append(('progress', fetched, total)))
+        worker.signals.finished.connect(lambda token, count, elapsed: self.events.append(('finished', count)))
+        worker.signals.error.connect(lambda token, message: self.events.append(('error', message)))
+        worker.signals.cancelled.connect(lambda token: self.events.append(('cancelled',)))
+        return worker
+
+    def test_streams_chunks_with_progress(self):
+        query = "SELECT id FROM services ORDER BY id"
+        total = len(self.db.get_services())
+
+        worker = self.make_worker(
+            lambda: self.db.iter_query(query, chunk_size=2),
+            count_fn=lambda: total
+        )
+        worker.run()
+
+        chunks = [event[1] for event in self.events if event[0] == 'chunk']
+        self.assertEqual(sum(chunks), total)
+        self.assertEqual(self.events[0], ('progress', 0, total))
+        self.assertEqual(self.events[-2], ('progress', total, total))
+        self.assertEqual(self.events[-1], ('finished', total))
+
+    def test_cancel_interrupts_query(self):
+        query = """
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+            SELECT COUNT(*) FROM n
+        """
+        worker = self.make_worker(lambda: self.db.iter_query(query))
+        # Отмена из сигнала прогресса: запрос уже выполняется на удерживаемом соединении
+        worker.signals.progress.connect(
+            lambda token, fetched, total: threading.Timer(0.1, worker.cancel).start()
+        )
+        worker.run()
+
+        self.assertEqual(self.events[-1], ('cancelled',))
+        self.assertEqual(self.db.pool_stats()['in_use'], 0)
+
+    def test_cancel_before_start(self):
+        worker = self.make_worker(lambda: self.db.iter_query("SELECT 1"))
+        worker.cancel()
+        worker.run()
+
+        self.assertEqual(self.events, [('cancelled',)])
+
+
+if __name__ == '__main__':
+    unittest.main()
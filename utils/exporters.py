@@ -1,7 +1,13 @@
 import csv
 import os
-from datetime import datetime
-from typing import List, Dict
+import re
+import zipfile
+from array import array
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from xml.sax.saxutils import escape
 
 # Проверка доступности reportlab
 try:
@@ -10,32 +16,715 @@ try:
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib import colors
     from reportlab.lib.units import mm
+    from reportlab.pdfbase.pdfmetrics import stringWidth
 
     REPORTLAB_AVAILABLE = True
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
+# Столбцовый экспорт: Parquet/Feather через pyarrow, иначе пакет столбцов .npz через numpy
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Символы, недопустимые в XML 1.0
+_XML_ILLEGAL_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class XlsxStreamWriter:
+    """Потоковая запись XLSX: лист пишется в zip по мере поступления строк.
+
+    В памяти держится только таблица общих строк (sharedStrings) - по одной
+    записи на уникальное значение; остальные части книги записываются при close().
+    Текст столбцов inline_columns (почти уникальный: коды, ИНН) пишется прямо
+    в ячейку (inlineStr) и в таблицу не попадает; после SHARED_STRINGS_LIMIT
+    уникальных значений так же пишутся и новые значения остальных столбцов.
+    Числа пишутся числовыми ячейками, date и строки ISO-дат из date_columns -
+    датами Excel с форматом ДД.ММ.ГГГГ.
+    """
+
+    NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    REL_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    EXCEL_EPOCH = date(1899, 12, 30)
+    FLUSH_ROWS = 1000
+    SHARED_STRINGS_LIMIT = 100000
+
+    # Индексы cellXfs в styles.xml
+    STYLE_HEADER = 1
+    STYLE_DATE = 2
+    STYLE_MONEY = 3
+
+    def __init__(self, filename: str, header: Sequence[str], sheet_name: str = "Отчет",
+                 date_columns: Sequence[int] = (), money_columns: Sequence[int] = (),
+                 column_widths: Sequence[float] = None, inline_columns: Sequence[int] = ()):
+        self.filename = filename
+        self.sheet_name = sheet_name[:31]
+        self.date_columns = set(date_columns)
+        self.money_columns = set(money_columns)
+        self.inline_columns = set(inline_columns)
+        self.rows_written = 0
+
+        self._letters = [self._column_letter(i) for i in range(len(header))]
+        self._strings: Dict[str, int] = {}
+        self._string_refs = 0
+        self._row_index = 0
+        self._pending: List[str] = []
+
+        self._zip = zipfile.ZipFile(filename, 'w', compression=zipfile.ZIP_DEFLATED)
+        # Размер листа заранее неизвестен: без ZIP64 запись больше 4 ГБ оборвется ошибкой
+        self._sheet = self._zip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)
+
+        cols = ""
+        if column_widths:
+            cols = "<cols>" + "".join(
+                f'<col min="{i + 1}" max="{i + 1}" width="{width}" customWidth="1"/>'
+                for i, width in enumerate(column_widths)
+            ) + "</cols>"
+
+        self._write(
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<worksheet xmlns="{self.NAMESPACE}" xmlns:r="{self.REL_NAMESPACE}">'
+            '<sheetViews><sheetView workbookViewId="0">'
+            '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+            '</sheetView></sheetViews>'
+            f'{cols}<sheetData>'
+        )
+        self._append_row(header, self.STYLE_HEADER)
+
+    @staticmethod
+    def _column_letter(index: int) -> str:
+        letters = ""
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            letters = chr(65 + remainder) + letters
+        return letters
+
+    def _write(self, text: str) -> None:
+        self._sheet.write(text.encode('utf-8'))
+
+    def _string_index(self, value: str) -> Optional[int]:
+        """Индекс значения в sharedStrings; None - таблица заполнена, значения в ней нет"""
+        index = self._strings.get(value)
+        if index is None:
+            if len(self._strings) >= self.SHARED_STRINGS_LIMIT:
+                return None
+            index = self._strings[value] = len(self._strings)
+        self._string_refs += 1
+        return index
+
+    def _date_serial(self, value: Any) -> Optional[int]:
+        if isinstance(value, datetime):
+            value = value.date()
+        elif isinstance(value, str):
+            try:
+                value = date.fromisoformat(value[:10])
+            except ValueError:
+                return None
+        if isinstance(value, date):
+            return (value - self.EXCEL_EPOCH).days
+        return None
+
+    def _cell(self, ref: str, column: int, value: Any, style: int = 0) -> str:
+        if value is None or value == "":
+            return ""
+
+        if column in self.date_columns and not style:
+            serial = self._date_serial(value)
+            if serial is not None:
+                return f'<c r="{ref}" s="{self.STYLE_DATE}"><v>{serial}</v></c>'
+
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            if not style and column in self.money_columns:
+                style = self.STYLE_MONEY
+            style_attr = f' s="{style}"' if style else ""
+            return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+
+        text = _XML_ILLEGAL_RE.sub('', str(value))
+        style_attr = f' s="{style}"' if style else ""
+        index = None if column in self.inline_columns and not style else self._string_index(text)
+        if index is None:
+            return (f'<c r="{ref}"{style_attr} t="inlineStr">'
+                    f'<is><t xml:space="preserve">{escape(text)}</t></is></c>')
+        return f'<c r="{ref}"{style_attr} t="s"><v>{index}</v></c>'
+
+    def _append_row(self, values: Sequence[Any], style: int = 0) -> None:
+        self._row_index += 1
+        row = self._row_index
+        cells = "".join(
+            self._cell(f"{letter}{row}", column, value, style)
+            for column, (letter, value) in enumerate(zip(self._letters, values))
+        )
+        self._pending.append(f'<row r="{row}">{cells}</row>')
+
+        if len(self._pending) >= self.FLUSH_ROWS:
+            self._write("".join(self._pending))
+            self._pending.clear()
+
+    def write_row(self, values: Sequence[Any]) -> None:
+        self._append_row(values)
+        self.rows_written += 1
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        for values in rows:
+            self.write_row(values)
+
+    def close(self) -> None:
+        if self._zip is None:
+            return
+
+        self._write("".join(self._pending))
+        self._pending.clear()
+        self._write('</sheetData></worksheet>')
+        self._sheet.close()
+
+        strings = "".join(
+            f'<si><t xml:space="preserve">{escape(value)}</t></si>' for value in self._strings
+        )
+        self._zip.writestr(
+            'xl/sharedStrings.xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<sst xmlns="{self.NAMESPACE}" count="{self._string_refs}" uniqueCount="{len(self._strings)}">'
+            f'{strings}</sst>'
+        )
+        self._strings.clear()
+
+        self._zip.writestr('xl/styles.xml', self._styles_xml())
+        self._zip.writestr(
+            'xl/workbook.xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{self.NAMESPACE}" xmlns:r="{self.REL_NAMESPACE}">'
+            f'<sheets><sheet name="{escape(self.sheet_name, {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        )
+        self._zip.writestr(
+            'xl/_rels/workbook.xml.rels',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{self.REL_NAMESPACE}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{self.REL_NAMESPACE}/sharedStrings" Target="sharedStrings.xml"/>'
+            f'<Relationship Id="rId3" Type="{self.REL_NAMESPACE}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        )
+        self._zip.writestr(
+            '_rels/.rels',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{self.REL_NAMESPACE}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        )
+        self._zip.writestr(
+            '[Content_Types].xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/sharedStrings.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            '</Types>'
+        )
+        self._zip.close()
+        self._zip = None
+
+    def _styles_xml(self) -> str:
+        # 0 - обычная ячейка, 1 - заголовок, 2 - дата (dd.mm.yyyy), 3 - сумма (формат 4: #,##0.00)
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<styleSheet xmlns="{self.NAMESPACE}">'
+            '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd.mm.yyyy"/></numFmts>'
+            '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+            '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+            '<fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="4">'
+            '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+            '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+            '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+            '</cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            '</styleSheet>'
+        )
+
+    def abort(self) -> None:
+        """Закрывает файл без дописывания книги (при ошибке)"""
+        if self._zip is None:
+            return
+        try:
+            self._sheet.close()
+        finally:
+            self._zip.close()
+            self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class ColumnarWriter:
+    """Запись строк отчета в столбцовом виде с типизированными столбцами.
+
+    Типы столбцов берутся из COLUMN_TYPES по имени (по умолчанию string):
+      - date     - дни от 1970-01-01 (Arrow date32);
+      - decimal  - int64, значение умножено на 10 ** DECIMAL_SCALE (копейки);
+      - int      - int64;
+      - category - словарное кодирование: коды + список значений;
+      - string   - строки UTF-8.
+
+    Форматы: parquet и feather (нужен pyarrow), npz (нужен numpy).
+    Parquet пишется группами строк по ROW_GROUP_SIZE по мере поступления.
+
+    Формат npz (np.load(path, allow_pickle=False)):
+      __format__            - ['elma-columnar-1']
+      __columns__, __types__ - имена и типы столбцов по порядку
+      <col>                 - date: int32, decimal/int: int64
+      <col>.scale           - для decimal: степень десяти (int8)
+      <col>.codes           - для category: int16, -1 - NULL
+      <col>.categories      - для category: значения кодов
+      <col>.offsets         - для string: int64, n + 1 смещений в <col>.data
+      <col>.data            - для string: байты UTF-8 всех значений подряд
+      <col>.valid           - bool, только если в столбце есть NULL
+    """
+
+    COLUMN_TYPES = {
+        'id': 'int',
+        'order_date': 'date',
+        'birth_date': 'date',
+        'total_amount': 'decimal',
+        'unit_price': 'decimal',
+        'price': 'decimal',
+        'services_count': 'int',
+        'quantity': 'int',
+        'status': 'category',
+        'client_type': 'category',
+        'role': 'category',
+    }
+    FORMATS = ('parquet', 'feather', 'npz')
+    DECIMAL_SCALE = 2
+    ROW_GROUP_SIZE = 65536
+    NPZ_FORMAT = 'elma-columnar-1'
+    EPOCH = date(1970, 1, 1)
+
+    def __init__(self, filename: str, fields: Sequence[str], fmt: str):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Неизвестный формат столбцового экспорта: {fmt}")
+        if fmt in ('parquet', 'feather') and not PYARROW_AVAILABLE:
+            raise RuntimeError(f"Экспорт в {fmt} недоступен: не установлен pyarrow")
+        if fmt == 'npz' and not NUMPY_AVAILABLE:
+            raise RuntimeError("Экспорт в npz недоступен: не установлен numpy")
+
+        self.filename = filename
+        self.fields = list(fields)
+        self.types = [self.COLUMN_TYPES.get(field, 'string') for field in self.fields]
+        self.fmt = fmt
+        self.rows_written = 0
+
+        self._scale = Decimal(1).scaleb(self.DECIMAL_SCALE)
+        self._categories: List[Dict[str, int]] = [{} for _ in self.fields]
+        self._batches = []
+        self._parquet = None
+        self._reset_buffers()
+
+        if fmt != 'npz':
+            self._schema = pa.schema([self._arrow_field(field, kind)
+                                      for field, kind in zip(self.fields, self.types)])
+
+    def _arrow_field(self, field: str, kind: str):
+        if kind == 'date':
+            return pa.field(field, pa.date32())
+        if kind == 'decimal':
+            return pa.field(field, pa.int64(), metadata={'scale': str(self.DECIMAL_SCALE)})
+        if kind == 'int':
+            return pa.field(field, pa.int64())
+        if kind == 'category':
+            return pa.field(field, pa.dictionary(pa.int32(), pa.string()))
+        return pa.field(field, pa.string())
+
+    def _reset_buffers(self) -> None:
+        if self.fmt == 'npz':
+            if not hasattr(self, '_columns'):
+                self._columns = [self._npz_buffer(kind) for kind in self.types]
+        else:
+            self._columns = [[] for _ in self.fields]
+        self._buffered = 0
+
+    @staticmethod
+    def _npz_buffer(kind: str) -> Dict[str, Any]:
+        if kind == 'string':
+            return {'offsets': array('q', [0]), 'data': bytearray(), 'valid': bytearray()}
+        if kind == 'date':
+            return {'values': array('i'), 'valid': bytearray()}
+        if kind == 'category':
+            return {'values': array('h'), 'valid': bytearray()}
+        return {'values': array('q'), 'valid': bytearray()}
+
+    def _date_days(self, value: Any) -> Optional[int]:
+        if value is None or value == "":
+            return None
+        if isinstance(value, datetime):
+            value = value.date()
+        elif isinstance(value, str):
+            value = date.fromisoformat(value[:10])
+        return (value - self.EPOCH).days
+
+    def _scaled(self, value: Any) -> Optional[int]:
+        if value is None:
+            return None
+        return int((Decimal(str(value)) * self._scale).to_integral_value(ROUND_HALF_UP))
+
+    def _category_code(self, column: int, value: Any) -> int:
+        if value is None:
+            return -1
+        categories = self._categories[column]
+        code = categories.get(value)
+        if code is None:
+            code = categories[value] = len(categories)
+        return code
+
+    def write_rows(self, rows: Iterable[Any]) -> None:
+        """Строки - sqlite3.Row или словари с полями fields"""
+        for row in rows:
+            for column, (field, kind) in enumerate(zip(self.fields, self.types)):
+                self._append(column, kind, row[field])
+            self.rows_written += 1
+            self._buffered += 1
+
+            if self.fmt != 'npz' and self._buffered >= self.ROW_GROUP_SIZE:
+                self._flush_batch()
+
+    def _append(self, column: int, kind: str, value: Any) -> None:
+        if kind == 'date':
+            value = self._date_days(value)
+        elif kind == 'decimal':
+            value = self._scaled(value)
+        elif kind == 'int':
+            value = None if value is None else int(value)
+        elif kind == 'category':
+            value = None if value is None else str(value)
+        else:
+            value = None if value is None else str(value)
+
+        if self.fmt != 'npz':
+            self._columns[column].append(value)
+            return
+
+        buffer = self._columns[column]
+        buffer['valid'].append(value is not None)
+        if kind == 'string':
+            if value is not None:
+                buffer['data'] += value.encode('utf-8')
+            buffer['offsets'].append(len(buffer['data']))
+        elif kind == 'category':
+            buffer['values'].append(self._category_code(column, value))
+        else:
+            buffer['values'].append(0 if value is None else value)
+
+    def _arrow_array(self, kind: str, values: List[Any]):
+        if kind == 'date':
+            return pa.array(values, pa.int32()).cast(pa.date32())
+        if kind in ('decimal', 'int'):
+            return pa.array(values, pa.int64())
+        if kind == 'category':
+            return pa.array(values, pa.string()).dictionary_encode()
+        return pa.array(values, pa.string())
+
+    def _flush_batch(self) -> None:
+        if not self._buffered:
+            return
+
+        batch = pa.RecordBatch.from_arrays(
+            [self._arrow_array(kind, values) for kind, values in zip(self.types, self._columns)],
+            schema=self._schema
+        )
+        if self.fmt == 'parquet':
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.filename, self._schema, compression='zstd')
+            self._parquet.write_batch(batch)
+        else:
+            self._batches.append(batch)
+        self._reset_buffers()
+
+    def close(self) -> None:
+        if self.fmt == 'npz':
+            self._write_npz()
+            return
+
+        self._flush_batch()
+        if self.fmt == 'parquet':
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.filename, self._schema, compression='zstd')
+            self._parquet.close()
+        else:
+            # В файле Feather словарь столбца один на все пакеты
+            table = pa.Table.from_batches(self._batches, schema=self._schema).unify_dictionaries()
+            feather.write_feather(table, self.filename, compression='zstd')
+            self._batches.clear()
+
+    def _write_npz(self) -> None:
+        arrays = {
+            '__format__': np.array([self.NPZ_FORMAT]),
+            '__columns__': np.array(self.fields),
+            '__types__': np.array(self.types),
+        }
+
+        for column, (field, kind) in enumerate(zip(self.fields, self.types)):
+            buffer = self._columns[column]
+            valid = np.frombuffer(bytes(buffer['valid']), dtype=np.bool_)
+            if not valid.all():
+                arrays[f"{field}.valid"] = valid
+
+            if kind == 'string':
+                arrays[f"{field}.offsets"] = np.frombuffer(buffer['offsets'], dtype=np.int64)
+                arrays[f"{field}.data"] = np.frombuffer(bytes(buffer['data']), dtype=np.uint8)
+            elif kind == 'category':
+                arrays[f"{field}.codes"] = np.frombuffer(buffer['values'], dtype=np.int16)
+                arrays[f"{field}.categories"] = np.array(list(self._categories[column]), dtype=str)
+            elif kind == 'date':
+                arrays[field] = np.frombuffer(buffer['values'], dtype=np.int32)
+            else:
+                arrays[field] = np.frombuffer(buffer['values'], dtype=np.int64)
+                if kind == 'decimal':
+                    arrays[f"{field}.scale"] = np.int8(self.DECIMAL_SCALE)
+
+        # np.savez дописывает .npz к имени без расширения
+        with open(self.filename, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+
+def close_source(source: Iterable) -> None:
+    """Закрывает генератор-источник строк (например, Database.iter_query) в текущем потоке.
+
+    Если запись прервана ошибкой, недочитанный генератор иначе держал бы
+    соединение с БД до сборки мусора.
+    """
+    close = getattr(source, 'close', None)
+    if close is not None:
+        close()
+
 
 class DataExporter:
+    CSV_BUFFER_SIZE = 1 << 16
+
     @staticmethod
-    def export_to_csv(data: List[Dict], filename: str, delimiter: str = ';') -> bool:
+    def iter_rows(chunks: Iterable[Sequence]) -> Iterable:
+        """Строки из порций chunks по одной; при закрытии закрывает и chunks"""
         try:
-            if not data:
-                return False
+            for chunk in chunks:
+                yield from chunk
+        finally:
+            close_source(chunks)
 
-            with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                fieldnames = list(data[0].keys())
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=delimiter)
-                writer.writeheader()
+    @staticmethod
+    def write_csv(chunks: Iterable[Sequence], filename: str, delimiter: str = ';',
+                  header: Sequence[str] = None, encoding: str = 'utf-8-sig') -> int:
+        """Пишет порции строк (sqlite3.Row или словари) через csv.writer.
+
+        Заголовок берется из header или из ключей первой строки. Файл
+        создается при первой строке, в памяти держится только текущая порция.
+        Возвращает число записанных строк (0 - данных нет, файл не создан).
+        """
+        csvfile = None
+        writer = None
+        fields = None
+        written = 0
 
-                for row in data:
-                    writer.writerow(row)
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+
+                if writer is None:
+                    first = chunk[0]
+                    fields = list(first.keys())
+                    csvfile = open(filename, 'w', newline='', encoding=encoding,
+                                   buffering=DataExporter.CSV_BUFFER_SIZE)
+                    writer = csv.writer(csvfile, delimiter=delimiter)
+                    writer.writerow(header if header is not None else fields)
+
+                if isinstance(chunk[0], dict):
+                    writer.writerows([row.get(field) for field in fields] for row in chunk)
+                else:
+                    writer.writerows(chunk)
+                written += len(chunk)
+        finally:
+            close_source(chunks)
+            if csvfile is not None:
+                csvfile.close()
+
+        return written
 
-            return True
+    @staticmethod
+    def export_to_csv(data: List[Dict], filename: str, delimiter: str = ';') -> bool:
+        try:
+            return DataExporter.write_csv([data], filename, delimiter) > 0
         except Exception as e:
             print(f"Ошибка экспорта в CSV: {e}")
             return False
 
+    @staticmethod
+    def export_rows_to_csv(chunks: Iterable[Sequence], filename: str, delimiter: str = ';') -> int:
+        """Потоковый экспорт: chunks - порции строк курсора (например, Database.iter_query).
+
+        Возвращает число строк, -1 при ошибке.
+        """
+        try:
+            return DataExporter.write_csv(chunks, filename, delimiter)
+        except Exception as e:
+            print(f"Ошибка экспорта в CSV: {e}")
+            return -1
+
+    # Столбцы, которые пишутся в XLSX датами и денежными числами
+    XLSX_DATE_COLUMNS = ('order_date', 'birth_date')
+    XLSX_MONEY_COLUMNS = ('total_amount', 'unit_price', 'price')
+    # Почти уникальные значения: в sharedStrings они только раздували бы таблицу
+    XLSX_INLINE_COLUMNS = ('vessel_code', 'inn', 'phone', 'email', 'passport_number')
+
+    @staticmethod
+    def write_xlsx(chunks: Iterable[Sequence], filename: str, sheet_name: str = "Отчет") -> int:
+        """Пишет порции строк (sqlite3.Row или словари) в XLSX через XlsxStreamWriter.
+
+        Заголовки берутся из _format_header, статус выводится по-русски.
+        Возвращает число записанных строк (0 - данных нет, файл не создан).
+        """
+        writer = None
+        fields = None
+
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+
+                if writer is None:
+                    fields = list(chunk[0].keys())
+                    header = [DataExporter._format_header(field) for field in fields]
+                    writer = XlsxStreamWriter(
+                        filename,
+                        header,
+                        sheet_name,
+                        date_columns=[i for i, field in enumerate(fields)
+                                      if field in DataExporter.XLSX_DATE_COLUMNS],
+                        money_columns=[i for i, field in enumerate(fields)
+                                       if field in DataExporter.XLSX_MONEY_COLUMNS],
+                        column_widths=[max(12, len(title) + 4) for title in header],
+                        inline_columns=[i for i, field in enumerate(fields)
+                                        if field in DataExporter.XLSX_INLINE_COLUMNS]
+                    )
+                    status_column = fields.index('status') if 'status' in fields else None
+
+                for row in chunk:
+                    values = [row[field] for field in fields]
+                    if status_column is not None:
+                        values[status_column] = DataExporter._format_status(values[status_column])
+                    writer.write_row(values)
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+                os.remove(filename)
+            raise
+        finally:
+            close_source(chunks)
+
+        if writer is None:
+            return 0
+
+        writer.close()
+        return writer.rows_written
+
+    @staticmethod
+    def export_to_xlsx(data: List[Dict], filename: str, sheet_name: str = "Отчет") -> bool:
+        try:
+            return DataExporter.write_xlsx([data], filename, sheet_name) > 0
+        except Exception as e:
+            print(f"Ошибка экспорта в Excel: {e}")
+            return False
+
+    @staticmethod
+    def export_rows_to_xlsx(chunks: Iterable[Sequence], filename: str, sheet_name: str = "Отчет") -> int:
+        """Потоковый экспорт в XLSX из порций строк курсора. Возвращает число строк, -1 при ошибке"""
+        try:
+            return DataExporter.write_xlsx(chunks, filename, sheet_name)
+        except Exception as e:
+            print(f"Ошибка экспорта в Excel: {e}")
+            return -1
+
+    @staticmethod
+    def columnar_format(filename: str, fmt: str = None) -> str:
+        """Формат по параметру или расширению; без pyarrow - npz"""
+        if fmt is None:
+            ext = os.path.splitext(filename)[1].lower().lstrip('.')
+            fmt = ext if ext in ColumnarWriter.FORMATS else 'parquet'
+        if fmt in ('parquet', 'feather') and not PYARROW_AVAILABLE:
+            fmt = 'npz'
+        return fmt
+
+    @staticmethod
+    def write_columnar(chunks: Iterable[Sequence], filename: str, fmt: str = None) -> Optional[str]:
+        """Пишет порции строк в Parquet/Feather/npz (см. ColumnarWriter).
+
+        Если pyarrow недоступен, пишется npz и расширение имени файла
+        заменяется на .npz. Возвращает путь к файлу или None, если данных нет.
+        """
+        fmt = DataExporter.columnar_format(filename, fmt)
+        stem, ext = os.path.splitext(filename)
+        if ext.lower().lstrip('.') != fmt:
+            filename = f"{stem}.{fmt}"
+
+        writer = None
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if writer is None:
+                    writer = ColumnarWriter(filename, list(chunk[0].keys()), fmt)
+                writer.write_rows(chunk)
+
+            if writer is None:
+                return None
+            writer.close()
+        except BaseException:
+            if writer is not None and os.path.exists(filename):
+                os.remove(filename)
+            raise
+        finally:
+            close_source(chunks)
+
+        return filename
+
+    @staticmethod
+    def export_rows_to_columnar(chunks: Iterable[Sequence], filename: str, fmt: str = None) -> Optional[str]:
+        try:
+            return DataExporter.write_columnar(chunks, filename, fmt)
+        except Exception as e:
+            print(f"Ошибка столбцового экспорта: {e}")
+            return None
+
     @staticmethod
     def export_to_pdf(data: List[Dict], filename: str, title: str = "Отчет") -> bool:
         if not REPORTLAB_AVAILABLE:
@@ -139,83 +828,174 @@ class DataExporter:
         }
         return header_map.get(header, header)
 
+    # Отчет по заказам в PDF: столбцы, ширины (мм) и фиксированная высота строки (пт).
+    # Таблица режется на порции по странице, файл - на части по PDF_ROWS_PER_FILE строк
+    ORDERS_REPORT_COLUMNS = ('vessel_code', 'order_date', 'client_name', 'services_names',
+                             'total_amount', 'status')
+    ORDERS_REPORT_WIDTHS_MM = (22, 18, 44, 50, 26, 20)
+    PDF_FONT = 'Helvetica'
+    PDF_FONT_SIZE = 8
+    PDF_ROW_HEIGHT = 12
+    PDF_CELL_PADDING = 6
+    PDF_ROWS_PER_FILE = 20000
+
+    _orders_table_style = None
+
     @staticmethod
-    def export_orders_report(orders_data: List[Dict], filename: str, date_from: str, date_to: str) -> bool:
-        if not REPORTLAB_AVAILABLE:
-            print("PDF экспорт недоступен: не установлен reportlab")
-            return False
+    @lru_cache(maxsize=4096)
+    def _char_width(char: str, font_name: str, font_size: float) -> float:
+        return stringWidth(char, font_name, font_size)
 
-        try:
-            doc = SimpleDocTemplate(
-                filename,
-                pagesize=A4,
-                rightMargin=15 * mm,
-                leftMargin=15 * mm,
-                topMargin=15 * mm,
-                bottomMargin=15 * mm
-            )
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _fit_text(text: str, width: float, font_name: str, font_size: float) -> str:
+        """Обрезает текст по ширине столбца; повторяющиеся значения и ширины символов кэшируются"""
+        char_width = DataExporter._char_width
+        ellipsis = char_width('…', font_name, font_size)
+        total = 0.0
+        for i, char in enumerate(text):
+            char_w = char_width(char, font_name, font_size)
+            if total + char_w > width:
+                cut = i
+                while cut > 0 and total + ellipsis > width:
+                    cut -= 1
+                    total -= char_width(text[cut], font_name, font_size)
+                return text[:cut] + '…'
+            total += char_w
+        return text
+
+    @classmethod
+    def _get_orders_table_style(cls):
+        # Один TableStyle на все порции таблицы
+        if cls._orders_table_style is None:
+            cls._orders_table_style = TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), cls.PDF_FONT_SIZE),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+                ('FONTNAME', (0, 1), (-1, -1), cls.PDF_FONT),
+                ('FONTSIZE', (0, 1), (-1, -1), cls.PDF_FONT_SIZE),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('TOPPADDING', (0, 0), (-1, -1), 1),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ])
+        return cls._orders_table_style
 
-            elements = []
-            styles = getSampleStyleSheet()
+    @staticmethod
+    def _orders_report_row(order: Dict, widths: Sequence[float]) -> List[str]:
+        values = (
+            order.get('vessel_code') or '',
+            order.get('order_date') or '',
+            order.get('client_name') or '',
+            order.get('services_names') or '',
+            f"{order.get('total_amount') or 0:.2f} руб.",
+            DataExporter._format_status(order.get('status', ''))
+        )
+        font_name, font_size = DataExporter.PDF_FONT, DataExporter.PDF_FONT_SIZE
+        padding = 2 * DataExporter.PDF_CELL_PADDING
+        return [DataExporter._fit_text(str(value), width - padding, font_name, font_size)
+                for value, width in zip(values, widths)]
 
-            title_style = ParagraphStyle(
-                'ReportTitle',
-                parent=styles['Heading1'],
-                fontSize=14,
-                spaceAfter=20,
-                alignment=1
-            )
+    @staticmethod
+    def _build_orders_report_part(rows: List[List[str]], filename: str, title: str,
+                                  widths: Sequence[float]) -> None:
+        doc = SimpleDocTemplate(
+            filename,
+            pagesize=A4,
+            rightMargin=15 * mm,
+            leftMargin=15 * mm,
+            topMargin=15 * mm,
+            bottomMargin=15 * mm
+        )
+
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle(
+            'ReportTitle',
+            parent=styles['Heading1'],
+            fontSize=14,
+            spaceAfter=20,
+            alignment=1
+        )
+        footer_style = ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            alignment=2
+        )
+
+        elements = [Paragraph(title, title_style)]
+
+        if rows:
+            header_row = [DataExporter._format_header(header) for header in DataExporter.ORDERS_REPORT_COLUMNS]
+            style = DataExporter._get_orders_table_style()
+            # Порция - столько строк, сколько помещается на страницу вместе с заголовком
+            rows_per_table = max(1, int((doc.height - 12) // DataExporter.PDF_ROW_HEIGHT) - 1)
+
+            elements.append(Spacer(1, 15))
+            for start in range(0, len(rows), rows_per_table):
+                chunk = rows[start:start + rows_per_table]
+                table = Table([header_row] + chunk, colWidths=widths,
+                              rowHeights=DataExporter.PDF_ROW_HEIGHT, repeatRows=1)
+                table.setStyle(style)
+                elements.append(table)
 
-            report_title = f"Отчет по заказам ОТК\nпериод с {date_from} по {date_to}"
-            elements.append(Paragraph(report_title, title_style))
+        timestamp = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
+        elements.append(Spacer(1, 20))
+        elements.append(Paragraph(f"Отчет сгенерирован: {timestamp} | Записей: {len(rows)}", footer_style))
 
-            if orders_data:
-                table_data = []
-                headers = ['vessel_code', 'order_date', 'client_name', 'services_names', 'total_amount', 'status']
-                header_row = [DataExporter._format_header(header) for header in headers]
-                table_data.append(header_row)
+        doc.build(elements)
 
-                for order in orders_data:
-                    table_row = [
-                        order.get('vessel_code', ''),
-                        order.get('order_date', ''),
-                        order.get('client_name', ''),
-                        order.get('services_names', ''),
-                        f"{order.get('total_amount', 0):.2f} руб.",
-                        DataExporter._format_status(order.get('status', ''))
-                    ]
-                    table_data.append(table_row)
+    @staticmethod
+    def render_orders_report(orders_data: Iterable[Dict], filename: str, date_from: str, date_to: str,
+                             rows_per_file: Optional[int] = None) -> List[str]:
+        """Формирует PDF-отчет по заказам и возвращает список созданных файлов.
+
+        orders_data читается один раз, поэтому подходит поток строк из БД.
+        Если строк больше rows_per_file, отчет делится на файлы
+        <имя>_part1.pdf, <имя>_part2.pdf и т.д.
+        """
+        if not REPORTLAB_AVAILABLE:
+            raise RuntimeError("PDF экспорт недоступен: не установлен reportlab")
 
-                table = Table(table_data, repeatRows=1)
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                    ('FONTSIZE', (0, 1), (-1, -1), 8),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ]))
-
-                elements.append(Spacer(1, 15))
-                elements.append(table)
+        rows_per_file = rows_per_file or DataExporter.PDF_ROWS_PER_FILE
+        widths = [width * mm for width in DataExporter.ORDERS_REPORT_WIDTHS_MM]
+        title = f"Отчет по заказам ОТК\nпериод с {date_from} по {date_to}"
+        stem, ext = os.path.splitext(filename)
 
-            timestamp = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
-            footer_style = ParagraphStyle(
-                'Footer',
-                parent=styles['Normal'],
-                fontSize=8,
-                alignment=2
-            )
-            elements.append(Spacer(1, 20))
-            elements.append(Paragraph(f"Отчет сгенерирован: {timestamp}", footer_style))
+        files = []
+        rows = []
+        try:
+            for order in orders_data:
+                if len(rows) == rows_per_file:
+                    part_filename = f"{stem}_part{len(files) + 1}{ext}"
+                    DataExporter._build_orders_report_part(rows, part_filename,
+                                                           f"{title}, часть {len(files) + 1}", widths)
+                    files.append(part_filename)
+                    rows = []
+                rows.append(DataExporter._orders_report_row(order, widths))
+        finally:
+            close_source(orders_data)
+
+        if files:
+            part_filename = f"{stem}_part{len(files) + 1}{ext}"
+            DataExporter._build_orders_report_part(rows, part_filename, f"{title}, часть {len(files) + 1}", widths)
+            files.append(part_filename)
+        else:
+            DataExporter._build_orders_report_part(rows, filename, title, widths)
+            files.append(filename)
+
+        return files
 
-            doc.build(elements)
+    @staticmethod
+    def export_orders_report(orders_data: Iterable[Dict], filename: str, date_from: str, date_to: str,
+                             rows_per_file: Optional[int] = None) -> bool:
+        try:
+            DataExporter.render_orders_report(orders_data, filename, date_from, date_to, rows_per_file)
             return True
-
         except Exception as e:
             print(f"Ошибка генерации отчета: {e}")
             return False
@@ -1,11 +1,12 @@
 import os
-import csv
 from datetime import datetime, date
 from typing import Any, Dict, List
 from decimal import Decimal
 from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem
 from PyQt6.QtCore import QDate
 
+from utils.exporters import DataExporter
+
 
 class Helpers:
     @staticmethod
@@ -65,7 +66,7 @@ class Helpers:
 
     @staticmethod
     def format_currency(amount: Decimal) -> str:
-        return f"{amount:,.2f} руб.".replace(',', ' ').replace('.', ',')
+        return f"{amount:,.2f}".replace(',', ' ').replace('.', ',') + " руб."
 
     @staticmethod
     def parse_currency(currency_str: str) -> Decimal:
@@ -86,21 +87,11 @@ class Helpers:
     @staticmethod
     def export_to_csv(data: List[Dict], filename: str, headers: Dict[str, str] = None):
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                if not data:
-                    return False
-
-                fieldnames = list(data[0].keys())
-                if headers:
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writerow(headers)
-                else:
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-
-                for row in data:
-                    writer.writerow(row)
+            if not data:
+                return False
 
+            header = [headers.get(field, '') for field in data[0]] if headers else None
+            DataExporter.write_csv([data], filename, delimiter=',', header=header, encoding='utf-8')
             return True
         except Exception as e:
             print(f"Ошибка экспорта в CSV: {e}")
@@ -127,8 +118,7 @@ class Helpers:
     @staticmethod
     def get_next_vessel_code() -> str:
         from database import db_instance
-        last_id = db_instance.get_last_order_id()
-        return f"VS{last_id + 1:06d}"
+        return db_instance.next_vessel_code()
 
     @staticmethod
     def format_phone(phone: str) -> str:
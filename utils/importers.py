@@ -0,0 +1,352 @@
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.client import Client
+from models.order import Order
+from utils.validators import validators
+
+# Чтение XLSX для импорта клиентов
+try:
+    import openpyxl
+
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+
+@dataclass
+class ImportResult:
+    """Итог импорта: прочитано записей, вставлено, отказы (номер строки, причина)"""
+    total: int = 0
+    imported: int = 0
+    rejected: List[Tuple[int, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (f"Записей: {self.total}, импортировано: {self.imported}, "
+                f"отклонено: {len(self.rejected)}, {self.rows_per_second:.0f} записей/с")
+
+
+class OrderImporter:
+    """Импорт заказов из CSV или JSONL через Database.import_orders.
+
+    CSV (разделитель ';', UTF-8): строка на услугу заказа, строки одного заказа
+    идут подряд с одинаковым vessel_code. Столбцы: vessel_code, client_id,
+    order_date, service_id и необязательные quantity, unit_price (по умолчанию
+    цена из каталога), status, completed_at.
+
+    JSONL: объект заказа на строку с теми же полями и списком services из
+    объектов service_id, quantity, unit_price.
+
+    Сумма заказа считается по услугам, заказ проверяется Order.validate.
+    """
+
+    CSV_DELIMITER = ';'
+    CSV_REQUIRED = ('vessel_code', 'client_id', 'order_date', 'service_id')
+    FORMATS = ('csv', 'jsonl')
+
+    def __init__(self, database, created_by: int, batch_size: int = 500):
+        self.database = database
+        self.created_by = created_by
+        self.batch_size = batch_size
+        self._prices = {service['id']: service['price'] for service in database.get_services()}
+
+    @classmethod
+    def detect_format(cls, filename: str, fmt: str = None) -> str:
+        fmt = fmt or os.path.splitext(filename)[1].lower().lstrip('.')
+        if fmt == 'json':
+            fmt = 'jsonl'
+        if fmt not in cls.FORMATS:
+            raise ValueError(f"Неизвестный формат импорта: {fmt}")
+        return fmt
+
+    def read_csv(self, filename: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Заказы из CSV: (номер первой строки заказа, поля заказа со списком services)"""
+        with open(filename, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f, delimiter=self.CSV_DELIMITER)
+            missing = [name for name in self.CSV_REQUIRED if name not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"В CSV нет столбцов: {', '.join(missing)}")
+
+            current = None
+            for row in reader:
+                vessel_code = (row['vessel_code'] or '').strip()
+                if current is None or vessel_code != current[1]['vessel_code']:
+                    if current is not None:
+                        yield current
+                    order = {name: (row.get(name) or '').strip() or None
+                             for name in ('client_id', 'order_date', 'status', 'completed_at')}
+                    order['vessel_code'] = vessel_code
+                    order['services'] = []
+                    current = (reader.line_num, order)
+
+                current[1]['services'].append({
+                    'service_id': row['service_id'],
+                    'quantity': row.get('quantity') or 1,
+                    'unit_price': row.get('unit_price') or None
+                })
+
+            if current is not None:
+                yield current
+
+    @staticmethod
+    def read_jsonl(filename: str) -> Iterator[Tuple[int, Any]]:
+        with open(filename, encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_num, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_num, f"Некорректный JSON: {e.msg}"
+
+    def prepare(self, data: Any) -> Tuple[Optional[Tuple[Dict, List[Dict]]], str]:
+        """Приводит типы и проверяет заказ; возвращает ((заказ, услуги), "") или (None, причина)"""
+        if isinstance(data, str):
+            return None, data
+        if not isinstance(data, dict):
+            return None, "Ожидается объект заказа"
+
+        try:
+            services = []
+            for service in data.get('services') or []:
+                service_id = int(service['service_id'])
+                unit_price = service.get('unit_price')
+                if unit_price in (None, ''):
+                    if service_id not in self._prices:
+                        return None, f"Услуга не найдена: {service_id}"
+                    unit_price = self._prices[service_id]
+                services.append({
+                    'service_id': service_id,
+                    'quantity': int(service.get('quantity') or 1),
+                    'unit_price': Decimal(str(unit_price).replace(',', '.'))
+                })
+            client_id = int(data['client_id']) if data.get('client_id') not in (None, '') else None
+        except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+            return None, f"Некорректное значение: {e}"
+
+        order = Order.from_dict({
+            'vessel_code': (data.get('vessel_code') or '').strip(),
+            'client_id': client_id,
+            'order_date': data.get('order_date'),
+            'status': data.get('status') or 'new',
+            'created_by': self.created_by,
+            'completed_at': data.get('completed_at'),
+            'services': services
+        })
+        order.total_amount = sum((item.total_price for item in order.items), Decimal('0.00'))
+
+        is_valid, message = order.validate()
+        if not is_valid:
+            return None, message
+
+        if not order.order_date:
+            return None, "Дата заказа обязательна"
+        is_valid, message = validators.validate_date(order.order_date)
+        if not is_valid:
+            return None, message
+
+        if order.status not in Order.STATUS_CHOICES:
+            return None, f"Неизвестный статус: {order.status}"
+
+        if any(service['quantity'] <= 0 for service in services):
+            return None, "Количество услуги должно быть больше 0"
+
+        order_data = order.to_dict()
+        order_data['completed_at'] = order.completed_at
+        for service in services:
+            service['unit_price'] = float(service['unit_price'])
+        return (order_data, services), ""
+
+    def import_records(self, records: Iterable[Tuple[int, Any]]) -> ImportResult:
+        result = ImportResult()
+        started = time.perf_counter()
+
+        def valid_records():
+            for line, data in records:
+                result.total += 1
+                prepared, message = self.prepare(data)
+                if prepared is None:
+                    result.rejected.append((line, message))
+                else:
+                    yield (line,) + prepared
+
+        result.imported, rejected = self.database.import_orders(valid_records(), self.batch_size)
+        result.rejected.extend(rejected)
+        result.rejected.sort()
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def import_file(self, filename: str, fmt: str = None) -> ImportResult:
+        fmt = self.detect_format(filename, fmt)
+        records = self.read_csv(filename) if fmt == 'csv' else self.read_jsonl(filename)
+        return self.import_records(records)
+
+
+class ClientImporter:
+    """Импорт клиентов из CSV (разделитель ';', UTF-8) или XLSX (первый лист).
+
+    Первая строка - заголовки с именами полей clients (client_type,
+    company_name, inn, phone, ...). Строки обрабатываются порциями по
+    CHUNK_SIZE: каждая проверка проходит целый столбец порции, дубли ИНН и
+    паспортов ищутся одним запросом на порцию и внутри файла. Телефоны
+    приводятся к виду 7XXXXXXXXXX.
+    """
+
+    CSV_DELIMITER = ';'
+    FORMATS = ('csv', 'xlsx')
+    CHUNK_SIZE = 5000
+    CLIENT_TYPES = ('legal', 'individual')
+
+    def __init__(self, database, batch_size: int = 1000):
+        self.database = database
+        self.batch_size = batch_size
+        self._seen_inns = set()
+        self._seen_passports = set()
+
+    @classmethod
+    def detect_format(cls, filename: str, fmt: str = None) -> str:
+        fmt = fmt or os.path.splitext(filename)[1].lower().lstrip('.')
+        if fmt not in cls.FORMATS:
+            raise ValueError(f"Неизвестный формат импорта: {fmt}")
+        if fmt == 'xlsx' and not OPENPYXL_AVAILABLE:
+            raise RuntimeError("Импорт из XLSX недоступен: не установлен openpyxl")
+        return fmt
+
+    @staticmethod
+    def _clean(value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            value = value.date()
+        if isinstance(value, date):
+            return value.isoformat()
+        # Числовые ячейки XLSX (ИНН, счет, телефон) - без ".0"
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        value = str(value).strip()
+        return value or None
+
+    def read_csv(self, filename: str) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+        with open(filename, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f, delimiter=self.CSV_DELIMITER)
+            for row in reader:
+                yield reader.line_num, {name: self._clean(value) for name, value in row.items() if name}
+
+    def read_xlsx(self, filename: str) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+        workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [self._clean(name) for name in next(rows, ())]
+            for line, values in enumerate(rows, 2):
+                if not any(value is not None for value in values):
+                    continue
+                yield line, {name: self._clean(value) for name, value in zip(header, values) if name}
+        finally:
+            workbook.close()
+
+    def validate_chunk(self, rows: List[Tuple[int, Dict]]) -> Tuple[List[Tuple[int, Dict]], List[Tuple[int, str]]]:
+        """Проверяет порцию строк по столбцам; возвращает (клиенты к вставке, отказы)"""
+        lines = [line for line, _ in rows]
+        data = [row for _, row in rows]
+
+        def column(name):
+            return [row.get(name) for row in data]
+
+        client_types = column('client_type')
+        is_legal = [client_type == 'legal' for client_type in client_types]
+        phones, phone_errors = validators.normalize_phone_column(column('phone'))
+
+        errors = {
+            'client_type': ["" if client_type in self.CLIENT_TYPES else "Тип клиента должен быть legal или individual"
+                            for client_type in client_types],
+            'name': ["" if (company_name if legal else full_name) else
+                     "Название компании обязательно" if legal else "ФИО обязательно"
+                     for legal, company_name, full_name in zip(is_legal, column('company_name'),
+                                                               column('full_name'))],
+            'phone': phone_errors,
+            'email': validators.validate_email_column(column('email')),
+            'requisites': validators.validate_requisites_columns(column('inn'), column('bank_account'),
+                                                                column('bik')),
+            'passport': validators.validate_passport_columns(column('passport_series'),
+                                                             column('passport_number')),
+            'birth_date': validators.validate_date_column(column('birth_date')),
+        }
+        # Реквизиты проверяются только у своего типа клиента, лишние поля отбрасывает Client.to_dict
+        for name in ('requisites', 'passport', 'birth_date'):
+            legal_field = name == 'requisites'
+            errors[name] = [error if legal == legal_field else ""
+                            for legal, error in zip(is_legal, errors[name])]
+        row_errors = validators.first_errors(errors, len(rows))
+
+        clients = []
+        for row, phone, error in zip(data, phones, row_errors):
+            client = Client.from_dict(dict(row, phone=phone)).to_dict() if not error else None
+            clients.append(client)
+
+        existing_inns, existing_passports = self.database.find_existing_clients(
+            [client.get('inn') for client in clients if client],
+            [(client.get('passport_series'), client.get('passport_number')) for client in clients if client]
+        )
+
+        accepted, rejected = [], []
+        for line, client, error in zip(lines, clients, row_errors):
+            if error:
+                rejected.append((line, error))
+                continue
+
+            inn = client.get('inn')
+            passport = (client.get('passport_series'), client.get('passport_number'))
+            if inn and (inn in existing_inns or inn in self._seen_inns):
+                rejected.append((line, f"Клиент с ИНН {inn} уже существует"))
+            elif all(passport) and (passport in existing_passports or passport in self._seen_passports):
+                rejected.append((line, f"Клиент с паспортом {' '.join(passport)} уже существует"))
+            else:
+                if inn:
+                    self._seen_inns.add(inn)
+                if all(passport):
+                    self._seen_passports.add(passport)
+                accepted.append((line, client))
+
+        return accepted, rejected
+
+    def import_records(self, records: Iterable[Tuple[int, Dict]]) -> ImportResult:
+        result = ImportResult()
+        started = time.perf_counter()
+
+        def valid_records():
+            chunk = []
+            for record in records:
+                chunk.append(record)
+                if len(chunk) >= self.CHUNK_SIZE:
+                    yield from self._validate_counted(chunk, result)
+                    chunk = []
+            if chunk:
+                yield from self._validate_counted(chunk, result)
+
+        result.imported, rejected = self.database.import_clients(valid_records(), self.batch_size)
+        result.rejected.extend(rejected)
+        result.rejected.sort()
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _validate_counted(self, chunk: List[Tuple[int, Dict]], result: ImportResult) -> List[Tuple[int, Dict]]:
+        result.total += len(chunk)
+        accepted, rejected = self.validate_chunk(chunk)
+        result.rejected.extend(rejected)
+        return accepted
+
+    def import_file(self, filename: str, fmt: str = None) -> ImportResult:
+        fmt = self.detect_format(filename, fmt)
+        records = self.read_csv(filename) if fmt == 'csv' else self.read_xlsx(filename)
+        return self.import_records(records)
@@ -1,6 +1,37 @@
 import re
 from datetime import datetime
-from typing import Optional, Tuple
+from operator import getitem
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Проверки столбцов для пакетного импорта: шаблоны и таблицы собираются один раз,
+# функция *_column проходит весь столбец и возвращает ошибку для каждой строки ("" - без ошибки)
+_DIGITS_RE = re.compile(r'[0-9]+')
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_DATE_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+_PHONE_SEPARATORS = str.maketrans('', '', ' -()+')
+# b'0'..b'9' -> 0..9: строка цифр переводится в значения одним bytes.translate
+_DIGIT_VALUES = bytes(range(256)).replace(b'0123456789', bytes(range(10)))
+
+# Весовые коэффициенты контрольных цифр ИНН: (веса, позиция контрольной цифры)
+INN_CHECKS = {
+    10: (((2, 4, 10, 3, 5, 9, 4, 6, 8), 9),),
+    12: (((7, 2, 4, 10, 3, 5, 9, 4, 6, 8), 10),
+         ((3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8), 11)),
+}
+# Таблицы произведений "вес * цифра" по позициям: контрольная сумма - sum(map(getitem, таблицы, цифры))
+_INN_TABLES = {
+    length: tuple((tuple(bytes(weight * digit for digit in range(10)) for weight in weights), position)
+                  for weights, position in checks)
+    for length, checks in INN_CHECKS.items()
+}
+
+# Контрольный ключ счета: 3 цифры по БИК + 20 цифр счета с весами 7, 1, 3, ...;
+# сумма младших разрядов произведений должна делиться на 10
+ACCOUNT_KEY_WEIGHTS = (7, 1, 3) * 7 + (7, 1)
+_ACCOUNT_KEY_TABLES = tuple(bytes(weight * digit % 10 for digit in range(10)) for weight in ACCOUNT_KEY_WEIGHTS)
+# БИК подразделений Банка России (РКЦ) оканчивается на 000-002, для них берется "0" + 5-6 цифры БИК
+_RKC_SUFFIXES = frozenset(('000', '001', '002'))
+ACCOUNT_KEY_ERROR = "Неверный контрольный ключ расчетного счета (проверьте счет и БИК)"
 
 
 class Validators:
@@ -11,12 +42,15 @@ class Validators:
 
         inn = inn.strip()
 
-        if not inn.isdigit():
+        if not _DIGITS_RE.fullmatch(inn):
             return False, "ИНН должен содержать только цифры"
 
         if len(inn) not in [10, 12]:
             return False, "ИНН должен содержать 10 или 12 цифр"
 
+        if not Validators.inn_checksum_valid(inn):
+            return False, "Неверная контрольная цифра ИНН"
+
         return True, ""
 
     @staticmethod
@@ -75,18 +109,23 @@ class Validators:
             return False, "Неверный формат даты. Используйте ГГГГ-ММ-ДД"
 
     @staticmethod
-    def validate_bank_account(account: str) -> Tuple[bool, str]:
+    def validate_bank_account(account: str, bik: Optional[str] = None) -> Tuple[bool, str]:
+        """С корректным БИК дополнительно проверяется контрольный ключ счета"""
         if not account:
             return True, ""
 
         account = account.strip()
 
-        if not account.isdigit():
+        if not _DIGITS_RE.fullmatch(account):
             return False, "Расчетный счет должен содержать только цифры"
 
         if len(account) != 20:
             return False, "Расчетный счет должен содержать 20 цифр"
 
+        bik = (bik or "").strip()
+        if len(bik) == 9 and _DIGITS_RE.fullmatch(bik) and not Validators.account_key_valid(account, bik):
+            return False, ACCOUNT_KEY_ERROR
+
         return True, ""
 
     @staticmethod
@@ -96,7 +135,7 @@ class Validators:
 
         bik = bik.strip()
 
-        if not bik.isdigit():
+        if not _DIGITS_RE.fullmatch(bik):
             return False, "БИК должен содержать только цифры"
 
         if len(bik) != 9:
@@ -127,5 +166,146 @@ class Validators:
 
         return True, ""
 
+    @staticmethod
+    def inn_checksum_valid(inn: str) -> bool:
+        """Контрольные цифры ИНН из 10 или 12 цифр"""
+        checks = _INN_TABLES.get(len(inn))
+        if checks is None:
+            return False
+        digits = inn.encode('ascii').translate(_DIGIT_VALUES)
+        for tables, position in checks:
+            if sum(map(getitem, tables, digits)) % 11 % 10 != digits[position]:
+                return False
+        return True
+
+    @staticmethod
+    def account_key_valid(account: str, bik: str) -> bool:
+        """Контрольный ключ 20-значного счета по 9-значному БИК"""
+        suffix = bik[6:9]
+        prefix = '0' + bik[4:6] if suffix in _RKC_SUFFIXES else suffix
+        digits = (prefix + account).encode('ascii').translate(_DIGIT_VALUES)
+        return len(digits) == 23 and sum(map(getitem, _ACCOUNT_KEY_TABLES, digits)) % 10 == 0
+
+    @staticmethod
+    def validate_digits_column(values: Sequence[Optional[str]], lengths: Sequence[int],
+                               name: str) -> List[str]:
+        """Пустое значение допустимо, иначе только цифры и длина из lengths"""
+        lengths_text = " или ".join(str(length) for length in lengths)
+        digits_error = f"{name} должен содержать только цифры"
+        length_error = f"{name} должен содержать {lengths_text} цифр"
+        fullmatch = _DIGITS_RE.fullmatch
+
+        return ["" if not value else
+                digits_error if not fullmatch(value) else
+                length_error if len(value) not in lengths else ""
+                for value in values]
+
+    @staticmethod
+    def validate_inn_column(values: Sequence[Optional[str]]) -> List[str]:
+        errors = Validators.validate_digits_column(values, (10, 12), "ИНН")
+        checksum_valid = Validators.inn_checksum_valid
+        return [error or ("" if not value or checksum_valid(value) else "Неверная контрольная цифра ИНН")
+                for value, error in zip(values, errors)]
+
+    @staticmethod
+    def validate_bik_column(values: Sequence[Optional[str]]) -> List[str]:
+        return Validators.validate_digits_column(values, (9,), "БИК")
+
+    @staticmethod
+    def validate_bank_account_column(values: Sequence[Optional[str]],
+                                     biks: Optional[Sequence[Optional[str]]] = None) -> List[str]:
+        """С biks ключ счета проверяется в строках, где БИК из 9 цифр"""
+        errors = Validators.validate_digits_column(values, (20,), "Расчетный счет")
+        if biks is None:
+            return errors
+
+        key_valid = Validators.account_key_valid
+        fullmatch = _DIGITS_RE.fullmatch
+        return [error or ("" if not value or not bik or len(bik) != 9 or not fullmatch(bik)
+                          or key_valid(value, bik) else ACCOUNT_KEY_ERROR)
+                for value, bik, error in zip(values, biks, errors)]
+
+    @staticmethod
+    def validate_requisites_columns(inns: Sequence[Optional[str]], bank_accounts: Sequence[Optional[str]],
+                                    biks: Sequence[Optional[str]]) -> List[str]:
+        """ИНН, БИК и ключ счета построчно: первая ошибка строки ("" - без ошибки)"""
+        columns = {
+            'inn': Validators.validate_inn_column(inns),
+            'bik': Validators.validate_bik_column(biks),
+            'bank_account': Validators.validate_bank_account_column(bank_accounts, biks),
+        }
+        return Validators.first_errors(columns, len(inns))
+
+    @staticmethod
+    def validate_passport_columns(series: Sequence[Optional[str]],
+                                  numbers: Sequence[Optional[str]]) -> List[str]:
+        fullmatch = _DIGITS_RE.fullmatch
+        errors = []
+        for value_series, value_number in zip(series, numbers):
+            if not value_series and not value_number:
+                errors.append("")
+            elif not value_series or not fullmatch(value_series) or len(value_series) != 4:
+                errors.append("Серия паспорта должна содержать 4 цифры")
+            elif not value_number or not fullmatch(value_number) or len(value_number) != 6:
+                errors.append("Номер паспорта должен содержать 6 цифр")
+            else:
+                errors.append("")
+        return errors
+
+    @staticmethod
+    def normalize_phone_column(values: Sequence[Optional[str]]) -> Tuple[List[Optional[str]], List[str]]:
+        """Телефоны к виду 7XXXXXXXXXX; возвращает (номера, ошибки)"""
+        fullmatch = _DIGITS_RE.fullmatch
+        phones, errors = [], []
+        for value in values:
+            phone = (value or "").translate(_PHONE_SEPARATORS)
+            if not phone:
+                phones.append(None)
+                errors.append("Телефон обязателен")
+            elif not fullmatch(phone):
+                phones.append(value)
+                errors.append("Телефон должен содержать только цифры")
+            elif len(phone) == 10:
+                phones.append('7' + phone)
+                errors.append("")
+            elif len(phone) == 11:
+                phones.append('7' + phone[1:] if phone[0] == '8' else phone)
+                errors.append("")
+            else:
+                phones.append(value)
+                errors.append("Телефон должен содержать 10 или 11 цифр")
+        return phones, errors
+
+    @staticmethod
+    def validate_email_column(values: Sequence[Optional[str]]) -> List[str]:
+        fullmatch = _EMAIL_RE.fullmatch
+        return ["" if not value or fullmatch(value) else "Неверный формат email" for value in values]
+
+    @staticmethod
+    def validate_date_column(values: Sequence[Optional[str]]) -> List[str]:
+        errors = []
+        for value in values:
+            if not value:
+                errors.append("")
+                continue
+            try:
+                if not _DATE_RE.fullmatch(value):
+                    raise ValueError
+                datetime.strptime(value, '%Y-%m-%d')
+                errors.append("")
+            except ValueError:
+                errors.append("Неверный формат даты. Используйте ГГГГ-ММ-ДД")
+        return errors
+
+    @staticmethod
+    def first_errors(columns: Dict[str, List[str]], count: int) -> List[str]:
+        """Первая ошибка каждой строки по столбцам ошибок в порядке columns"""
+        result = [""] * count
+        for errors in columns.values():
+            for row, error in enumerate(errors):
+                if error and not result[row]:
+                    result[row] = error
+        return result
+
 
 validators = Validators()
\ No newline at end of file
@@ -0,0 +1,152 @@
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    # token, результат, время выполнения в секундах
+    finished = pyqtSignal(object, object, float)
+    # token, текст ошибки
+    error = pyqtSignal(object, str)
+
+
+class QueryWorker(QRunnable):
+    """Выполняет запрос к БД в пуле потоков Qt и возвращает результат сигналом.
+
+    token передается обратно в сигналах, чтобы представление могло
+    отбросить ответы на устаревшие запросы.
+    """
+
+    def __init__(self, fn: Callable[..., Any], *args, token: Any = None, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.token = token
+        self.signals = WorkerSignals()
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self) -> None:
+        if self._cancelled:
+            return
+
+        started = time.perf_counter()
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self._cancelled:
+                self.signals.error.emit(self.token, str(e))
+            return
+
+        if not self._cancelled:
+            self.signals.finished.emit(self.token, result, time.perf_counter() - started)
+
+    def start(self, pool: QThreadPool = None) -> None:
+        (pool or QThreadPool.globalInstance()).start(self)
+
+
+class StreamWorkerSignals(QObject):
+    # token, порция строк
+    chunk = pyqtSignal(object, object)
+    # token, получено строк, оценка общего числа (0 - неизвестно)
+    progress = pyqtSignal(object, int, int)
+    # token, всего строк, время выполнения в секундах
+    finished = pyqtSignal(object, int, float)
+    # token, текст ошибки
+    error = pyqtSignal(object, str)
+    cancelled = pyqtSignal(object)
+
+
+class StreamQueryWorker(QRunnable):
+    """Выполняет потоковую выборку и передает строки порциями.
+
+    iter_fn(*args, **kwargs) возвращает итератор порций, count_fn(*args, **kwargs) -
+    оценку общего числа строк. count_fn выполняется на соединении из пула database,
+    удерживаемом на все время выборки, iter_fn - на отдельных соединениях потоковых
+    выборок (ConnectionPool.thread_streams). cancel() прерывает выполняющиеся на них
+    запросы через sqlite3.Connection.interrupt().
+    """
+
+    def __init__(self, database, iter_fn: Callable[..., Iterable], *args,
+                 count_fn: Callable[..., int] = None, token: Any = None, **kwargs):
+        super().__init__()
+        self.database = database
+        self.iter_fn = iter_fn
+        self.count_fn = count_fn
+        self.args = args
+        self.kwargs = kwargs
+        self.token = token
+        self.signals = StreamWorkerSignals()
+        self._cancelled = False
+        self._conn = None
+        self._streams = []
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+            for conn in list(self._streams):
+                conn.interrupt()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        fetched = 0
+        try:
+            with self.database.get_connection() as conn:
+                with self._lock:
+                    if self._cancelled:
+                        self.signals.cancelled.emit(self.token)
+                        return
+                    self._conn = conn
+                    self._streams = self.database.pool.thread_streams()
+                try:
+                    total = self.count_fn(*self.args, **self.kwargs) if self.count_fn else 0
+                    self.signals.progress.emit(self.token, 0, total)
+
+                    chunks = self.iter_fn(*self.args, **self.kwargs)
+                    try:
+                        for chunk in chunks:
+                            if self._cancelled:
+                                break
+                            fetched += len(chunk)
+                            self.signals.chunk.emit(self.token, chunk)
+                            self.signals.progress.emit(self.token, fetched, max(total, fetched))
+                    finally:
+                        # Генератор закрывается в потоке выборки - его соединение сразу возвращается в пул
+                        close = getattr(chunks, 'close', None)
+                        if close:
+                            close()
+                finally:
+                    # Соединение возвращается в пул - прерывать его больше нельзя
+                    with self._lock:
+                        self._conn = None
+                        self._streams = []
+        except Exception as e:
+            if self._cancelled:
+                self.signals.cancelled.emit(self.token)
+            else:
+                self.signals.error.emit(self.token, str(e))
+            return
+
+        if self._cancelled:
+            self.signals.cancelled.emit(self.token)
+        else:
+            self.signals.finished.emit(self.token, fetched, time.perf_counter() - started)
+
+    def start(self, pool: QThreadPool = None) -> None:
+        (pool or QThreadPool.globalInstance()).start(self)
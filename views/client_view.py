@@ -1,15 +1,20 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
                              QPushButton, QComboBox, QRadioButton, QButtonGroup, QGroupBox,
-                             QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
-                             QDateEdit, QMessageBox, QTabWidget, QTextEdit, QDialog,
+                             QHeaderView, QDateEdit, QMessageBox, QTabWidget, QTextEdit, QDialog,
                              QFormLayout, QFrame, QSizePolicy, QScrollArea, QDialogButtonBox)
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont
 
 from models.client import Client
 from database import db_instance
 from utils.helpers import helpers
 from utils.validators import validators
+from utils.workers import QueryWorker
+from widgets.custom_table import CustomTableView
+from widgets.table_models import ClientTableModel
+
+# Пауза после последнего нажатия клавиши перед запуском поиска (мс)
+SEARCH_DEBOUNCE_MS = 250
 
 
 class ClientDialog(QDialog):
@@ -71,15 +76,15 @@ class ClientDialog(QDialog):
         self.address_edit.setMinimumHeight(35)
 
         self.inn_edit = QLineEdit()
-        self.inn_edit.setPlaceholderText("1234567890")
+        self.inn_edit.setPlaceholderText("7707083893")
         self.inn_edit.setMinimumHeight(35)
 
         self.bank_account_edit = QLineEdit()
-        self.bank_account_edit.setPlaceholderText("40702810123456789012")
+        self.bank_account_edit.setPlaceholderText("40702810938000012345")
         self.bank_account_edit.setMinimumHeight(35)
 
         self.bik_edit = QLineEdit()
-        self.bik_edit.setPlaceholderText("044525123")
+        self.bik_edit.setPlaceholderText("044525225")
         self.bik_edit.setMinimumHeight(35)
 
         company_form.addRow("Название компании *:", self.company_name_edit)
@@ -188,6 +193,9 @@ class ClientDialog(QDialog):
         client_data = self.get_form_data()
         client = Client.from_dict(client_data)
 
+        if self.client_type == 'legal' and not self.check_requisites(client_data):
+            return
+
         is_valid, message = client.validate()
         if not is_valid:
             helpers.show_error(message, self)
@@ -199,6 +207,21 @@ class ClientDialog(QDialog):
         except Exception as e:
             helpers.show_error(f"Ошибка сохранения: {e}", self)
 
+    def check_requisites(self, data):
+        """Контрольные цифры ИНН и ключ счета; при ошибке фокус на поле с ошибкой"""
+        checks = [
+            (self.inn_edit, validators.validate_inn(data['inn'])),
+            (self.bik_edit, validators.validate_bik(data['bik'])),
+            (self.bank_account_edit, validators.validate_bank_account(data['bank_account'], data['bik'])),
+        ]
+        for edit, (is_valid, message) in checks:
+            if not is_valid:
+                helpers.show_error(message, self)
+                edit.setFocus()
+                edit.selectAll()
+                return False
+        return True
+
     def get_form_data(self):
         data = {
             'client_type': self.client_type,
@@ -277,9 +300,15 @@ class ClientTypeDialog(QDialog):
 
 
 class ClientView(QWidget):
+    status_message = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
-        self.clients = []
+        self._search_seq = 0
+        self._search_worker = None
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
         self.setup_ui()
         self.load_clients()
         self.setup_connections()
@@ -315,11 +344,10 @@ class ClientView(QWidget):
         controls_layout.addWidget(self.add_client_btn)
         controls_layout.addWidget(self.refresh_btn)
 
-        self.clients_table = QTableWidget()
-        self.clients_table.setColumnCount(6)
-        self.clients_table.setHorizontalHeaderLabels([
-            "ID", "Тип", "Название/ФИО", "Контакт", "Телефон", "Email"
-        ])
+        self.clients_model = ClientTableModel(self)
+        self.clients_table = CustomTableView()
+        self.clients_table.setSortingEnabled(False)
+        self.clients_table.setModel(self.clients_model)
 
         header = self.clients_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
@@ -329,74 +357,98 @@ class ClientView(QWidget):
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
 
-        self.clients_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.clients_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-
         layout.addLayout(controls_layout)
         layout.addWidget(self.clients_table)
 
     def load_clients(self):
+        self.cancel_search()
         try:
             client_type = self.client_type_combo.currentData()
             if client_type == 'all':
-                self.clients = db_instance.get_clients()
-            else:
-                self.clients = db_instance.get_clients(client_type)
+                client_type = None
 
-            self.populate_clients_table()
+            self.clients_model.set_source(
+                lambda cursor, page_size: db_instance.get_clients_page(client_type, cursor, page_size)
+            )
 
         except Exception as e:
             helpers.show_error(f"Ошибка загрузки клиентов: {e}", self)
 
-    def populate_clients_table(self):
-        self.clients_table.setRowCount(len(self.clients))
-
-        for row, client in enumerate(self.clients):
-            self.clients_table.setItem(row, 0, QTableWidgetItem(str(client['id'])))
-
-            client_type = "Юр. лицо" if client['client_type'] == 'legal' else "Физ. лицо"
-            self.clients_table.setItem(row, 1, QTableWidgetItem(client_type))
-
-            if client['client_type'] == 'legal':
-                display_name = client['company_name'] or "Не указано"
-                contact_info = client['contact_person'] or client['director_name'] or "Не указано"
-            else:
-                display_name = client['full_name'] or "Не указано"
-                contact_info = f"Паспорт: {client['passport_series']} {client['passport_number']}" if client[
-                    'passport_series'] else "Не указано"
-
-            self.clients_table.setItem(row, 2, QTableWidgetItem(display_name))
-            self.clients_table.setItem(row, 3, QTableWidgetItem(contact_info))
-            self.clients_table.setItem(row, 4, QTableWidgetItem(client['phone'] or "Не указано"))
-            self.clients_table.setItem(row, 5, QTableWidgetItem(client['email'] or "Не указано"))
-
     def setup_connections(self):
         self.client_type_combo.currentIndexChanged.connect(self.on_client_type_changed)
         self.search_edit.textChanged.connect(self.on_search)
+        self.search_timer.timeout.connect(self.start_search)
         self.add_client_btn.clicked.connect(self.on_add_client)
         self.refresh_btn.clicked.connect(self.on_refresh)
-        self.clients_table.cellDoubleClicked.connect(self.on_client_double_click)
+        self.clients_table.rowDoubleClicked.connect(self.on_client_double_click)
 
     def on_client_type_changed(self):
-        self.load_clients()
+        if self.search_edit.text().strip():
+            self.start_search()
+        else:
+            self.load_clients()
 
     def on_search(self, text):
         if not text.strip():
+            self.search_timer.stop()
             self.load_clients()
             return
 
-        try:
-            client_type = self.client_type_combo.currentData()
-            if client_type == 'all':
-                search_results = db_instance.search_clients(text.strip())
-            else:
-                search_results = db_instance.search_clients(text.strip(), client_type)
+        # Перезапуск таймера: запрос уйдет только после паузы в наборе
+        self.search_timer.start()
 
-            self.clients = search_results
-            self.populate_clients_table()
+    def cancel_search(self):
+        self.search_timer.stop()
+        self._search_seq += 1
+        if self._search_worker:
+            self._search_worker.cancel()
+            self._search_worker = None
 
-        except Exception as e:
-            helpers.show_error(f"Ошибка поиска: {e}", self)
+    def start_search(self):
+        text = self.search_edit.text().strip()
+        if not text:
+            return
+
+        self.cancel_search()
+
+        client_type = self.client_type_combo.currentData()
+        client_type = None if client_type == 'all' else client_type
+        # Первая страница и общее число найденных - в фоне, остальные страницы при прокрутке
+        worker = QueryWorker(
+            db_instance.search_clients_page,
+            text,
+            client_type,
+            page_size=self.clients_model.PAGE_SIZE,
+            with_total=True,
+            token=(self._search_seq, text, client_type)
+        )
+        worker.signals.finished.connect(self.on_search_finished)
+        worker.signals.error.connect(self.on_search_error)
+
+        self._search_worker = worker
+        worker.start()
+
+    def on_search_finished(self, token, page, elapsed):
+        seq, text, client_type = token
+        # Ответ на устаревший запрос: пользователь уже ввел новый текст
+        if seq != self._search_seq:
+            return
+
+        self._search_worker = None
+        self.clients_model.set_source(
+            lambda cursor, page_size: db_instance.search_clients_page(text, client_type, cursor, page_size),
+            first_page=page
+        )
+        self.status_message.emit(
+            f"Найдено клиентов: {page.total} ({elapsed * 1000:.0f} мс)"
+        )
+
+    def on_search_error(self, token, message):
+        if token[0] != self._search_seq:
+            return
+
+        self._search_worker = None
+        helpers.show_error(f"Ошибка поиска: {message}", self)
 
     def on_add_client(self):
         dialog = ClientTypeDialog(self)
@@ -416,9 +468,9 @@ class ClientView(QWidget):
     def on_refresh(self):
         self.load_clients()
 
-    def on_client_double_click(self, row, column):
-        client_id = int(self.clients_table.item(row, 0).text())
-        client = next((c for c in self.clients if c['id'] == client_id), None)
+    def on_client_double_click(self, row):
+        client_id = self.clients_model.client_id(row)
+        client = db_instance.get_client(client_id) if client_id is not None else None
 
         if client:
             self.show_client_details(client)
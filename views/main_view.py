@@ -7,6 +7,7 @@ from PyQt6.QtGui import QAction, QIcon, QPixmap, QFont
 from auth import auth_manager
 from views.order_view import OrderView
 from views.client_view import ClientView
+from views.order_list_view import OrderListView
 from views.report_view import ReportView
 from utils.helpers import helpers
 
@@ -75,13 +76,17 @@ class MainView(QMainWindow):
         self.tab_widget.setDocumentMode(True)
 
         self.order_view = OrderView()
+        self.order_list_view = OrderListView()
         self.client_view = ClientView()
         self.report_view = ReportView()
 
         self.tab_widget.addTab(self.order_view, "Формирование заказа")
+        self.tab_widget.addTab(self.order_list_view, "Заказы")
         self.tab_widget.addTab(self.client_view, "Управление клиентами")
         self.tab_widget.addTab(self.report_view, "Отчеты")
 
+        self.order_view.order_created.connect(self.order_list_view.load_orders)
+
         main_layout.addWidget(self.tab_widget)
 
     def setup_statusbar(self):
@@ -95,6 +100,9 @@ class MainView(QMainWindow):
         self.user_status_label.setAlignment(Qt.AlignmentFlag.AlignRight)
         self.status_bar.addPermanentWidget(self.user_status_label)
 
+        self.client_view.status_message.connect(self.status_label.setText)
+        self.order_list_view.status_message.connect(self.status_label.setText)
+
     def apply_styles(self):
         self.setStyleSheet("""
             QMainWindow {
@@ -194,13 +202,13 @@ class MainView(QMainWindow):
 
         permissions = auth_manager.get_user_permissions()
 
-        if not permissions.get('can_view_orders'):
-            self.tab_widget.setTabEnabled(1, False)
-
-        if not permissions.get('can_generate_reports'):
-            self.tab_widget.setTabEnabled(2, False)
+        self.tab_widget.setTabEnabled(self.tab_widget.indexOf(self.order_list_view),
+                                      permissions.get('can_view_orders', False))
+        self.tab_widget.setTabEnabled(self.tab_widget.indexOf(self.report_view),
+                                      permissions.get('can_generate_reports', False))
 
         self.order_view.update_permissions(permissions)
+        self.order_list_view.update_permissions(permissions)
         self.client_view.update_permissions(permissions)
         self.report_view.update_permissions(permissions)
 
@@ -0,0 +1,363 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QComboBox, QGroupBox, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QAbstractItemView, QDateEdit, QCheckBox, QFormLayout,
+                             QSplitter)
+from PyQt6.QtCore import Qt, QDate, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont
+
+from database import db_instance
+from auth import auth_manager
+from models.order import Order
+from utils.helpers import helpers
+from utils.workers import QueryWorker
+from widgets.custom_table import CustomTableView
+from widgets.table_models import OrderTableModel
+
+# Пауза после ввода кода сосуда перед обновлением списка (мс)
+FILTER_DEBOUNCE_MS = 300
+
+
+class OrderListView(QWidget):
+    """Список заказов с постраничной подгрузкой и карточкой выбранного заказа.
+
+    Строки списка берутся из Database.get_orders_page по мере прокрутки,
+    услуги заказа загружаются только для выбранной строки.
+    """
+
+    status_message = pyqtSignal(str)
+
+    # (кнопка, целевой статус, свойство Order, разрешающее переход)
+    STATUS_ACTIONS = [
+        ("В работу", 'in_progress', 'can_start'),
+        ("Завершить", 'completed', 'can_complete'),
+        ("Отменить", 'cancelled', 'can_cancel'),
+    ]
+
+    # Сколько отказов перечислять после группового изменения статуса
+    MAX_REJECTED_SHOWN = 10
+
+    def __init__(self):
+        super().__init__()
+        self.permissions = {}
+        self.current_order = None
+        self._details_seq = 0
+        self._details_worker = None
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.setup_ui()
+        self.setup_connections()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(15)
+
+        layout.addLayout(self.create_filters_layout())
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+
+        self.orders_model = OrderTableModel(self)
+        self.orders_table = CustomTableView()
+        self.orders_table.setSortingEnabled(False)
+        # Несколько заказов можно перевести в другой статус за раз
+        self.orders_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.orders_table.setModel(self.orders_model)
+
+        header = self.orders_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
+
+        splitter.addWidget(self.orders_table)
+        splitter.addWidget(self.create_details_group())
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 2)
+
+        layout.addWidget(splitter, 1)
+
+    def create_filters_layout(self):
+        layout = QHBoxLayout()
+
+        self.status_combo = QComboBox()
+        self.status_combo.addItem("Все статусы", "all")
+        for status, title in Order.STATUS_CHOICES.items():
+            self.status_combo.addItem(title, status)
+        self.status_combo.setMinimumHeight(35)
+
+        self.period_check = QCheckBox("Период с")
+
+        self.date_from_edit = QDateEdit()
+        self.date_from_edit.setCalendarPopup(True)
+        self.date_from_edit.setDisplayFormat("dd.MM.yyyy")
+        self.date_from_edit.setDate(QDate.currentDate().addMonths(-1))
+        self.date_from_edit.setMinimumHeight(35)
+
+        self.date_to_edit = QDateEdit()
+        self.date_to_edit.setCalendarPopup(True)
+        self.date_to_edit.setDisplayFormat("dd.MM.yyyy")
+        self.date_to_edit.setDate(QDate.currentDate())
+        self.date_to_edit.setMinimumHeight(35)
+
+        self.vessel_code_edit = QLineEdit()
+        self.vessel_code_edit.setPlaceholderText("Код сосуда...")
+        self.vessel_code_edit.setMinimumHeight(35)
+
+        self.refresh_btn = QPushButton("Обновить")
+        self.refresh_btn.setMinimumHeight(35)
+        self.refresh_btn.setFixedWidth(100)
+
+        layout.addWidget(QLabel("Статус:"))
+        layout.addWidget(self.status_combo)
+        layout.addWidget(self.period_check)
+        layout.addWidget(self.date_from_edit)
+        layout.addWidget(QLabel("по"))
+        layout.addWidget(self.date_to_edit)
+        layout.addWidget(self.vessel_code_edit, 1)
+        layout.addWidget(self.refresh_btn)
+
+        self.on_period_toggled(False)
+        return layout
+
+    def create_details_group(self):
+        group = QGroupBox("Заказ")
+        group.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+
+        layout = QVBoxLayout()
+
+        form = QFormLayout()
+        self.detail_labels = {}
+        for key, title in [('vessel_code', "Код сосуда"), ('order_date', "Дата заказа"),
+                           ('client_name', "Клиент"), ('status', "Статус"),
+                           ('total_amount', "Сумма"), ('created_by_name', "Оформил"),
+                           ('completed_at', "Завершен")]:
+            label = QLabel("-")
+            label.setStyleSheet("font-weight: bold;")
+            form.addRow(title + ":", label)
+            self.detail_labels[key] = label
+
+        self.services_table = QTableWidget()
+        self.services_table.setColumnCount(4)
+        self.services_table.setHorizontalHeaderLabels(["Услуга", "Кол-во", "Цена", "Сумма"])
+        self.services_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.services_table.verticalHeader().setVisible(False)
+        self.services_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+
+        actions_layout = QHBoxLayout()
+        self.status_buttons = {}
+        for title, status, _ in self.STATUS_ACTIONS:
+            button = QPushButton(title)
+            button.setMinimumHeight(35)
+            button.setEnabled(False)
+            button.clicked.connect(lambda checked, s=status: self.on_change_status(s))
+            actions_layout.addWidget(button)
+            self.status_buttons[status] = button
+
+        layout.addLayout(form)
+        layout.addWidget(QLabel("Услуги:"))
+        layout.addWidget(self.services_table, 1)
+        layout.addLayout(actions_layout)
+
+        group.setLayout(layout)
+        return group
+
+    def setup_connections(self):
+        self.status_combo.currentIndexChanged.connect(self.load_orders)
+        self.period_check.toggled.connect(self.on_period_toggled)
+        self.period_check.toggled.connect(self.load_orders)
+        self.date_from_edit.dateChanged.connect(self.on_period_changed)
+        self.date_to_edit.dateChanged.connect(self.on_period_changed)
+        self.vessel_code_edit.textChanged.connect(lambda text: self.filter_timer.start())
+        self.filter_timer.timeout.connect(self.load_orders)
+        self.refresh_btn.clicked.connect(self.load_orders)
+        self.orders_table.selectionModel().currentRowChanged.connect(self.on_current_row_changed)
+        self.orders_table.selectionModel().selectionChanged.connect(
+            lambda selected, deselected: self.update_status_buttons()
+        )
+
+    def on_period_toggled(self, checked):
+        self.date_from_edit.setEnabled(checked)
+        self.date_to_edit.setEnabled(checked)
+
+    def on_period_changed(self):
+        if self.period_check.isChecked():
+            self.load_orders()
+
+    def get_filters(self):
+        filters = {}
+
+        status = self.status_combo.currentData()
+        if status != 'all':
+            filters['status'] = status
+
+        if self.period_check.isChecked():
+            filters['date_from'] = self.date_from_edit.date().toString("yyyy-MM-dd")
+            filters['date_to'] = self.date_to_edit.date().toString("yyyy-MM-dd")
+
+        vessel_code = self.vessel_code_edit.text().strip()
+        if vessel_code:
+            filters['vessel_code'] = vessel_code
+
+        return filters
+
+    def load_orders(self):
+        self.filter_timer.stop()
+        if not self.permissions.get('can_view_orders'):
+            return
+
+        self.clear_details()
+        try:
+            filters = self.get_filters()
+            self.orders_model.set_source(
+                lambda cursor, page_size: db_instance.get_orders_page(filters, cursor, page_size)
+            )
+        except Exception as e:
+            helpers.show_error(f"Ошибка загрузки заказов: {e}", self)
+
+    def on_current_row_changed(self, current, previous):
+        order_id = self.orders_model.order_id(current.row()) if current.isValid() else None
+        if order_id is None:
+            self.clear_details()
+            return
+        self.load_details(order_id)
+
+    def cancel_details(self):
+        self._details_seq += 1
+        if self._details_worker:
+            self._details_worker.cancel()
+            self._details_worker = None
+
+    def load_details(self, order_id):
+        self.cancel_details()
+
+        worker = QueryWorker(db_instance.get_order_details, order_id, token=self._details_seq)
+        worker.signals.finished.connect(self.on_details_finished)
+        worker.signals.error.connect(self.on_details_error)
+
+        self._details_worker = worker
+        worker.start()
+
+    def on_details_finished(self, token, details, elapsed):
+        # Пользователь уже выбрал другую строку
+        if token != self._details_seq:
+            return
+
+        self._details_worker = None
+        if not details:
+            self.clear_details()
+            return
+
+        self.show_details(Order.from_dict(details))
+
+    def on_details_error(self, token, message):
+        if token != self._details_seq:
+            return
+
+        self._details_worker = None
+        helpers.show_error(f"Ошибка загрузки заказа: {message}", self)
+
+    def show_details(self, order):
+        self.current_order = order
+
+        values = {
+            'vessel_code': order.vessel_code,
+            'order_date': helpers.format_date(order.order_date),
+            'client_name': order.client_name or "Не указано",
+            'status': order.status_display,
+            'total_amount': helpers.format_currency(order.total_amount),
+            'created_by_name': order.created_by_name or "-",
+            'completed_at': helpers.format_date(order.completed_at, '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M')
+                             if order.completed_at else "-",
+        }
+        for key, value in values.items():
+            self.detail_labels[key].setText(value)
+
+        self.services_table.setRowCount(len(order.items))
+        for row, item in enumerate(order.items):
+            self.services_table.setItem(row, 0, QTableWidgetItem(item.service_name))
+            self.services_table.setItem(row, 1, QTableWidgetItem(str(item.quantity)))
+            self.services_table.setItem(row, 2, QTableWidgetItem(f"{item.unit_price:.2f}"))
+            self.services_table.setItem(row, 3, QTableWidgetItem(f"{item.total_price:.2f}"))
+
+        self.update_status_buttons()
+
+    def clear_details(self):
+        self.cancel_details()
+        self.current_order = None
+        for label in self.detail_labels.values():
+            label.setText("-")
+        self.services_table.setRowCount(0)
+        self.update_status_buttons()
+
+    def selected_rows(self):
+        return sorted(index.row() for index in self.orders_table.selectionModel().selectedRows())
+
+    def update_status_buttons(self):
+        can_manage = self.permissions.get('can_manage_orders', False)
+        rows = self.selected_rows()
+        for _, status, allowed in self.STATUS_ACTIONS:
+            if len(rows) > 1:
+                # Услуги выбранных заказов не загружены - их наличие проверит БД
+                enabled = any(self.orders_model.order_status(row) in Order.STATUS_TRANSITIONS[status]
+                              for row in rows)
+            else:
+                enabled = self.current_order is not None and getattr(self.current_order, allowed)
+            self.status_buttons[status].setEnabled(bool(can_manage and enabled))
+
+    def on_change_status(self, status):
+        if not self.permissions.get('can_manage_orders'):
+            return
+
+        title = Order.STATUS_CHOICES[status]
+        rows = self.selected_rows()
+        if len(rows) > 1:
+            # Код сосуда - первый столбец модели
+            codes = {self.orders_model.order_id(row): self.orders_model.index(row, 0).data() for row in rows}
+            question = f"Перевести выбранные заказы ({len(codes)}) в статус «{title}»?"
+        elif self.current_order is not None:
+            codes = {self.current_order.id: self.current_order.vessel_code}
+            question = f"Перевести заказ {self.current_order.vessel_code} в статус «{title}»?"
+        else:
+            return
+
+        if not helpers.confirm_action("Изменение статуса", question, self):
+            return
+
+        user = auth_manager.get_current_user()
+        try:
+            results = db_instance.update_orders_status(codes, status, user['id'] if user else None)
+        except Exception as e:
+            helpers.show_error(f"Не удалось изменить статус заказов: {e}", self)
+            return
+
+        rejected = [(codes[order_id], reason) for order_id, reason in results.items() if reason]
+        changed = len(results) - len(rejected)
+
+        if len(results) == 1:
+            if rejected:
+                helpers.show_error(f"Не удалось изменить статус заказа: {rejected[0][1]}", self)
+                return
+            self.status_message.emit(f"Заказ {next(iter(codes.values()))}: {title}")
+        else:
+            self.status_message.emit(f"Статус «{title}»: изменено заказов {changed} из {len(results)}")
+            if rejected:
+                lines = [f"{code}: {reason}" for code, reason in rejected[:self.MAX_REJECTED_SHOWN]]
+                if len(rejected) > self.MAX_REJECTED_SHOWN:
+                    lines.append(f"... и еще {len(rejected) - self.MAX_REJECTED_SHOWN}")
+                helpers.show_warning(f"Статус не изменен у заказов ({len(rejected)}):\n" + "\n".join(lines), self)
+
+        if changed:
+            self.load_orders()
+
+    def update_permissions(self, permissions):
+        self.permissions = permissions
+        can_view = permissions.get('can_view_orders', False)
+        self.setEnabled(can_view)
+
+        if can_view:
+            self.load_orders()
+        else:
+            self.orders_model.clear()
+            self.clear_details()
@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdi
 from PyQt6.QtCore import Qt, QDate, pyqtSignal
 from PyQt6.QtGui import QFont
 from datetime import datetime
+import sqlite3
 
 from models.order import Order, OrderItem
 from models.client import Client
@@ -21,6 +22,8 @@ class OrderView(QWidget):
     def __init__(self):
         super().__init__()
         self.current_order = Order()
+        # Код сосуда остается за формой, пока по нему не создан заказ
+        self.reserved_vessel_code = None
         self.available_services = []
         self.clients = []
         self.setup_ui()
@@ -267,9 +270,10 @@ class OrderView(QWidget):
             self.services_combo.addItem(display_text, service['id'])
 
     def generate_vessel_code(self):
-        next_code = helpers.get_next_vessel_code()
-        self.vessel_code_edit.setText(next_code)
-        self.current_order.vessel_code = next_code
+        if not self.reserved_vessel_code:
+            self.reserved_vessel_code = helpers.get_next_vessel_code()
+        self.vessel_code_edit.setText(self.reserved_vessel_code)
+        self.current_order.vessel_code = self.reserved_vessel_code
 
     def setup_connections(self):
         self.client_type_group.buttonClicked.connect(self.on_client_type_changed)
@@ -389,6 +393,7 @@ class OrderView(QWidget):
                 })
 
             order_id = db_instance.create_order(order_data, services_data)
+            self.reserved_vessel_code = None
 
             helpers.show_info(
                 f"Заказ успешно создан!\nНомер заказа: {order_id}",
@@ -398,6 +403,13 @@ class OrderView(QWidget):
             self.order_created.emit()
             self.on_clear_form()
 
+        except sqlite3.IntegrityError as e:
+            if db_instance.vessel_code_exists(self.current_order.vessel_code):
+                # Код занят заказом, заведенным в обход последовательности - выдаем новый
+                self.reserved_vessel_code = None
+                self.generate_vessel_code()
+                self.update_order_summary()
+            helpers.show_error(f"Ошибка создания заказа: {e}", self)
         except Exception as e:
             helpers.show_error(f"Ошибка создания заказа: {e}", self)
 
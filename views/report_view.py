@@ -1,21 +1,34 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-                             QPushButton, QComboBox, QDateEdit, QTableWidget, QTableWidgetItem,
+                             QPushButton, QComboBox, QDateEdit, QTableView,
                              QHeaderView, QAbstractItemView, QGroupBox, QFormLayout, QFrame,
                              QProgressBar, QMessageBox, QFileDialog, QTabWidget, QTextEdit)
-from PyQt6.QtCore import Qt, QDate, QTimer
+from PyQt6.QtCore import QDate
 from PyQt6.QtGui import QFont
 from datetime import datetime, timedelta
+from functools import partial
 
 from database import db_instance
 from auth import auth_manager
 from utils.helpers import helpers
 from utils.exporters import data_exporter
+from utils.workers import QueryWorker, StreamQueryWorker
+from widgets.table_models import ReportTableModel, SummaryTableModel
 
 
 class ReportView(QWidget):
+    REPORT_CHUNK_SIZE = 500
+
     def __init__(self):
         super().__init__()
-        self.report_data = []
+        self._report_seq = 0
+        self._report_worker = None
+        self._report_period = None
+        self._report_filters = {}
+        self._export_worker = None
+        self._pdf_worker = None
+        self._excel_worker = None
+        self._columnar_worker = None
+        self._summary_worker = None
         self.setup_ui()
         self.setup_connections()
         self.set_default_dates()
@@ -28,12 +41,23 @@ class ReportView(QWidget):
         controls_group = self.create_controls_group()
         main_layout.addWidget(controls_group)
 
+        progress_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
-        main_layout.addWidget(self.progress_bar)
+        self.progress_bar.setFormat("%v из %m")
+        self.cancel_btn = QPushButton("Отменить")
+        self.cancel_btn.setMinimumHeight(25)
+        self.cancel_btn.setFixedWidth(120)
+        self.cancel_btn.setVisible(False)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_btn)
+        main_layout.addLayout(progress_layout)
+
+        summary_group = self.create_summary_group()
+        main_layout.addWidget(summary_group)
 
         results_group = self.create_results_group()
-        main_layout.addWidget(results_group)
+        main_layout.addWidget(results_group, 1)
 
         actions_group = self.create_actions_group()
         main_layout.addWidget(actions_group)
@@ -120,18 +144,72 @@ class ReportView(QWidget):
         group.setLayout(layout)
         return group
 
+    def create_summary_group(self):
+        group = QGroupBox("Сводка за период")
+        group.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+
+        layout = QVBoxLayout()
+
+        kpi_layout = QHBoxLayout()
+        self.kpi_labels = {}
+        for key, title in [('orders_count', "Заказов"), ('revenue', "Выручка"),
+                           ('services_count', "Услуг"), ('average', "Средний чек")]:
+            label = QLabel()
+            label.setFont(QFont("Arial", 11, QFont.Weight.Bold))
+            self.kpi_labels[key] = label
+            kpi_layout.addWidget(QLabel(f"{title}:"))
+            kpi_layout.addWidget(label)
+            kpi_layout.addSpacing(20)
+        kpi_layout.addStretch()
+        layout.addLayout(kpi_layout)
+
+        client_types = {'legal': "Юр. лица", 'individual': "Физ. лица", '': "Без клиента"}
+        self.summary_models = {
+            'by_status': SummaryTableModel('status', labels=ReportTableModel.STATUS_DISPLAY, parent=self),
+            'by_service': SummaryTableModel('service_name', count_field='quantity', parent=self),
+            'by_client_type': SummaryTableModel('client_type', labels=client_types, parent=self),
+        }
+
+        tables_layout = QHBoxLayout()
+        for key, title in [('by_status', "По статусам"), ('by_service', "По услугам"),
+                           ('by_client_type', "По типам клиентов")]:
+            column = QVBoxLayout()
+            column.addWidget(QLabel(title))
+
+            table = QTableView()
+            table.setModel(self.summary_models[key])
+            table.setWordWrap(False)
+            table.setMaximumHeight(150)
+            table.verticalHeader().setVisible(False)
+            table.verticalHeader().setDefaultSectionSize(24)
+            table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+            for section in (1, 2, 3):
+                table.horizontalHeader().setSectionResizeMode(section, QHeaderView.ResizeMode.ResizeToContents)
+            table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+            table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            column.addWidget(table)
+            tables_layout.addLayout(column)
+
+        layout.addLayout(tables_layout)
+        group.setLayout(layout)
+        self.clear_summary()
+        return group
+
     def create_results_group(self):
         group = QGroupBox("Результаты отчета")
         group.setFont(QFont("Arial", 10, QFont.Weight.Bold))
 
         layout = QVBoxLayout()
 
-        self.results_table = QTableWidget()
-        self.results_table.setColumnCount(8)
-        self.results_table.setHorizontalHeaderLabels([
-            "Код сосуда", "Дата заказа", "Клиент", "Тип клиента",
-            "Услуги", "Сумма", "Статус", "ИНН"
-        ])
+        self.results_model = ReportTableModel(self)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_model)
+        self.results_table.setWordWrap(False)
+
+        # Фиксированная высота строк: представлению не нужно измерять каждую строку
+        vertical_header = self.results_table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(28)
 
         header = self.results_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
@@ -142,6 +220,7 @@ class ReportView(QWidget):
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)
+        header.setResizeContentsPrecision(200)
 
         self.results_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.results_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
@@ -160,15 +239,18 @@ class ReportView(QWidget):
         self.export_csv_btn = QPushButton("Экспорт в CSV")
         self.export_pdf_btn = QPushButton("Экспорт в PDF")
         self.export_excel_btn = QPushButton("Экспорт в Excel")
+        self.export_columnar_btn = QPushButton("Экспорт в Parquet")
         self.clear_btn = QPushButton("Очистить")
 
-        for btn in [self.export_csv_btn, self.export_pdf_btn, self.export_excel_btn, self.clear_btn]:
+        for btn in [self.export_csv_btn, self.export_pdf_btn, self.export_excel_btn,
+                    self.export_columnar_btn, self.clear_btn]:
             btn.setMinimumHeight(35)
             btn.setFixedWidth(120)
 
         layout.addWidget(self.export_csv_btn)
         layout.addWidget(self.export_pdf_btn)
         layout.addWidget(self.export_excel_btn)
+        layout.addWidget(self.export_columnar_btn)
         layout.addStretch()
         layout.addWidget(self.clear_btn)
 
@@ -184,9 +266,11 @@ class ReportView(QWidget):
 
     def setup_connections(self):
         self.generate_btn.clicked.connect(self.on_generate_report)
+        self.cancel_btn.clicked.connect(self.on_cancel_report)
         self.export_csv_btn.clicked.connect(self.on_export_csv)
         self.export_pdf_btn.clicked.connect(self.on_export_pdf)
         self.export_excel_btn.clicked.connect(self.on_export_excel)
+        self.export_columnar_btn.clicked.connect(self.on_export_columnar)
         self.clear_btn.clicked.connect(self.on_clear)
 
     def on_quick_filter(self, period):
@@ -217,89 +301,138 @@ class ReportView(QWidget):
             helpers.show_error("Дата 'с' не может быть больше даты 'по'", self)
             return
 
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)
-
-        QTimer.singleShot(100, lambda: self.generate_report_data(date_from, date_to, status))
+        self.generate_report_data(date_from, date_to, status)
 
     def generate_report_data(self, date_from, date_to, status):
-        try:
-            filters = {
-                'date_from': date_from,
-                'date_to': date_to
-            }
+        self.stop_report_worker()
 
-            if status != 'all':
-                filters['status'] = status
+        filters = {}
 
-            self.report_data = db_instance.get_report_data(date_from, date_to)
+        if status != 'all':
+            filters['status'] = status
 
-            if status != 'all':
-                self.report_data = [row for row in self.report_data if row['status'] == status]
+        self._report_seq += 1
+        self._report_period = (date_from, date_to)
+        self._report_filters = filters
+        self.results_model.clear()
+        self.load_summary(date_from, date_to, filters)
 
-            self.populate_results_table()
-
-            helpers.show_info(
-                f"Отчет сформирован\n"
-                f"Период: {helpers.format_date(date_from)} - {helpers.format_date(date_to)}\n"
-                f"Найдено записей: {len(self.report_data)}",
-                self
-            )
-
-        except Exception as e:
-            helpers.show_error(f"Ошибка формирования отчета: {e}", self)
-
-        finally:
-            self.progress_bar.setVisible(False)
-
-    def populate_results_table(self):
-        self.results_table.setRowCount(len(self.report_data))
-
-        for row, data in enumerate(self.report_data):
-            self.results_table.setItem(row, 0, QTableWidgetItem(data['vessel_code']))
-            self.results_table.setItem(row, 1, QTableWidgetItem(helpers.format_date(data['order_date'])))
-            self.results_table.setItem(row, 2, QTableWidgetItem(data['client_name']))
-
-            client_type = "Юр. лицо" if data['client_type'] == 'legal' else "Физ. лицо"
-            self.results_table.setItem(row, 3, QTableWidgetItem(client_type))
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(True)
+        self.cancel_btn.setVisible(True)
+
+        worker = StreamQueryWorker(
+            db_instance,
+            partial(db_instance.iter_report_data, chunk_size=self.REPORT_CHUNK_SIZE),
+            date_from,
+            date_to,
+            filters,
+            count_fn=db_instance.count_report_rows,
+            token=self._report_seq
+        )
+        worker.signals.chunk.connect(self.on_report_chunk)
+        worker.signals.progress.connect(self.on_report_progress)
+        worker.signals.finished.connect(self.on_report_finished)
+        worker.signals.error.connect(self.on_report_error)
+        worker.signals.cancelled.connect(self.on_report_cancelled)
+        self._report_worker = worker
+        worker.start()
+
+    def stop_report_worker(self):
+        if self._report_worker:
+            self._report_worker.cancel()
+            self._report_worker = None
+        if self._summary_worker:
+            self._summary_worker.cancel()
+            self._summary_worker = None
+
+    def load_summary(self, date_from, date_to, filters):
+        # Итоги считаются агрегатными запросами по суточным агрегатам, не по строкам отчета
+        worker = QueryWorker(db_instance.get_report_summary, date_from, date_to, filters,
+                             token=self._report_seq)
+        worker.signals.finished.connect(self.on_summary_finished)
+        worker.signals.error.connect(self.on_summary_error)
+        self._summary_worker = worker
+        worker.start()
+
+    def on_summary_finished(self, token, summary, elapsed):
+        if token != self._report_seq:
+            return
+        self._summary_worker = None
+
+        totals = summary['totals']
+        orders_count = totals['orders_count']
+        self.kpi_labels['orders_count'].setText(str(orders_count))
+        self.kpi_labels['revenue'].setText(helpers.format_currency(totals['revenue']))
+        self.kpi_labels['services_count'].setText(str(totals['services_count']))
+        self.kpi_labels['average'].setText(
+            helpers.format_currency(totals['revenue'] / orders_count) if orders_count else "—"
+        )
 
-            self.results_table.setItem(row, 4, QTableWidgetItem(data['services_names'] or ""))
+        for key, model in self.summary_models.items():
+            model.set_items(summary[key])
 
-            amount_item = QTableWidgetItem(f"{float(data['total_amount']):.2f} руб.")
-            amount_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            self.results_table.setItem(row, 5, amount_item)
+    def on_summary_error(self, token, message):
+        if token != self._report_seq:
+            return
+        self._summary_worker = None
+        self.clear_summary()
+        helpers.show_error(f"Ошибка расчета итогов: {message}", self)
+
+    def clear_summary(self):
+        for label in self.kpi_labels.values():
+            label.setText("—")
+        for model in self.summary_models.values():
+            model.clear()
+
+    def finish_report(self):
+        self._report_worker = None
+        self.progress_bar.setVisible(False)
+        self.cancel_btn.setVisible(False)
 
-            status_display = self.get_status_display(data['status'])
-            status_item = QTableWidgetItem(status_display)
+    def on_cancel_report(self):
+        if self._report_worker:
+            self._report_worker.cancel()
 
-            status_color = self.get_status_color(data['status'])
-            status_item.setBackground(status_color)
+    def on_report_chunk(self, token, rows):
+        if token != self._report_seq:
+            return
+        self.results_model.append_rows(rows)
 
-            self.results_table.setItem(row, 6, status_item)
-            self.results_table.setItem(row, 7, QTableWidgetItem(data['inn'] or ""))
+    def on_report_progress(self, token, fetched, total):
+        if token != self._report_seq:
+            return
+        if total:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(fetched)
 
-    def get_status_display(self, status):
-        status_map = {
-            'new': 'Новый',
-            'in_progress': 'В работе',
-            'completed': 'Завершен',
-            'cancelled': 'Отменен'
-        }
-        return status_map.get(status, status)
+    def on_report_finished(self, token, count, elapsed):
+        if token != self._report_seq:
+            return
+        self.finish_report()
+
+        date_from, date_to = self._report_period
+        helpers.show_info(
+            f"Отчет сформирован\n"
+            f"Период: {helpers.format_date(date_from)} - {helpers.format_date(date_to)}\n"
+            f"Найдено записей: {count}",
+            self
+        )
 
-    def get_status_color(self, status):
-        from PyQt6.QtGui import QColor
+    def on_report_error(self, token, message):
+        if token != self._report_seq:
+            return
+        self.finish_report()
+        helpers.show_error(f"Ошибка формирования отчета: {message}", self)
 
-        color_map = {
-            'new': QColor(255, 255, 200),
-            'in_progress': QColor(200, 230, 255),
-            'completed': QColor(200, 255, 200),
-            'cancelled': QColor(255, 200, 200)
-        }
-        return color_map.get(status, QColor(255, 255, 255))
+    def on_report_cancelled(self, token):
+        if token != self._report_seq:
+            return
+        self.finish_report()
+        helpers.show_warning(f"Формирование отчета отменено, загружено записей: {self.results_model.rowCount()}", self)
 
     def on_export_csv(self):
-        if not self.report_data:
+        if not self.results_model.rowCount():
             helpers.show_warning("Нет данных для экспорта", self)
             return
 
@@ -311,14 +444,33 @@ class ReportView(QWidget):
         )
 
         if filename:
-            success = data_exporter.export_to_csv(self.report_data, filename)
-            if success:
-                helpers.show_info(f"Отчет успешно экспортирован в {filename}", self)
-            else:
-                helpers.show_error("Ошибка экспорта в CSV", self)
+            # Строки читаются из курсора порциями и сразу пишутся в файл
+            date_from, date_to = self._report_period
+            chunks = db_instance.iter_report_rows(date_from, date_to, self._report_filters)
+
+            worker = QueryWorker(data_exporter.export_rows_to_csv, chunks, filename, token=filename)
+            worker.signals.finished.connect(self.on_export_csv_finished)
+            worker.signals.error.connect(self.on_export_csv_error)
+            self._export_worker = worker
+            self.export_csv_btn.setEnabled(False)
+            worker.start()
+
+    def on_export_csv_finished(self, filename, written, elapsed):
+        self._export_worker = None
+        self.export_csv_btn.setEnabled(True)
+
+        if written >= 0:
+            helpers.show_info(f"Отчет успешно экспортирован в {filename}\nЗаписей: {written}", self)
+        else:
+            helpers.show_error("Ошибка экспорта в CSV", self)
+
+    def on_export_csv_error(self, filename, message):
+        self._export_worker = None
+        self.export_csv_btn.setEnabled(True)
+        helpers.show_error(f"Ошибка экспорта в CSV: {message}", self)
 
     def on_export_pdf(self):
-        if not self.report_data:
+        if not self.results_model.rowCount():
             helpers.show_warning("Нет данных для экспорта", self)
             return
 
@@ -330,21 +482,113 @@ class ReportView(QWidget):
         )
 
         if filename:
-            date_from = self.date_from_edit.date().toString("yyyy-MM-dd")
-            date_to = self.date_to_edit.date().toString("yyyy-MM-dd")
+            date_from, date_to = self._report_period
+            orders = data_exporter.iter_rows(
+                db_instance.iter_report_data(date_from, date_to, self._report_filters)
+            )
+
+            worker = QueryWorker(data_exporter.render_orders_report, orders, filename, date_from, date_to,
+                                 token=filename)
+            worker.signals.finished.connect(self.on_export_pdf_finished)
+            worker.signals.error.connect(self.on_export_pdf_error)
+            self._pdf_worker = worker
+            self.export_pdf_btn.setEnabled(False)
+            worker.start()
 
-            success = data_exporter.export_orders_report(self.report_data, filename, date_from, date_to)
-            if success:
-                helpers.show_info(f"Отчет успешно экспортирован в {filename}", self)
-            else:
-                helpers.show_error("Ошибка экспорта в PDF", self)
+    def on_export_pdf_finished(self, filename, files, elapsed):
+        self._pdf_worker = None
+        self.export_pdf_btn.setEnabled(True)
+
+        if len(files) > 1:
+            helpers.show_info(f"Отчет экспортирован в {len(files)} файла(ов):\n" + "\n".join(files), self)
+        else:
+            helpers.show_info(f"Отчет успешно экспортирован в {filename}", self)
+
+    def on_export_pdf_error(self, filename, message):
+        self._pdf_worker = None
+        self.export_pdf_btn.setEnabled(True)
+        helpers.show_error(f"Ошибка экспорта в PDF: {message}", self)
 
     def on_export_excel(self):
-        helpers.show_info("Экспорт в Excel будет реализован в следующей версии", self)
+        if not self.results_model.rowCount():
+            helpers.show_warning("Нет данных для экспорта", self)
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(
+            self,
+            "Экспорт в Excel",
+            f"otk_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+            "Excel Files (*.xlsx)"
+        )
+
+        if filename:
+            date_from, date_to = self._report_period
+            chunks = db_instance.iter_report_rows(date_from, date_to, self._report_filters)
+
+            worker = QueryWorker(data_exporter.export_rows_to_xlsx, chunks, filename, token=filename)
+            worker.signals.finished.connect(self.on_export_excel_finished)
+            worker.signals.error.connect(self.on_export_excel_error)
+            self._excel_worker = worker
+            self.export_excel_btn.setEnabled(False)
+            worker.start()
+
+    def on_export_excel_finished(self, filename, written, elapsed):
+        self._excel_worker = None
+        self.export_excel_btn.setEnabled(True)
+
+        if written >= 0:
+            helpers.show_info(f"Отчет успешно экспортирован в {filename}\nЗаписей: {written}", self)
+        else:
+            helpers.show_error("Ошибка экспорта в Excel", self)
+
+    def on_export_excel_error(self, filename, message):
+        self._excel_worker = None
+        self.export_excel_btn.setEnabled(True)
+        helpers.show_error(f"Ошибка экспорта в Excel: {message}", self)
+
+    def on_export_columnar(self):
+        if not self.results_model.rowCount():
+            helpers.show_warning("Нет данных для экспорта", self)
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(
+            self,
+            "Экспорт для аналитики",
+            f"otk_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+            "Parquet Files (*.parquet);;Feather Files (*.feather);;NumPy Column Bundle (*.npz)"
+        )
+
+        if filename:
+            date_from, date_to = self._report_period
+            chunks = db_instance.iter_report_rows(date_from, date_to, self._report_filters)
+
+            worker = QueryWorker(data_exporter.export_rows_to_columnar, chunks, filename, token=filename)
+            worker.signals.finished.connect(self.on_export_columnar_finished)
+            worker.signals.error.connect(self.on_export_columnar_error)
+            self._columnar_worker = worker
+            self.export_columnar_btn.setEnabled(False)
+            worker.start()
+
+    def on_export_columnar_finished(self, filename, written_file, elapsed):
+        self._columnar_worker = None
+        self.export_columnar_btn.setEnabled(True)
+
+        if written_file:
+            helpers.show_info(f"Отчет успешно экспортирован в {written_file}", self)
+        else:
+            helpers.show_error("Ошибка столбцового экспорта", self)
+
+    def on_export_columnar_error(self, filename, message):
+        self._columnar_worker = None
+        self.export_columnar_btn.setEnabled(True)
+        helpers.show_error(f"Ошибка столбцового экспорта: {message}", self)
 
     def on_clear(self):
-        self.report_data.clear()
-        self.results_table.setRowCount(0)
+        self._report_seq += 1
+        self.stop_report_worker()
+        self.finish_report()
+        self.results_model.clear()
+        self.clear_summary()
         self.set_default_dates()
         self.status_combo.setCurrentIndex(0)
 
@@ -355,10 +599,12 @@ class ReportView(QWidget):
         self.export_csv_btn.setEnabled(can_generate_reports)
         self.export_pdf_btn.setEnabled(can_generate_reports)
         self.export_excel_btn.setEnabled(can_generate_reports)
+        self.export_columnar_btn.setEnabled(can_generate_reports)
 
         if not can_generate_reports:
             tooltip = "Недостаточно прав для генерации отчетов"
             self.generate_btn.setToolTip(tooltip)
             self.export_csv_btn.setToolTip(tooltip)
             self.export_pdf_btn.setToolTip(tooltip)
-            self.export_excel_btn.setToolTip(tooltip)
\ No newline at end of file
+            self.export_excel_btn.setToolTip(tooltip)
+            self.export_columnar_btn.setToolTip(tooltip)
\ No newline at end of file
@@ -0,0 +1,403 @@
+from abc import ABCMeta, abstractmethod
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QBrush, QColor
+
+from utils.helpers import helpers
+
+
+class _ModelMeta(type(QAbstractTableModel), ABCMeta):
+    """Метакласс моделей Qt с абстрактными методами"""
+
+
+class PagedTableModel(QAbstractTableModel, metaclass=_ModelMeta):
+    """Модель, подгружающая строки из БД страницами по мере прокрутки.
+
+    Хранит только отображаемые значения уже загруженных строк (кортежи,
+    первый элемент - id). Источник - метод Database.*_page: следующая
+    страница запрашивается по курсору предыдущей. Подкласс задает
+    _make_row - преобразование строки выборки в кортеж значений.
+    """
+
+    HEADERS: List[str] = []
+    PAGE_SIZE = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[Tuple] = []
+        self._fetch_page: Optional[Callable[[Optional[str], int], Any]] = None
+        self._cursor: Optional[str] = None
+        self._exhausted = True
+
+    def set_source(self, fetch_page: Callable[[Optional[str], int], Any], first_page=None) -> None:
+        """fetch_page(cursor, page_size) возвращает database.Page; first_page -
+        уже полученная первая страница (например, в фоновом потоке)"""
+        self.beginResetModel()
+        self._rows = []
+        self._fetch_page = fetch_page
+        self._cursor = None
+        self._exhausted = False
+        self.endResetModel()
+
+        if first_page is not None:
+            self._append_page(first_page)
+        elif self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def set_items(self, items: List[Dict]) -> None:
+        """Готовый список (например, результаты поиска) без подгрузки"""
+        self.beginResetModel()
+        self._rows = [self._make_row(item) for item in items]
+        self._fetch_page = None
+        self._cursor = None
+        self._exhausted = True
+        self.endResetModel()
+
+    def clear(self) -> None:
+        self.set_items([])
+
+    @staticmethod
+    @abstractmethod
+    def _make_row(item: Dict) -> Tuple:
+        """Кортеж отображаемых значений строки, первый элемент - id"""
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        return not parent.isValid() and not self._exhausted and self._fetch_page is not None
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        if not self.canFetchMore(parent):
+            return
+        self._append_page(self._fetch_page(self._cursor, self.PAGE_SIZE))
+
+    def _append_page(self, page) -> None:
+        self._cursor = page.next_cursor
+        self._exhausted = page.next_cursor is None
+        if not page.items:
+            return
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page.items) - 1)
+        self._rows.extend(self._make_row(item) for item in page.items)
+        self.endInsertRows()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def row_id(self, row: int) -> Optional[int]:
+        if 0 <= row < len(self._rows):
+            return self._rows[row][0]
+        return None
+
+
+class ClientTableModel(PagedTableModel):
+    """Клиенты страницами (Database.get_clients_page / search_clients_page).
+
+    Полная карточка клиента запрашивается отдельно по id (Qt.ItemDataRole.UserRole).
+    """
+
+    HEADERS = ["ID", "Тип", "Название/ФИО", "Контакт", "Телефон", "Email"]
+
+    @staticmethod
+    def _make_row(client: Dict) -> Tuple:
+        if client['client_type'] == 'legal':
+            display_name = client['company_name'] or "Не указано"
+            contact_info = client['contact_person'] or client['director_name'] or "Не указано"
+        else:
+            display_name = client['full_name'] or "Не указано"
+            contact_info = f"Паспорт: {client['passport_series']} {client['passport_number']}" if client[
+                'passport_series'] else "Не указано"
+
+        client_type = "Юр. лицо" if client['client_type'] == 'legal' else "Физ. лицо"
+
+        return (
+            client['id'],
+            client_type,
+            display_name,
+            contact_info,
+            client['phone'] or "Не указано",
+            client['email'] or "Не указано"
+        )
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        row = self._rows[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(row[index.column()])
+        if role == Qt.ItemDataRole.UserRole:
+            return row[0]
+        return None
+
+    def client_id(self, row: int) -> Optional[int]:
+        return self.row_id(row)
+
+
+class OrderTableModel(PagedTableModel):
+    """Заказы страницами (Database.get_orders_page), новые сверху.
+
+    Услуги заказа в список не входят - они загружаются по id (Database.get_order_details).
+    """
+
+    HEADERS = ["Код сосуда", "Дата заказа", "Клиент", "Сумма", "Статус", "Оформил"]
+
+    STATUS_COLUMN = 4
+    AMOUNT_COLUMN = 3
+
+    _status_brushes: Optional[Dict[str, QBrush]] = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        if OrderTableModel._status_brushes is None:
+            OrderTableModel._status_brushes = {
+                status: QBrush(QColor(*color)) for status, color in ReportTableModel.STATUS_COLORS.items()
+            }
+
+    @staticmethod
+    def _make_row(order: Dict) -> Tuple:
+        return (
+            order['id'],
+            order['vessel_code'],
+            helpers.format_date(order['order_date']),
+            order['client_name'] or "Не указано",
+            f"{order['total_amount']:.2f} руб.",
+            order['status'],
+            order['created_by_name'] or ""
+        )
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        row, column = self._rows[index.row()], index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = row[column + 1]
+            if column == self.STATUS_COLUMN:
+                return ReportTableModel.STATUS_DISPLAY.get(value, value)
+            return value
+
+        elif role == Qt.ItemDataRole.BackgroundRole and column == self.STATUS_COLUMN:
+            return self._status_brushes.get(row[column + 1])
+
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column == self.AMOUNT_COLUMN:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+        elif role == Qt.ItemDataRole.UserRole:
+            return row[0]
+
+        return None
+
+    def order_id(self, row: int) -> Optional[int]:
+        return self.row_id(row)
+
+    def order_status(self, row: int) -> Optional[str]:
+        if 0 <= row < len(self._rows):
+            return self._rows[row][5]
+        return None
+
+
+class ReportTableModel(QAbstractTableModel):
+    """Модель результатов отчета на столбцовом буфере.
+
+    Строки хранятся по столбцам (списки строк и array для чисел и кодов),
+    текст ячеек формируется в data() только для видимых строк.
+    """
+
+    HEADERS = ["Код сосуда", "Дата заказа", "Клиент", "Тип клиента",
+               "Услуги", "Сумма", "Статус", "ИНН"]
+
+    STATUSES = ('new', 'in_progress', 'completed', 'cancelled')
+    STATUS_DISPLAY = {
+        'new': 'Новый',
+        'in_progress': 'В работе',
+        'completed': 'Завершен',
+        'cancelled': 'Отменен'
+    }
+    STATUS_COLORS = {
+        'new': (255, 255, 200),
+        'in_progress': (200, 230, 255),
+        'completed': (200, 255, 200),
+        'cancelled': (255, 200, 200)
+    }
+
+    _status_brushes: Optional[List[QBrush]] = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._status_index = {status: code for code, status in enumerate(self.STATUSES)}
+        self._reset_buffers()
+
+        if ReportTableModel._status_brushes is None:
+            ReportTableModel._status_brushes = [
+                QBrush(QColor(*self.STATUS_COLORS[status])) for status in self.STATUSES
+            ] + [QBrush(QColor(255, 255, 255))]
+
+    def _reset_buffers(self) -> None:
+        self._vessel_codes: List[str] = []
+        self._order_dates: List[str] = []
+        self._client_names: List[str] = []
+        self._is_legal = array('b')
+        self._services: List[str] = []
+        self._amounts = array('d')
+        self._status_codes = array('b')
+        self._unknown_statuses: Dict[int, str] = {}
+        self._inns: List[str] = []
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._reset_buffers()
+        self.endResetModel()
+
+    def set_rows(self, rows: List[Dict]) -> None:
+        self.beginResetModel()
+        self._reset_buffers()
+        self._extend(rows)
+        self.endResetModel()
+
+    def append_rows(self, rows: List[Dict]) -> None:
+        if not rows:
+            return
+        first = len(self._vessel_codes)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._extend(rows)
+        self.endInsertRows()
+
+    def _extend(self, rows: List[Dict]) -> None:
+        unknown = len(self.STATUSES)
+        for row in rows:
+            code = self._status_index.get(row['status'], unknown)
+            if code == unknown:
+                self._unknown_statuses[len(self._vessel_codes)] = row['status']
+
+            self._vessel_codes.append(row['vessel_code'])
+            self._order_dates.append(row['order_date'])
+            self._client_names.append(row['client_name'])
+            self._is_legal.append(1 if row['client_type'] == 'legal' else 0)
+            self._services.append(row['services_names'] or "")
+            self._amounts.append(float(row['total_amount']))
+            self._status_codes.append(code)
+            self._inns.append(row['inn'] or "")
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._vessel_codes)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def _status_text(self, row: int) -> str:
+        code = self._status_codes[row]
+        if code < len(self.STATUSES):
+            return self.STATUS_DISPLAY[self.STATUSES[code]]
+        return self._unknown_statuses.get(row, "")
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        row, column = index.row(), index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return self._vessel_codes[row]
+            if column == 1:
+                return helpers.format_date(self._order_dates[row])
+            if column == 2:
+                return self._client_names[row]
+            if column == 3:
+                return "Юр. лицо" if self._is_legal[row] else "Физ. лицо"
+            if column == 4:
+                return self._services[row]
+            if column == 5:
+                return f"{self._amounts[row]:.2f} руб."
+            if column == 6:
+                return self._status_text(row)
+            if column == 7:
+                return self._inns[row]
+
+        elif role == Qt.ItemDataRole.BackgroundRole and column == 6:
+            return self._status_brushes[self._status_codes[row]]
+
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column == 5:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class SummaryTableModel(QAbstractTableModel):
+    """Итоги отчета по одному разрезу (статус, услуга, тип клиента).
+
+    Строки - элементы Database.get_report_summary()['by_...'], подпись группы
+    берется из поля key через labels или как есть.
+    """
+
+    HEADERS = ["Группа", "Заказов", "Кол-во", "Сумма"]
+
+    def __init__(self, key: str, count_field: str = 'services_count',
+                 labels: Dict[str, str] = None, parent=None):
+        super().__init__(parent)
+        self.key = key
+        self.count_field = count_field
+        self.labels = labels or {}
+        self._rows: List[Dict] = []
+
+    def set_items(self, items: List[Dict]) -> None:
+        self.beginResetModel()
+        self._rows = list(items)
+        self.endResetModel()
+
+    def clear(self) -> None:
+        self.set_items([])
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        item, column = self._rows[index.row()], index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                value = item[self.key]
+                return self.labels.get(value, "" if value is None else str(value))
+            if column == 1:
+                return str(item['orders_count'])
+            if column == 2:
+                return str(item[self.count_field])
+            if column == 3:
+                return helpers.format_currency(item['revenue'] or 0)
+
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column > 0:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None